@@ -1,4 +1,3 @@
-import asyncio
 import json
 import hashlib
 import os
@@ -28,7 +27,6 @@ from app.schemas.chat import (
     ChatSessionCreateRequest,
     ChatSessionDetailResponse,
     ChatSessionListResponse,
-    ChatStreamEvent,
 )
 from app.schemas.detect import (
     ClaimItem,
@@ -42,6 +40,7 @@ from app.schemas.detect import (
 )
 from app.services import chat_store
 from app.services.chat_orchestrator import (
+    HTTP_SCHEMES,
     ToolAnalyzeArgs,
     ToolAlignOnlyArgs,
     ToolClaimsOnlyArgs,
@@ -67,8 +66,9 @@ from app.services.chat_orchestrator import (
     run_more_evidence,
     run_rewrite,
     run_why,
+    sse_event as _sse_event,
 )
-from app.services.content_generation import generate_full_content
+from app.services.content_generation import generate_full_content, run_content_sync
 from app.services.history_store import get_history, save_report, update_content, update_simulation
 from app.services.opinion_simulation import simulate_opinion_stream
 from app.services.pipeline import align_evidences
@@ -159,32 +159,28 @@ def _session_hash_bucket_limit() -> int:
 
 def _emit_sse_token(session_id: str, content: str) -> str:
     """生成 SSE token 事件字符串。"""
-    event = ChatStreamEvent(type="token", data={"content": content, "session_id": session_id})
-    return f"data: {event.model_dump_json()}\n\n"
+    return _sse_event("token", {"content": content, "session_id": session_id})
 
 
 def _emit_sse_stage(session_id: str, stage: str, status: str) -> str:
     """生成 SSE stage 事件字符串。"""
-    event = ChatStreamEvent(type="stage", data={"session_id": session_id, "stage": stage, "status": status})
-    return f"data: {event.model_dump_json()}\n\n"
+    return _sse_event("stage", {"session_id": session_id, "stage": stage, "status": status})
 
 
 def _emit_sse_message(session_id: str, message: ChatMessage) -> str:
     """生成 SSE message 事件字符串。"""
-    event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": message.model_dump()})
-    return f"data: {event.model_dump_json()}\n\n"
+    # 模型直接交给 pydantic-core 序列化，省去中间 dict
+    return _sse_event("message", {"session_id": session_id, "message": message})
 
 
 def _emit_sse_done(session_id: str) -> str:
     """生成 SSE done 事件字符串。"""
-    event = ChatStreamEvent(type="done", data={"session_id": session_id})
-    return f"data: {event.model_dump_json()}\n\n"
+    return _sse_event("done", {"session_id": session_id})
 
 
 def _emit_sse_error(session_id: str, error_message: str) -> str:
     """生成 SSE error 事件字符串。"""
-    event = ChatStreamEvent(type="error", data={"session_id": session_id, "message": error_message})
-    return f"data: {event.model_dump_json()}\n\n"
+    return _sse_event("error", {"session_id": session_id, "message": error_message})
 
 
 def _safe_append_message(session_id: str, msg: ChatMessage) -> None:
@@ -194,8 +190,8 @@ def _safe_append_message(session_id: str, msg: ChatMessage) -> None:
             session_id,
             role=msg.role,
             content=msg.content,
-            actions=[a.model_dump() for a in (msg.actions or [])],
-            references=[r.model_dump() for r in (msg.references or [])],
+            actions=msg.actions,
+            references=msg.references,
             meta=msg.meta,
         )
     except Exception:
@@ -259,16 +255,15 @@ def _ensure_session(session_id: str | None) -> str:
     return str(created["session_id"])
 
 
+# 以下两个函数的入参均为路由入口处已 strip 的文本，不再重复扫描/复制长文本
 def _is_analyze_intent(text: str) -> bool:
-    t = text.strip()
-    return t.startswith("/analyze ")
+    return text.startswith("/analyze ")
 
 
 def _extract_analyze_text(text: str) -> str:
-    t = text.strip()
-    if t.startswith("/analyze "):
-        return t[len("/analyze ") :].strip()
-    return t
+    if text.startswith("/analyze "):
+        return text[len("/analyze ") :].strip()
+    return text
 
 
 def _hash_input_text(text: str) -> str:
@@ -1845,7 +1840,7 @@ def _handle_single_skill_tool(
                 include_faq=True,
                 faq_count=5,
             )
-            content_resp = asyncio.run(generate_full_content(content_req))
+            content_resp = run_content_sync(generate_full_content(content_req))
         except Exception as e:
             chat_store.update_session_meta_fields(session_id, {"content_generation_in_progress": False})
             session_meta["content_generation_in_progress"] = False
@@ -1955,8 +1950,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
                 session_id,
                 role="assistant",
                 content=msg.content,
-                actions=[a.model_dump() for a in msg.actions],
-                references=[r.model_dump() for r in msg.references],
+                actions=msg.actions,
+                references=msg.references,
                 meta=msg.meta,
             )
         except Exception:
@@ -1977,8 +1972,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
                 session_id,
                 role="assistant",
                 content=msg.content,
-                actions=[a.model_dump() for a in msg.actions],
-                references=[r.model_dump() for r in msg.references],
+                actions=msg.actions,
+                references=msg.references,
                 meta=msg.meta,
             )
         except Exception:
@@ -2001,8 +1996,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
                 session_id,
                 role="assistant",
                 content=msg.content,
-                actions=[a.model_dump() for a in msg.actions],
-                references=[r.model_dump() for r in msg.references],
+                actions=msg.actions,
+                references=msg.references,
                 meta=msg.meta,
             )
         except Exception:
@@ -2021,8 +2016,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
                 session_id,
                 role="assistant",
                 content=msg.content,
-                actions=[a.model_dump() for a in msg.actions],
-                references=[r.model_dump() for r in msg.references],
+                actions=msg.actions,
+                references=msg.references,
                 meta=getattr(msg, "meta", None) or {},
             )
         except Exception:
@@ -2036,8 +2031,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
                 session_id,
                 role="assistant",
                 content=msg.content,
-                actions=[a.model_dump() for a in msg.actions],
-                references=[r.model_dump() for r in msg.references],
+                actions=msg.actions,
+                references=msg.references,
             )
         except Exception:
             pass
@@ -2097,7 +2092,7 @@ def chat(payload: ChatRequest) -> ChatResponse:
         )
     ]
     for item in aligned[:5]:
-        if item.url and item.url.startswith("http"):
+        if item.url and item.url.startswith(HTTP_SCHEMES):
             top_refs.append(
                 ChatReference(
                     title=item.title[:80] or item.url,
@@ -2133,8 +2128,8 @@ def chat(payload: ChatRequest) -> ChatResponse:
             session_id,
             role="assistant",
             content=msg.content,
-            actions=[a.model_dump() for a in msg.actions],
-            references=[r.model_dump() for r in msg.references],
+            actions=msg.actions,
+            references=msg.references,
             meta={"record_id": record_id},
         )
     except Exception:
@@ -2309,14 +2304,13 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                     actions=[ChatAction(type="command", label="查看帮助", command="/help")],
                     references=[],
                 )
-                event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-                yield f"data: {event.model_dump_json()}\n\n"
-                yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+                yield _emit_sse_message(session_id, msg)
+                yield _emit_sse_done(session_id)
                 return
 
             if validation.warnings:
                 warning_prefix = build_guardrails_warning_message(validation.warnings)
-                yield f"data: {ChatStreamEvent(type='token', data={'content': warning_prefix, 'session_id': session_id}).model_dump_json()}\n\n"
+                yield _emit_sse_token(session_id, warning_prefix)
 
             args_dict = validation.args
 
@@ -2335,11 +2329,11 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             }
 
             # 开始 token（让前端立即出现响应）
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '已收到文本，开始分析…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '已收到文本，开始分析…\n')
 
             # 风险快照
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'risk', 'status': 'running'}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 风险快照：计算中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_stage(session_id, "risk", "running")
+            yield _emit_sse_token(session_id, '- 风险快照：计算中…\n')
             phases_state["detect"] = "running"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2352,8 +2346,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             )
             with llm_slot():
                 risk = detect_risk_snapshot(analyze_text, force=args.force, enable_news_gate=True)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 风险快照：完成（{risk.label}，score={risk.score}）\n', 'session_id': session_id}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'risk', 'status': 'done'}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 风险快照：完成（{risk.label}，score={risk.score}）\n')
+            yield _emit_sse_stage(session_id, "risk", "done")
             risk_reasons = [str(item) for item in (risk.reasons or []) if str(item).strip()]
             strategy = risk.strategy
             risk_detail_lines = [
@@ -2368,7 +2362,7 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                 risk_detail_lines.append(f"[风险详情] 风险策略: {_truncate_text(strategy.risk_reason, 72)}")
             for reason in risk_reasons[:3]:
                 risk_detail_lines.append(f"[风险详情] - {_truncate_text(reason, 72)}")
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '\n'.join(risk_detail_lines) + '\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '\n'.join(risk_detail_lines) + '\n')
             phases_state["detect"] = "done"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2381,8 +2375,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             )
 
             # 主张
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'claims', 'status': 'running'}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 主张抽取：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_stage(session_id, "claims", "running")
+            yield _emit_sse_token(session_id, '- 主张抽取：进行中…\n')
             phases_state["claims"] = "running"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2395,14 +2389,14 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             )
             with llm_slot():
                 claims = orchestrator.run_claims(analyze_text, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 主张抽取：完成（{len(claims)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'claims', 'status': 'done'}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 主张抽取：完成（{len(claims)} 条）\n')
+            yield _emit_sse_stage(session_id, "claims", "done")
             claim_lines: list[str] = []
             for idx, claim in enumerate(claims, start=1):
                 claim_text = str(getattr(claim, "claim_text", "") or "").strip()
                 claim_id = str(getattr(claim, "claim_id", f"c{idx}") or f"c{idx}").upper()
                 claim_lines.append(f"[主张详情] {claim_id}：{claim_text}")
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '\n'.join(claim_lines) + '\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '\n'.join(claim_lines) + '\n')
             phases_state["claims"] = "done"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2415,8 +2409,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             )
 
             # 证据检索
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'evidence_search', 'status': 'running'}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 联网检索证据：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_stage(session_id, "evidence_search", "running")
+            yield _emit_sse_token(session_id, '- 联网检索证据：进行中…\n')
             phases_state["evidence"] = "running"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2428,8 +2422,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                 meta={"source": "chat"},
             )
             evidences = orchestrator.run_evidence(text=analyze_text, claims=claims, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 联网检索证据：完成（候选 {len(evidences)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'evidence_search', 'status': 'done'}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 联网检索证据：完成（候选 {len(evidences)} 条）\n')
+            yield _emit_sse_stage(session_id, "evidence_search", "done")
             evidence_lines = ["【原始检索证据】"]
             for idx, claim in enumerate(claims, start=1):
                 if idx > 1:
@@ -2456,15 +2450,15 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                     evidence_lines.append(f"    [摘要] {summary}")
                     if evidence_idx < len(related):
                         evidence_lines.append(f"    {_EVIDENCE_SEPARATOR}")
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '\n'.join(evidence_lines) + '\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '\n'.join(evidence_lines) + '\n')
 
             # 证据聚合与对齐
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'evidence_align', 'status': 'running'}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 证据聚合与对齐：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_stage(session_id, "evidence_align", "running")
+            yield _emit_sse_token(session_id, '- 证据聚合与对齐：进行中…\n')
             with llm_slot():
                 aligned = align_evidences(claims=claims, evidences=evidences, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'evidence_align', 'status': 'done'}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n')
+            yield _emit_sse_stage(session_id, "evidence_align", "done")
             align_lines = ["【聚合后证据】"]
             for idx, claim in enumerate(claims, start=1):
                 if idx > 1:
@@ -2497,7 +2491,7 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                     align_lines.append(f"    [对齐理由] {rationale}")
                     if evidence_idx < len(related):
                         align_lines.append(f"    {_EVIDENCE_SEPARATOR}")
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '\n'.join(align_lines) + '\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '\n'.join(align_lines) + '\n')
             phases_state["evidence"] = "done"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2510,8 +2504,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
             )
 
             # 报告
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'report', 'status': 'running'}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 综合报告：生成中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_stage(session_id, "report", "running")
+            yield _emit_sse_token(session_id, '- 综合报告：生成中…\n')
             phases_state["report"] = "running"
             upsert_phase_snapshot(
                 task_id=session_id,
@@ -2529,8 +2523,8 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                     evidences=aligned,
                     strategy=risk.strategy,
                 )
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 综合报告：完成\n', 'session_id': session_id}).model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='stage', data={'session_id': session_id, 'stage': 'report', 'status': 'done'}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 综合报告：完成\n')
+            yield _emit_sse_stage(session_id, "report", "done")
             suspicious_points = [str(item) for item in (report.get("suspicious_points") or []) if str(item).strip()]
             evidence_domains = [str(item) for item in (report.get("evidence_domains") or []) if str(item).strip()]
             scenario_zh = _zh_scenario(report.get("detected_scenario"))
@@ -2544,7 +2538,7 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                 report_lines.append("[报告详情] 可疑点:")
                 for point in suspicious_points:
                     report_lines.append(f"- {point}")
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '\n'.join(report_lines) + '\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '\n'.join(report_lines) + '\n')
 
             record_id = save_report(
                 input_text=analyze_text,
@@ -2586,7 +2580,7 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                 )
             ]
             for item in aligned[:5]:
-                if item.url and item.url.startswith("http"):
+                if item.url and item.url.startswith(HTTP_SCHEMES):
                     top_refs.append(
                         ChatReference(
                             title=item.title[:80] or item.url,
@@ -2622,20 +2616,18 @@ def chat_session_stream(session_id: str, payload: ChatMessageCreateRequest) -> S
                     session_id,
                     role="assistant",
                     content=msg.content,
-                    actions=[a.model_dump() for a in msg.actions],
-                    references=[r.model_dump() for r in msg.references],
+                    actions=msg.actions,
+                    references=msg.references,
                     meta={"record_id": record_id},
                 )
             except Exception:
                 pass
 
-            event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-            yield f"data: {event.model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_message(session_id, msg)
+            yield _emit_sse_done(session_id)
         except Exception as e:
-            err = ChatStreamEvent(type="error", data={"session_id": session_id, "message": str(e)})
-            yield f"data: {err.model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_error(session_id, str(e))
+            yield _emit_sse_done(session_id)
 
     return StreamingResponse(
         iter(event_generator()),
@@ -2733,17 +2725,16 @@ def chat_stream(payload: ChatRequest) -> StreamingResponse:
             # 0) 非分析意图：直接返回结构化 message（仍走 SSE 通道）
             if not _is_analyze_intent(text):
                 msg = build_intent_clarify_message(text)
-                event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-                yield f"data: {event.model_dump_json()}\n\n"
-                yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+                yield _emit_sse_message(session_id, msg)
+                yield _emit_sse_done(session_id)
 
                 try:
                     chat_store.append_message(
                         session_id,
                         role="assistant",
                         content=msg.content,
-                        actions=[a.model_dump() for a in msg.actions],
-                        references=[r.model_dump() for r in msg.references],
+                        actions=msg.actions,
+                        references=msg.references,
                     )
                 except Exception:
                     pass
@@ -2757,50 +2748,49 @@ def chat_stream(payload: ChatRequest) -> StreamingResponse:
                     actions=base_actions,
                     references=[],
                 )
-                event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-                yield f"data: {event.model_dump_json()}\n\n"
-                yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+                yield _emit_sse_message(session_id, msg)
+                yield _emit_sse_done(session_id)
 
                 try:
                     chat_store.append_message(
                         session_id,
                         role="assistant",
                         content=msg.content,
-                        actions=[a.model_dump() for a in msg.actions],
-                        references=[r.model_dump() for r in msg.references],
+                        actions=msg.actions,
+                        references=msg.references,
                     )
                 except Exception:
                     pass
                 return
 
             # 1) 开始提示（让前端立即出现响应）
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '已收到文本，开始分析…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '已收到文本，开始分析…\n')
 
             # 2) 风险快照
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 风险快照：计算中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 风险快照：计算中…\n')
             with llm_slot():
                 risk = detect_risk_snapshot(analyze_text, enable_news_gate=True)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 风险快照：完成（{risk.label}，score={risk.score}）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 风险快照：完成（{risk.label}，score={risk.score}）\n')
 
             # 3) 主张
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 主张抽取：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 主张抽取：进行中…\n')
             with llm_slot():
                 claims = orchestrator.run_claims(analyze_text, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 主张抽取：完成（{len(claims)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 主张抽取：完成（{len(claims)} 条）\n')
 
             # 4) 证据检索
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 联网检索证据：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 联网检索证据：进行中…\n')
             evidences = orchestrator.run_evidence(text=analyze_text, claims=claims, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 联网检索证据：完成（候选 {len(evidences)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 联网检索证据：完成（候选 {len(evidences)} 条）\n')
 
             # 5) 证据聚合与对齐
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 证据聚合与对齐：进行中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 证据聚合与对齐：进行中…\n')
             with llm_slot():
                 aligned = align_evidences(claims=claims, evidences=evidences, strategy=risk.strategy)
-            yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, f'- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n')
 
             # 6) 报告
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 综合报告：生成中…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 综合报告：生成中…\n')
             with llm_slot():
                 report = orchestrator.run_report(
                     text=analyze_text,
@@ -2808,7 +2798,7 @@ def chat_stream(payload: ChatRequest) -> StreamingResponse:
                     evidences=aligned,
                     strategy=risk.strategy,
                 )
-            yield f"data: {ChatStreamEvent(type='token', data={'content': '- 综合报告：完成\n', 'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_token(session_id, '- 综合报告：完成\n')
 
             record_id = save_report(
                 input_text=analyze_text,
@@ -2829,7 +2819,7 @@ def chat_stream(payload: ChatRequest) -> StreamingResponse:
                 )
             ]
             for item in aligned[:5]:
-                if item.url and item.url.startswith("http"):
+                if item.url and item.url.startswith(HTTP_SCHEMES):
                     top_refs.append(
                         ChatReference(
                             title=item.title[:80] or item.url,
@@ -2859,26 +2849,24 @@ def chat_stream(payload: ChatRequest) -> StreamingResponse:
                 actions=analyze_actions,
                 references=top_refs,
             )
-            event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-            yield f"data: {event.model_dump_json()}\n\n"
+            yield _emit_sse_message(session_id, msg)
 
             try:
                 chat_store.append_message(
                     session_id,
                     role="assistant",
                     content=msg.content,
-                    actions=[a.model_dump() for a in msg.actions],
-                    references=[r.model_dump() for r in msg.references],
+                    actions=msg.actions,
+                    references=msg.references,
                     meta={"record_id": record_id},
                 )
             except Exception:
                 pass
 
-            yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_done(session_id)
         except Exception as e:
-            err = ChatStreamEvent(type="error", data={"session_id": session_id, "message": str(e)})
-            yield f"data: {err.model_dump_json()}\n\n"
-            yield f"data: {ChatStreamEvent(type='done', data={'session_id': session_id}).model_dump_json()}\n\n"
+            yield _emit_sse_error(session_id, str(e))
+            yield _emit_sse_done(session_id)
 
     return StreamingResponse(
         iter(event_generator()),
@@ -6,10 +6,25 @@
 - POST /content/clarification - 仅生成澄清稿
 - POST /content/faq - 仅生成FAQ
 - POST /content/platform-scripts - 仅生成多平台话术
+- POST /content/platform-scripts/stream - 仅生成多平台话术（SSE，按完成先后逐个推送）
+
+相同请求体在 TTL 内命中 content_cache，直接返回缓存结果，跳过 LLM 调用；
+缓存写入前到达的相同请求经 AsyncSingleFlight 合并，只生成一次。
+/content/generate 另有近似匹配层：其余参数一致、原文高度相似时复用已生成内容；
+完整生成后还会预填三个单模块接口的缓存。
+结果含规则兜底内容（LLM 未启用或调用失败）时不写入任何缓存，LLM 恢复后即可重新生成。
 """
 
-from fastapi import APIRouter
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
+from app.core.cache import AsyncSingleFlight, content_cache, content_semantic_cache
+from app.core.concurrency import llm_slot_async
+from app.core.logger import get_logger
 from app.schemas.detect import (
     ContentGenerateRequest,
     ContentGenerateResponse,
@@ -22,36 +37,158 @@ from app.services.content_generation import (
     generate_clarification_only,
     generate_faq_only,
     generate_platform_scripts_only,
+    stream_platform_scripts_only,
+    track_fallbacks,
 )
 
 router = APIRouter(prefix="/content", tags=["content"])
+logger = get_logger("truthcast.routes_content")
+
+# 按缓存键合并进行中的生成任务
+_inflight = AsyncSingleFlight()
+
+
+def _cache_key(
+    kind: str, request: ContentGenerateRequest, exclude: set[str] | None = None
+) -> str:
+    """按路由类型 + 规范化请求体构造缓存键（排序键，保证字段顺序无关）"""
+    payload = request.model_dump(mode="json", exclude=exclude)
+    return kind + ":" + json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+async def _cached(
+    kind: str,
+    request: ContentGenerateRequest,
+    generate: Callable[[ContentGenerateRequest], Awaitable[Any]],
+) -> Any:
+    key = _cache_key(kind, request)
+    cached = content_cache.get(key)
+    if cached is not None:
+        logger.info("应对内容(%s)：缓存命中，跳过 LLM 调用", kind)
+        return cached
+
+    async def _produce() -> Any:
+        async with llm_slot_async():
+            with track_fallbacks() as fallbacks:
+                result = await generate(request)
+        if fallbacks:
+            logger.info("应对内容(%s)：含规则兜底结果，不写入缓存", kind)
+        else:
+            content_cache.set(key, result)
+        return result
+
+    return await _inflight.run(key, _produce)
+
+
+def _prefill_parts(request: ContentGenerateRequest, result: ContentGenerateResponse) -> None:
+    """完整生成已包含各子模块结果，顺带写入单模块接口的缓存，后续同参请求直接命中"""
+    content_cache.set(_cache_key("clarification", request), result.clarification)
+    content_cache.set(_cache_key("platform_scripts", request), result.platform_scripts)
+    if result.faq is not None:
+        content_cache.set(_cache_key("faq", request), result.faq)
 
 
 @router.post("/generate", response_model=ContentGenerateResponse)
 async def generate_content(request: ContentGenerateRequest):
     """
     生成完整应对内容
-    
+
     - 澄清稿（短/中/长三版）
     - FAQ（可选）
     - 多平台话术
     """
-    return await generate_full_content(request)
+    key = _cache_key("generate", request)
+    cached = content_cache.get(key)
+    if cached is not None:
+        logger.info("应对内容(generate)：缓存命中，跳过 LLM 调用")
+        return cached
+
+    # 近似匹配层：报告/风格/平台等精确一致，仅原文措辞略有差异时复用
+    bucket = _cache_key("generate", request, exclude={"text"})
+    cached = content_semantic_cache.get(bucket, request.text)
+    if cached is not None:
+        logger.info("应对内容(generate)：近似缓存命中，跳过 LLM 调用")
+        return cached
+
+    async def _produce() -> ContentGenerateResponse:
+        async with llm_slot_async():
+            with track_fallbacks() as fallbacks:
+                result = await generate_full_content(request)
+        if fallbacks:
+            logger.info("应对内容(generate)：%s 使用规则兜底，不写入缓存", "、".join(sorted(fallbacks)))
+            return result
+        content_cache.set(key, result)
+        content_semantic_cache.set(bucket, request.text, result)
+        _prefill_parts(request, result)
+        return result
+
+    return await _inflight.run(key, _produce)
 
 
 @router.post("/clarification", response_model=ClarificationContent)
 async def generate_clarification(request: ContentGenerateRequest):
     """仅生成澄清稿"""
-    return await generate_clarification_only(request)
+    return await _cached("clarification", request, generate_clarification_only)
 
 
 @router.post("/faq", response_model=list[FAQItem])
 async def generate_faq(request: ContentGenerateRequest):
     """仅生成FAQ"""
-    return await generate_faq_only(request)
+    return await _cached("faq", request, generate_faq_only)
 
 
 @router.post("/platform-scripts", response_model=list[PlatformScript])
 async def generate_platform_scripts(request: ContentGenerateRequest):
     """仅生成多平台话术"""
-    return await generate_platform_scripts_only(request)
+    return await _cached("platform_scripts", request, generate_platform_scripts_only)
+
+
+@router.post("/platform-scripts/stream")
+async def stream_platform_scripts(request: ContentGenerateRequest) -> StreamingResponse:
+    """SSE 流式生成多平台话术：每完成一个平台推送一次，最后推送 done
+
+    命中 content_cache 时按平台顺序直接推送缓存结果；完整生成后按平台顺序写入缓存，
+    与 /content/platform-scripts 共用（含规则兜底结果时不写入）。
+    LLM 槽位排队超时时推送 error 事件（含 status/detail）并结束，不再推送 done。
+    """
+    key = _cache_key("platform_scripts", request)
+
+    async def event_generator() -> AsyncIterator[str]:
+        scripts = content_cache.get(key)
+        if scripts is not None:
+            logger.info("应对内容(platform_scripts/stream)：缓存命中，跳过 LLM 调用")
+            for script in scripts:
+                yield _sse("platform_script", script)
+        else:
+            scripts = []
+            try:
+                async with llm_slot_async():
+                    with track_fallbacks() as fallbacks:
+                        async for script in stream_platform_scripts_only(request):
+                            scripts.append(script)
+                            yield _sse("platform_script", script)
+            except HTTPException as exc:
+                # 响应头（200）已发出，无法再改状态码：排队超时等以 error 事件告知并结束流
+                yield _sse("error", {"status": exc.status_code, "detail": exc.detail})
+                return
+            if fallbacks:
+                logger.info("应对内容(platform_scripts/stream)：含规则兜底结果，不写入缓存")
+            else:
+                order = {p: i for i, p in enumerate(request.platforms or [])}
+                scripts.sort(key=lambda script: order.get(script.platform, len(order)))
+                content_cache.set(key, scripts)
+        yield _sse("done", {"count": len(scripts)})
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _sse(stage: str, data: Any) -> str:
+    return "data: " + to_json({"stage": stage, "data": data}).decode() + "\n\n"
@@ -53,23 +53,23 @@ def _truncate_text(text: str) -> tuple[str, bool]:
 def detect_fake_news(payload: DetectRequest) -> DetectResponse:
     text, truncated = _truncate_text(payload.text)
 
-    # 缓存命中，直接返回（截断状态由本次请求决定，无需消耗 LLM 槽位）
-    cached = detect_cache.get(text)
-    if cached is not None:
-        logger.info("风险快照：缓存命中，跳过 LLM 调用")
-        return cached.model_copy(update={"truncated": truncated})
+    def _detect() -> DetectResponse:
+        with llm_slot():
+            result = detect_risk_snapshot(text, force=payload.force, enable_news_gate=True)
+        return DetectResponse(
+            label=result.label,
+            confidence=result.confidence,
+            score=result.score,
+            reasons=result.reasons,
+            strategy=result.strategy,
+            truncated=truncated,
+        )
 
-    with llm_slot():
-        result = detect_risk_snapshot(text, force=payload.force, enable_news_gate=True)
-    resp = DetectResponse(
-        label=result.label,
-        confidence=result.confidence,
-        score=result.score,
-        reasons=result.reasons,
-        strategy=result.strategy,
-        truncated=truncated,
-    )
-    detect_cache.set(text, resp)
+    # 缓存命中直接返回（截断状态由本次请求决定，无需消耗 LLM 槽位）
+    resp, hit = detect_cache.get_or_set(text, _detect)
+    if hit:
+        logger.info("风险快照：缓存命中，跳过 LLM 调用")
+        return resp.model_copy(update={"truncated": truncated})
     return resp
 
 
@@ -77,21 +77,19 @@ def detect_fake_news(payload: DetectRequest) -> DetectResponse:
 def detect_claims(payload: ClaimsRequest) -> ClaimsResponse:
     text, _ = _truncate_text(payload.text)
 
-    # 缓存命中（仅当未指定自定义策略时缓存，避免策略不同导致误命中）
-    if payload.strategy is None:
-        cached = claims_cache.get(text)
-        if cached is not None:
-            logger.info("主张抽取：缓存命中，跳过 LLM 调用")
-            return cached
-
-    with llm_slot():
-        result = ClaimsResponse(
-            claims=orchestrator.run_claims(text, strategy=payload.strategy)
-        )
+    def _claims() -> ClaimsResponse:
+        with llm_slot():
+            return ClaimsResponse(
+                claims=orchestrator.run_claims(text, strategy=payload.strategy)
+            )
 
-    if payload.strategy is None:
-        claims_cache.set(text, result)
+    # 仅当未指定自定义策略时缓存，避免策略不同导致误命中
+    if payload.strategy is not None:
+        return _claims()
 
+    result, hit = claims_cache.get_or_set(text, _claims)
+    if hit:
+        logger.info("主张抽取：缓存命中，跳过 LLM 调用")
     return result
 
 
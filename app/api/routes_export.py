@@ -1,48 +1,88 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import time
+from typing import Iterator
 
+import anyio
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
+from app.core.env_loader import int_env
 from app.schemas.export import ExportDataRequest
 from app.services.export_service import generate_pdf_bytes, generate_word_bytes
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+# 在模块加载时读取一次；渲染为 CPU 密集型，并发数不宜超过核数
+_EXPORT_CONCURRENCY = max(1, int_env("TRUTHCAST_EXPORT_CONCURRENCY", 2))
+
+# PDF/Word 渲染为同步阻塞调用，放到工作线程执行，避免阻塞事件循环
+_export_limiter = anyio.CapacityLimiter(_EXPORT_CONCURRENCY)
+
+# 分块大小：大文档按 100 KiB 写入 socket，避免单块过大阻塞流控
+_CHUNK_SIZE = 100 * 1024
+
+# 超过该大小才走分块流式响应；小文档直接一次性返回，省去异步迭代开销
+_STREAM_THRESHOLD = 1 << 20
+
+
+def _iter_chunks(content: bytes, size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(content)
+    for start in range(0, len(view), size):
+        yield bytes(view[start : start + size])
+
+
+# (UTC 天序号, 日期文本)：文件名只到天粒度，跨天时才重新格式化
+_cached_day: tuple[int, str] = (-1, "")
+
+
+def _today_utc() -> str:
+    global _cached_day
+    now = int(time.time())
+    day = now // 86400
+    if day != _cached_day[0]:
+        _cached_day = (day, time.strftime("%Y-%m-%d", time.gmtime(now)))
+    return _cached_day[1]
+
 
 def _filename(ext: str) -> str:
-    date_text = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    return f"truthcast-report-{date_text}.{ext}"
+    return f"truthcast-report-{_today_utc()}.{ext}"
+
+
+def _file_response(content: bytes, media_type: str, ext: str) -> Response:
+    headers = {"Content-Disposition": f'attachment; filename="{_filename(ext)}"'}
+    if len(content) > _STREAM_THRESHOLD:
+        return StreamingResponse(
+            _iter_chunks(content), media_type=media_type, headers=headers
+        )
+    return Response(content=content, media_type=media_type, headers=headers)
 
 
 @router.post("/pdf")
 async def export_pdf(data: ExportDataRequest):
     try:
-        content = generate_pdf_bytes(data)
+        content = await anyio.to_thread.run_sync(
+            generate_pdf_bytes, data, limiter=_export_limiter
+        )
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"PDF 导出失败：{exc}") from exc
-    filename = _filename("pdf")
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return StreamingResponse(
-        iter([content]), media_type="application/pdf", headers=headers
-    )
+    return _file_response(content, "application/pdf", "pdf")
 
 
 @router.post("/word")
 async def export_word(data: ExportDataRequest):
     try:
-        content = generate_word_bytes(data)
+        content = await anyio.to_thread.run_sync(
+            generate_word_bytes, data, limiter=_export_limiter
+        )
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Word 导出失败：{exc}") from exc
-    filename = _filename("docx")
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-    return StreamingResponse(
-        iter([content]),
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers=headers,
+    return _file_response(
+        content,
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "docx",
     )
@@ -5,18 +5,58 @@ This module holds the global CLI configuration that is set by the main callback
 and accessed by individual command modules.
 """
 
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
 from app.cli.config import CLIConfig
 
+if TYPE_CHECKING:
+    from app.cli.client import APIClient
+
 # Global configuration object (set by main callback)
 _global_config: CLIConfig = CLIConfig()
 
+# API client built from the current config, shared by all commands in one invocation
+_client_var: ContextVar[Optional["APIClient"]] = ContextVar("api_client", default=None)
+
 
 def set_global_config(config: CLIConfig) -> None:
     """Set the global CLI configuration."""
     global _global_config
     _global_config = config
+    _client_var.set(None)
 
 
 def get_global_config() -> CLIConfig:
     """Get the current global CLI configuration."""
     return _global_config
+
+
+def get_client() -> "APIClient":
+    """Get the shared API client for the current config (created on first use).
+
+    Its connections come from the process-wide pool, which is closed at exit.
+    """
+    client = _client_var.get()
+    if client is None:
+        from app.cli.client import APIClient
+
+        config = _global_config
+        client = APIClient(
+            base_url=config.api_base,
+            timeout=float(config.timeout),
+            retry_times=config.retry_times,
+        )
+        _client_var.set(client)
+    return client
+
+
+def __getattr__(name: str) -> CLIConfig:
+    """Expose the live config as ``_globals.config`` (PEP 562).
+
+    Read it through the module (``_globals.config.api_base``), not via
+    ``from app.cli._globals import config``, which would bind a stale copy.
+    """
+    if name == "config":
+        return _global_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,15 +3,38 @@ HTTP Client for CLI
 Wraps httpx Client with unified error handling and retry logic.
 """
 
+import asyncio
+import atexit
+import functools
+import importlib.util
 import json
 import logging
-from typing import Any, AsyncIterator, Dict, Optional
-from urllib.parse import urljoin
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 import httpx
 
+try:
+    # Optional speedup (pip install truthcast[speedups]); stdlib json accepts bytes too.
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - depends on optional dependency
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Header names masked in debug request logs (compared lower-cased)
+_SENSITIVE_HEADERS = frozenset({"authorization", "x-api-key"})
+
+# Error bodies are only shown truncated; upstream HTML error pages can be
+# megabytes, so decode just this many leading bytes.
+_ERROR_BODY_LIMIT = 512
+
+
+def _error_text(content: bytes) -> str:
+    """Decode the head of an error body for HTTPStatusError/JSONParseError."""
+    return content[:_ERROR_BODY_LIMIT].decode("utf-8", errors="replace")
+
 
 # ============================================================================
 # Error Classes
@@ -84,6 +107,76 @@ class JSONParseError(APIError):
 
 
 
+# ============================================================================
+# Error Classification & Retry
+# ============================================================================
+
+
+def _classify_error(error: httpx.HTTPError, timeout_message: str) -> APIError:
+    """Map an httpx transport error onto the CLI error hierarchy."""
+    if isinstance(error, httpx.ConnectTimeout):
+        return NetworkError("Connection timeout: server may be unreachable")
+    if isinstance(error, httpx.TimeoutException):
+        return TimeoutError(timeout_message)
+    if isinstance(error, (httpx.ConnectError, httpx.NetworkError)):
+        return NetworkError(str(error))
+    return NetworkError(f"HTTP error: {str(error)}")
+
+
+# Exponential backoff with full jitter between attempts, so clients retrying
+# against a restarting server don't reconnect in lockstep.
+_RETRY_BACKOFF_INITIAL = 0.2
+_RETRY_BACKOFF_MAX = 2.0
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Seconds to wait after failed attempt number ``attempt`` (1-based)."""
+    cap = min(_RETRY_BACKOFF_MAX, _RETRY_BACKOFF_INITIAL * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+def _with_retry(fn):
+    """Retry transport errors up to ``self.retry_times`` total attempts; 4xx/5xx are not retried."""
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        for attempt in range(1, self.retry_times + 1):
+            try:
+                return fn(self, *args, **kwargs)
+            except httpx.HTTPError as e:
+                self._handle_error(e, attempt)
+                if attempt >= self.retry_times:
+                    raise _classify_error(
+                        e, f"Request timeout after {self.retry_times} attempts"
+                    ) from e
+            delay = _backoff_delay(attempt)
+            if delay:
+                time.sleep(delay)
+
+    return wrapper
+
+
+def _with_retry_async(fn):
+    """Async twin of :func:`_with_retry`."""
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        for attempt in range(1, self.retry_times + 1):
+            try:
+                return await fn(self, *args, **kwargs)
+            except httpx.HTTPError as e:
+                self._handle_error(e, attempt)
+                if attempt >= self.retry_times:
+                    raise _classify_error(
+                        e, f"Request timeout after {self.retry_times} attempts"
+                    ) from e
+            delay = _backoff_delay(attempt)
+            if delay:
+                await asyncio.sleep(delay)
+
+    return wrapper
+
+
 # ============================================================================
 # Stream Context Manager Wrapper
 # ============================================================================
@@ -103,7 +196,17 @@ class _StreamContextWrapper:
         self.response = self.ctx_mgr.__enter__()
         # Check status code after entering context
         if self.response.status_code >= 400:
-            response_text = self.response.text
+            try:
+                head = b""
+                for chunk in self.response.iter_bytes():
+                    head += chunk
+                    if len(head) >= _ERROR_BODY_LIMIT:
+                        break
+                response_text = _error_text(head)
+            finally:
+                # __exit__ is never called when __enter__ raises; release the
+                # pooled connection here or it stays checked out.
+                self.ctx_mgr.__exit__(None, None, None)
             raise HTTPStatusError(
                 f"HTTP {self.response.status_code}: {response_text[:100]}",
                 status_code=self.response.status_code,
@@ -114,6 +217,60 @@ class _StreamContextWrapper:
     def __exit__(self, exc_type, exc_val, exc_tb):
         return self.ctx_mgr.__exit__(exc_type, exc_val, exc_tb)
 
+# ============================================================================
+# Shared Connection Pool
+# ============================================================================
+
+# Keep-alive pool shared by all APIClient instances in this process, so
+# repeated commands (REPL turns, local-agent tool calls) reuse connections
+# instead of paying TCP/TLS setup on every request.
+_DEFAULT_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=100,
+    keepalive_expiry=30,
+)
+
+# HTTP/2 multiplexes concurrent SSE streams over one connection; httpx only
+# supports it when the optional `h2` package is installed (pip install httpx[http2]).
+_HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+_default_clients: Dict[Tuple[str, float], httpx.Client] = {}
+
+
+def get_default_client(base_url: str, timeout: float) -> httpx.Client:
+    """
+    Return the process-wide pooled httpx.Client for (base_url, timeout).
+
+    A closed client is transparently replaced.
+    """
+    key = (base_url, float(timeout))
+    client = _default_clients.get(key)
+    if client is None or client.is_closed:
+        # No default Content-Type: httpx sets it for json= bodies, and it is
+        # wrong for GET/stream requests.
+        client = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=_DEFAULT_LIMITS,
+            http2=_HTTP2_ENABLED,
+            trust_env=False,  # Prevent SOCKS proxy detection
+        )
+        _default_clients[key] = client
+    return client
+
+
+def _close_default_clients() -> None:
+    for client in _default_clients.values():
+        try:
+            client.close()
+        except Exception:
+            pass
+    _default_clients.clear()
+
+
+atexit.register(_close_default_clients)
+
+
 # ============================================================================
 # HTTP Client
 # ============================================================================
@@ -135,6 +292,7 @@ class APIClient:
         base_url: str = "http://127.0.0.1:8000",
         timeout: float = 30.0,
         retry_times: int = 1,
+        client: Optional[httpx.Client] = None,
     ):
         """
         Initialize API client.
@@ -142,18 +300,16 @@ class APIClient:
         Args:
             base_url: Base URL for API server (e.g., http://127.0.0.1:8000)
             timeout: Request timeout in seconds
-            retry_times: Number of retries on network errors (not on 4xx/5xx)
+            retry_times: Total attempts on network errors, with jittered backoff (not on 4xx/5xx)
+            client: Optional injected httpx.Client (defaults to the shared pool)
         """
         self.base_url = base_url
         self.timeout = timeout
         self.retry_times = retry_times
         
-        self._client = httpx.Client(
-            base_url=base_url,
-            timeout=timeout,
-            headers={"Content-Type": "application/json"},
-            trust_env=False,  # Prevent SOCKS proxy detection
-        )
+        # The shared pool outlives this wrapper and is closed at interpreter exit.
+        self._shared_client = client is None
+        self._client = client if client is not None else get_default_client(base_url, timeout)
     
     def __enter__(self):
         return self
@@ -162,22 +318,25 @@ class APIClient:
         self.close()
     
     def close(self):
-        """Close the underlying httpx client."""
-        if self._client:
+        """Close the underlying httpx client (the shared pool is left open)."""
+        if self._client and not self._shared_client:
             self._client.close()
     
     def _log_request(self, method: str, url: str, **kwargs):
         """Log request details (without sensitive headers)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         headers = kwargs.get("headers", {})
         # Mask sensitive headers
-        safe_headers = {k: "***" for k in headers if k.lower() in ["authorization", "x-api-key"]}
-        safe_headers.update({k: v for k, v in headers.items() if k.lower() not in ["authorization", "x-api-key"]})
-        logger.debug(f"{method} {url} | headers: {safe_headers}")
+        safe_headers = {k: "***" if k.lower() in _SENSITIVE_HEADERS else v for k, v in headers.items()}
+        logger.debug("%s %s%s | headers: %s", method, self.base_url, url, safe_headers)
     
     def _handle_error(self, error: Exception, attempt: int) -> None:
         """Handle different error types and log them."""
-        logger.error(f"Request failed (attempt {attempt}): {type(error).__name__}: {str(error)}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Request failed (attempt %d): %s: %s", attempt, type(error).__name__, error)
     
+    @_with_retry
     def get(self, path: str, **kwargs) -> Dict[str, Any]:
         """
         Make GET request.
@@ -188,38 +347,10 @@ class APIClient:
             HTTPStatusError: Non-2xx HTTP status
             JSONParseError: JSON parsing failure
         """
-        url = urljoin(self.base_url, path)
-        self._log_request("GET", url, **kwargs)
-        
-        for attempt in range(1, self.retry_times + 1):
-            try:
-                response = self._client.get(path, **kwargs)
-                return self._process_response(response)
-            except httpx.ConnectTimeout as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        f"Connection timeout: server may be unreachable",
-                    ) from e
-            except httpx.TimeoutException as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise TimeoutError(
-                        f"Request timeout after {self.retry_times} attempts",
-                    ) from e
-            except (httpx.ConnectError, httpx.NetworkError) as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        str(e),
-                    ) from e
-            except httpx.HTTPError as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        f"HTTP error: {str(e)}",
-                    ) from e
+        self._log_request("GET", path, **kwargs)
+        return self._process_response(self._client.get(path, **kwargs))
     
+    @_with_retry
     def post(self, path: str, json: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
         """
         Make POST request.
@@ -230,37 +361,8 @@ class APIClient:
             HTTPStatusError: Non-2xx HTTP status
             JSONParseError: JSON parsing failure
         """
-        url = urljoin(self.base_url, path)
-        self._log_request("POST", url, json=json, **kwargs)
-        
-        for attempt in range(1, self.retry_times + 1):
-            try:
-                response = self._client.post(path, json=json, **kwargs)
-                return self._process_response(response)
-            except httpx.ConnectTimeout as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        f"Connection timeout: server may be unreachable",
-                    ) from e
-            except httpx.TimeoutException as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise TimeoutError(
-                        f"Request timeout after {self.retry_times} attempts",
-                    ) from e
-            except (httpx.ConnectError, httpx.NetworkError) as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        str(e),
-                    ) from e
-            except httpx.HTTPError as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(
-                        f"HTTP error: {str(e)}",
-                    ) from e
+        self._log_request("POST", path, json=json, **kwargs)
+        return self._process_response(self._client.post(path, json=json, **kwargs))
     
     def stream(self, method: str, path: str, json: Optional[Dict[str, Any]] = None, **kwargs):
         """
@@ -274,13 +376,15 @@ class APIClient:
                 for chunk in response.iter_lines():
                     ...
         
+        Always consume the result with ``with``: the connection goes back to
+        the pool only when the block exits.
+        
         Raises:
             NetworkError: Connection failure
             TimeoutError: Request timeout
             HTTPStatusError: Non-2xx HTTP status
         """
-        url = urljoin(self.base_url, path)
-        self._log_request(method, url, json=json, **kwargs)
+        self._log_request(method, path, json=json, **kwargs)
         
         try:
             # For SSE streams, disable read timeout by default to avoid
@@ -302,20 +406,8 @@ class APIClient:
             
             # Wrap the context manager to check status code on entry
             return _StreamContextWrapper(ctx_mgr)
-        except httpx.ConnectTimeout as e:
-            raise NetworkError(
-                f"Connection timeout: server may be unreachable",
-            ) from e
-        except httpx.TimeoutException as e:
-            raise TimeoutError(
-                f"Stream request timeout",
-            ) from e
-        except (httpx.ConnectError, httpx.NetworkError) as e:
-            raise NetworkError(str(e)) from e
-        except HTTPStatusError:
-            raise
         except httpx.HTTPError as e:
-            raise NetworkError(f"HTTP error: {str(e)}") from e
+            raise _classify_error(e, "Stream request timeout") from e
     
     def _process_response(self, response: httpx.Response) -> Dict[str, Any]:
         """
@@ -330,7 +422,7 @@ class APIClient:
         """
         # Check status code
         if response.status_code >= 400:
-            response_text = response.text
+            response_text = _error_text(response.content)
             raise HTTPStatusError(
                 f"HTTP {response.status_code}: {response_text[:100]}",
                 status_code=response.status_code,
@@ -339,9 +431,9 @@ class APIClient:
         
         # Parse JSON
         try:
-            return response.json()
+            return _json_loads(response.content)
         except (json.JSONDecodeError, ValueError) as e:
-            response_text = response.text
+            response_text = _error_text(response.content)
             raise JSONParseError(
                 f"Failed to parse JSON response: {str(e)}",
                 response_text=response_text,
@@ -369,6 +461,7 @@ class AsyncAPIClient:
         base_url: str = "http://127.0.0.1:8000",
         timeout: float = 30.0,
         retry_times: int = 1,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         """
         Initialize async API client.
@@ -376,17 +469,23 @@ class AsyncAPIClient:
         Args:
             base_url: Base URL for API server
             timeout: Request timeout in seconds
-            retry_times: Number of retries on network errors
+            retry_times: Total attempts on network errors
+            client: Optional injected httpx.AsyncClient. Async pools are bound
+                to the event loop that opened them, so there is no process-wide
+                default; share one by passing it explicitly.
         """
         self.base_url = base_url
         self.timeout = timeout
         self.retry_times = retry_times
         
-        self._client = httpx.AsyncClient(
-            base_url=base_url,
-            timeout=timeout,
-            headers={"Content-Type": "application/json"},
-        )
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=timeout,
+                limits=_DEFAULT_LIMITS,
+                http2=_HTTP2_ENABLED,
+            )
+        self._client = client
     
     async def __aenter__(self):
         return self
@@ -401,95 +500,72 @@ class AsyncAPIClient:
     
     def _log_request(self, method: str, url: str, **kwargs):
         """Log request details (without sensitive headers)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         headers = kwargs.get("headers", {})
-        safe_headers = {k: "***" for k in headers if k.lower() in ["authorization", "x-api-key"]}
-        safe_headers.update({k: v for k, v in headers.items() if k.lower() not in ["authorization", "x-api-key"]})
-        logger.debug(f"{method} {url} | headers: {safe_headers}")
+        # Mask sensitive headers
+        safe_headers = {k: "***" if k.lower() in _SENSITIVE_HEADERS else v for k, v in headers.items()}
+        logger.debug("%s %s%s | headers: %s", method, self.base_url, url, safe_headers)
     
     def _handle_error(self, error: Exception, attempt: int) -> None:
         """Handle different error types and log them."""
-        logger.error(f"Request failed (attempt {attempt}): {type(error).__name__}: {str(error)}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Request failed (attempt %d): %s: %s", attempt, type(error).__name__, error)
     
+    @_with_retry_async
     async def get(self, path: str, **kwargs) -> Dict[str, Any]:
         """Make async GET request."""
-        url = urljoin(self.base_url, path)
-        self._log_request("GET", url, **kwargs)
-        
-        for attempt in range(1, self.retry_times + 1):
-            try:
-                response = await self._client.get(path, **kwargs)
-                return self._process_response(response)
-            except httpx.TimeoutException as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise TimeoutError(f"Request timeout after {self.retry_times} attempts") from e
-            except (httpx.ConnectError, httpx.NetworkError) as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(str(e)) from e
-            except httpx.HTTPError as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(f"HTTP error: {str(e)}") from e
+        self._log_request("GET", path, **kwargs)
+        return self._process_response(await self._client.get(path, **kwargs))
     
+    @_with_retry_async
     async def post(self, path: str, json: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
         """Make async POST request."""
-        url = urljoin(self.base_url, path)
-        self._log_request("POST", url, json=json, **kwargs)
-        
-        for attempt in range(1, self.retry_times + 1):
-            try:
-                response = await self._client.post(path, json=json, **kwargs)
-                return self._process_response(response)
-            except httpx.TimeoutException as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise TimeoutError(f"Request timeout after {self.retry_times} attempts") from e
-            except (httpx.ConnectError, httpx.NetworkError) as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(str(e)) from e
-            except httpx.HTTPError as e:
-                self._handle_error(e, attempt)
-                if attempt >= self.retry_times:
-                    raise NetworkError(f"HTTP error: {str(e)}") from e
+        self._log_request("POST", path, json=json, **kwargs)
+        return self._process_response(await self._client.post(path, json=json, **kwargs))
     
     async def stream(
         self, method: str, path: str, json: Optional[Dict[str, Any]] = None, **kwargs
-    ) -> httpx.Response:
-        """Make async streaming request for SSE."""
-        url = urljoin(self.base_url, path)
-        self._log_request(method, url, json=json, **kwargs)
+    ) -> AsyncIterator[str]:
+        """
+        Make async streaming request for SSE and yield response lines.
+        
+        Usage:
+            async for line in client.stream("POST", "/chat/stream", json=payload):
+                ...
+        
+        Raises:
+            NetworkError: Connection failure
+            TimeoutError: Request timeout
+            HTTPStatusError: Non-2xx HTTP status
+        """
+        self._log_request(method, path, json=json, **kwargs)
+        if method.upper() == "POST":
+            kwargs["json"] = json
         
         try:
-            if method.upper() == "POST":
-                response = self._client.stream(method, path, json=json, **kwargs)
-            else:
-                response = self._client.stream(method, path, **kwargs)
-            
-            # Check status code
-            if response.status_code >= 400:
-                response_text = await response.aread().decode()
-                raise HTTPStatusError(
-                    f"HTTP {response.status_code}: {response_text[:100]}",
-                    status_code=response.status_code,
-                    response_text=response_text,
-                )
-            
-            return response
-        except httpx.TimeoutException as e:
-            raise TimeoutError("Stream request timeout") from e
-        except (httpx.ConnectError, httpx.NetworkError) as e:
-            raise NetworkError(str(e)) from e
-        except HTTPStatusError:
-            raise
+            async with self._client.stream(method, path, **kwargs) as response:
+                if response.status_code >= 400:
+                    head = b""
+                    async for chunk in response.aiter_bytes():
+                        head += chunk
+                        if len(head) >= _ERROR_BODY_LIMIT:
+                            break
+                    response_text = _error_text(head)
+                    raise HTTPStatusError(
+                        f"HTTP {response.status_code}: {response_text[:100]}",
+                        status_code=response.status_code,
+                        response_text=response_text,
+                    )
+                async for line in response.aiter_lines():
+                    yield line
         except httpx.HTTPError as e:
-            raise NetworkError(f"HTTP error: {str(e)}") from e
+            raise _classify_error(e, "Stream request timeout") from e
     
     def _process_response(self, response: httpx.Response) -> Dict[str, Any]:
         """Process HTTP response."""
         if response.status_code >= 400:
-            response_text = response.text
+            response_text = _error_text(response.content)
             raise HTTPStatusError(
                 f"HTTP {response.status_code}: {response_text[:100]}",
                 status_code=response.status_code,
@@ -497,9 +573,9 @@ class AsyncAPIClient:
             )
         
         try:
-            return response.json()
+            return _json_loads(response.content)
         except (json.JSONDecodeError, ValueError) as e:
-            response_text = response.text
+            response_text = _error_text(response.content)
             raise JSONParseError(
                 f"Failed to parse JSON response: {str(e)}",
                 response_text=response_text,
@@ -10,7 +10,7 @@ import typer
 from app.cli.client import APIClient, APIError
 from app.cli.lib.state_manager import update_state
 from app.cli.lib.safe_output import emoji, safe_print, safe_print_err, decode_bytes
-from app.cli._globals import get_global_config
+from app.cli._globals import get_client
 
 
 def _read_input(file_path: Optional[str]) -> str:
@@ -110,9 +110,6 @@ def analyze(
         safe_print_err(f"{emoji('❌', '[ERROR]')} 缺少输入文本")
         raise typer.Exit(1)
     
-    # Get global config
-    config = get_global_config()
-    
     # Local agent mode
     if local_agent:
         try:
@@ -131,11 +128,7 @@ def analyze(
     else:
         # Remote API mode
         try:
-            api_client = APIClient(
-                base_url=config.api_base,
-                timeout=float(config.timeout),
-                retry_times=config.retry_times,
-            )
+            api_client = get_client()
             
             # Show progress
             safe_print_err(f"{emoji('🔍', '[1/4]')} 正在分析风险...")
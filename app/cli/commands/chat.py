@@ -2,26 +2,28 @@
 
 import atexit
 import datetime
-import json
 import os
 import signal
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, Generator, Optional
+from typing import Any, Dict, Generator, Optional, Union
 
 import httpx
 import typer
 
-from app.cli.client import APIClient, APIError, TimeoutError as APITimeoutError
-from app.cli.lib.chat_renderer import ChatRenderer
+from app.cli.client import APIClient, APIError, TimeoutError as APITimeoutError, _json_loads
+from app.cli.lib.chat_renderer import ChatRenderer, TokenBuffer
 from app.cli.lib.state_manager import get_state_value, update_state
-from app.cli._globals import get_global_config
+from app.cli._globals import get_client, get_global_config
 from app.cli.lib.safe_output import emoji, safe_print, safe_print_err, supports_unicode
 
 
 _renderer = ChatRenderer()
 
+_SSE_DATA_PREFIX = "data:"
+_SSE_DATA_PREFIX_BYTES = b"data:"
+
 
 # Detect if console supports unicode/emoji
 
@@ -148,33 +150,51 @@ def _merge_plain_text_with_buffer(first_line: str) -> tuple[str, list[str]]:
 
 
 
-def parse_sse_line(line: str) -> Optional[Dict[str, Any]]:
+def parse_sse_line(line: Union[str, bytes]) -> Optional[Dict[str, Any]]:
     """
     Parse a single SSE line.
     
     Args:
-        line: Raw SSE line (e.g., "data: {...}")
+        line: Raw SSE line as str or undecoded bytes (e.g., "data: {...}")
     
     Returns:
         Parsed event dict or None if not a data line
     """
-    if not line.strip():
-        return None
-    
-    if not line.startswith("data:"):
+    prefix = _SSE_DATA_PREFIX_BYTES if isinstance(line, bytes) else _SSE_DATA_PREFIX
+    if not line.startswith(prefix):
         return None
     
-    # Strip "data: " prefix
-    json_str = line[5:].strip()
-    # Normalize potential surrogate chars from terminal/stream decoding.
-    json_str = json_str.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
+    # Strip "data: " prefix. Both parsers accept UTF-8 bytes directly;
+    # encoding str with errors="replace" also normalizes stray surrogates.
+    payload = line[5:].strip()
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8", errors="replace")
     
     try:
-        return json.loads(json_str)
-    except (json.JSONDecodeError, UnicodeEncodeError, ValueError):
+        return _json_loads(payload)
+    except ValueError:
+        pass
+    # Invalid UTF-8 from the wire: retry once with replacement characters.
+    try:
+        return _json_loads(payload.decode("utf-8", errors="replace").encode("utf-8"))
+    except ValueError:
         return None
 
 
+def _iter_sse_lines(response: httpx.Response) -> Generator[bytes, None, None]:
+    """Split a raw byte stream into SSE lines without decoding to str."""
+    buffer = b""
+    for chunk in response.iter_bytes():
+        buffer += chunk
+        if b"\n" not in chunk:
+            continue
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
 def stream_chat_message(
     client: APIClient, session_id: str, user_input: str
 ) -> Generator[Dict[str, Any], None, None]:
@@ -196,12 +216,7 @@ def stream_chat_message(
         ctx_mgr = client.stream("POST", path, json=payload)
 
         with ctx_mgr as response:
-            for line in response.iter_lines():
-                if isinstance(line, bytes):
-                    line = line.decode("utf-8", errors="replace")
-                else:
-                    line = line.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
-                
+            for line in _iter_sse_lines(response):
                 event = parse_sse_line(line)
                 if event:
                     yield event
@@ -247,20 +262,7 @@ def handle_sse_stream(
     user_input = _normalize_input_text(user_input)
     log_fp = _open_cli_evidence_log(session_id=session_id)
 
-    token_buf: str = ""
-    last_flush = time.monotonic()
-    flush_interval_sec = 0.05
-    flush_chars = 48
-
-    def _flush_tokens(force_newline: bool = False) -> None:
-        nonlocal token_buf, last_flush
-        if token_buf:
-            render_token(token_buf)
-            _log_line(log_fp, f"[token] {token_buf}")
-            token_buf = ""
-            last_flush = time.monotonic()
-        if force_newline:
-            safe_print("")
+    tokens = TokenBuffer(_renderer, on_flush=lambda text: _log_line(log_fp, f"[token] {text}"))
 
     try:
         _log_line(log_fp, f"[session] {session_id}")
@@ -271,23 +273,17 @@ def handle_sse_stream(
             data = event.get("data", {})
 
             if event_type == "token":
-                content = data.get("content", "")
-                if content:
-                    token_buf += content
-
-                now = time.monotonic()
-                if len(token_buf) >= flush_chars or (token_buf and (now - last_flush) >= flush_interval_sec):
-                    _flush_tokens()
+                tokens.push(data.get("content", ""))
 
             elif event_type == "stage":
-                _flush_tokens(force_newline=True)
+                tokens.flush(newline=True)
                 stage = data.get("stage", "")
                 status = data.get("status", "")
                 render_stage(stage, status)
                 _log_line(log_fp, f"[stage] {stage} {status}")
 
             elif event_type == "message":
-                _flush_tokens(force_newline=True)
+                tokens.flush(newline=True)
                 message = data.get("message", {})
                 render_message(message)
 
@@ -302,22 +298,22 @@ def handle_sse_stream(
                     _log_line(log_fp, f"[references] {references[:10]}")
 
             elif event_type == "error":
-                _flush_tokens(force_newline=True)
+                tokens.flush(newline=True)
                 error_msg = data.get("message", "Unknown error")
                 render_error(error_msg)
                 _log_line(log_fp, f"[error] {error_msg}")
 
             elif event_type == "done":
-                _flush_tokens(force_newline=True)
+                tokens.flush(newline=True)
                 _log_line(log_fp, "[done]")
                 break
 
     except APIError as e:
-        _flush_tokens(force_newline=True)
+        tokens.flush(newline=True)
         _log_line(log_fp, f"[api_error] {e}")
         safe_print_err(f"\n{e.user_friendly_message()}")
     except Exception as e:
-        _flush_tokens(force_newline=True)
+        tokens.flush(newline=True)
         _log_line(log_fp, f"[unexpected_error] {e}")
         safe_print_err(f"\n{emoji('❌', '[ERROR]')} 意外错误: {e}")
     finally:
@@ -566,11 +562,7 @@ def chat(
     _try_enable_readline_history()
     
     # Initialize API client
-    client = APIClient(
-        base_url=config.api_base,
-        timeout=config.timeout,
-        retry_times=config.retry_times,
-    )
+    client = get_client()
     
     # Get or create session (prefer reusable backend session)
     selected_from_state = False
@@ -6,8 +6,8 @@ import typer
 from typing import Optional
 from pathlib import Path
 
-from app.cli.client import APIClient, APIError
-from app.cli._globals import get_global_config
+from app.cli.client import APIError
+from app.cli._globals import get_client
 from app.cli.lib.safe_output import emoji, safe_print, safe_print_err
 
 logger = logging.getLogger(__name__)
@@ -132,8 +132,7 @@ def content(
     """Generate response content (clarification statements, FAQ, platform-specific scripts)."""
 
     try:
-        config = get_global_config()
-        client = APIClient(base_url=config.api_base, timeout=config.timeout, retry_times=config.retry_times)
+        client = get_client()
         
         safe_print(f"[Fetching analysis data...] (record_id: {record_id})")
         
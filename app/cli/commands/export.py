@@ -7,9 +7,9 @@ from typing import Any, Optional
 
 import typer
 
-from app.cli._globals import get_global_config
+from app.cli._globals import get_client
 from app.cli.lib.safe_output import emoji, safe_print, safe_print_err
-from app.cli.client import APIClient, APIError
+from app.cli.client import APIError
 from app.cli.lib.state_manager import get_state_value, update_state
 
 
@@ -142,8 +142,6 @@ def export_cmd(
     ),
 ) -> None:
     """Export a history record as JSON or Markdown."""
-    config = get_global_config()
-
     if not record_id:
         record_id = get_state_value("bound_record_id") or None
     if not record_id:
@@ -156,7 +154,7 @@ def export_cmd(
         safe_print(f"{emoji('❌', '[ERROR]')} 不支持的导出格式: {format_type} (支持: json, markdown)", err=True)
         raise typer.Exit(1)
 
-    client = APIClient(base_url=config.api_base, timeout=config.timeout, retry_times=config.retry_times)
+    client = get_client()
     try:
         history_detail = client.get(f"/history/{record_id}")
     except APIError as e:
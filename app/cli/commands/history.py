@@ -7,8 +7,8 @@ from typing import Optional
 
 import typer
 
-from app.cli.client import APIClient, APIError
-from app.cli._globals import get_global_config
+from app.cli.client import APIError
+from app.cli._globals import get_client
 from app.cli.lib.safe_output import emoji, safe_print, safe_print_err
 
 
@@ -50,8 +50,7 @@ def list_history(
 ) -> None:
     """List recent analysis records."""
     try:
-        config = get_global_config()
-        client = APIClient(config.api_base_url, timeout_sec=config.timeout_sec)
+        client = get_client()
         
         response = client.get("/history", params={"limit": limit})
         
@@ -100,8 +99,7 @@ def show_history(
 ) -> None:
     """Show details of a specific record."""
     try:
-        config = get_global_config()
-        client = APIClient(config.api_base_url, timeout_sec=config.timeout_sec)
+        client = get_client()
         
         # Get record_id from argument or bound state
         if not record_id:
@@ -160,8 +158,7 @@ def submit_feedback(
 ) -> None:
     """Submit feedback for a record."""
     try:
-        config = get_global_config()
-        client = APIClient(config.api_base_url, timeout_sec=config.timeout_sec)
+        client = get_client()
         
         if feedback.lower() not in ["accurate", "inaccurate"]:
             safe_print_err(f"{emoji('❌', '[ERROR]')} 反馈必须是 'accurate' 或 'inaccurate'")
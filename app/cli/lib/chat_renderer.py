@@ -5,56 +5,68 @@ Provides consistent, GBK-safe rendering for stage/token/message/error blocks.
 
 from __future__ import annotations
 
-from typing import Any
+from functools import lru_cache
+from time import monotonic_ns
+from types import MappingProxyType
+from typing import Any, Callable, Optional
 
 from app.cli.lib.safe_output import emoji, safe_print
 
 
+_STAGE_EMOJI = MappingProxyType({
+    "risk": emoji("🔍", "[RISK]"),
+    "claims": emoji("📋", "[CLAIMS]"),
+    "evidence_search": emoji("🌐", "[SEARCH]"),
+    "evidence_align": emoji("🔗", "[ALIGN]"),
+    "report": emoji("📊", "[REPORT]"),
+    "simulation": emoji("🎭", "[SIM]"),
+    "content": emoji("✍️", "[WRITE]"),
+})
+
+_STATUS_EMOJI = MappingProxyType({
+    "running": emoji("⏳", "[LOADING]"),
+    "done": emoji("✅", "[DONE]"),
+    "failed": emoji("❌", "[FAILED]"),
+})
+
+_STAGE_NAME = MappingProxyType({
+    "risk": "风险快照",
+    "claims": "主张抽取",
+    "evidence_search": "证据检索",
+    "evidence_align": "证据对齐",
+    "report": "综合报告",
+    "simulation": "舆情预演",
+    "content": "应对内容",
+})
+
+_DEFAULT_STAGE_EMOJI = emoji("📌", "[MARK]")
+
+
+@lru_cache(maxsize=128)
+def _stage_line(stage: str, status: str) -> Optional[str]:
+    """Build (once per stage/status pair) the line printed for a stage event."""
+    name = _STAGE_NAME.get(stage, stage)
+    if status == "running":
+        return f"\n{_STAGE_EMOJI.get(stage, _DEFAULT_STAGE_EMOJI)} {name}中..."
+    if status == "done":
+        return f"{_STATUS_EMOJI[status]} {name}完成"
+    if status == "failed":
+        return f"{_STATUS_EMOJI[status]} {name}失败"
+    return None
+
+
 class ChatRenderer:
     """Render chat stream events with stable block structure."""
 
-    _STAGE_EMOJI = {
-        "risk": emoji("🔍", "[RISK]"),
-        "claims": emoji("📋", "[CLAIMS]"),
-        "evidence_search": emoji("🌐", "[SEARCH]"),
-        "evidence_align": emoji("🔗", "[ALIGN]"),
-        "report": emoji("📊", "[REPORT]"),
-        "simulation": emoji("🎭", "[SIM]"),
-        "content": emoji("✍️", "[WRITE]"),
-    }
-
-    _STATUS_EMOJI = {
-        "running": emoji("⏳", "[LOADING]"),
-        "done": emoji("✅", "[DONE]"),
-        "failed": emoji("❌", "[FAILED]"),
-    }
-
-    _STAGE_NAME = {
-        "risk": "风险快照",
-        "claims": "主张抽取",
-        "evidence_search": "证据检索",
-        "evidence_align": "证据对齐",
-        "report": "综合报告",
-        "simulation": "舆情预演",
-        "content": "应对内容",
-    }
-
     def render_token(self, content: str) -> None:
         """Render incremental token without newline."""
         safe_print(content, end="", flush=True)
 
     def render_stage(self, stage: str, status: str) -> None:
         """Render stage status line."""
-        stage_mark = self._STAGE_EMOJI.get(stage, emoji("📌", "[MARK]"))
-        status_mark = self._STATUS_EMOJI.get(status, "")
-        name = self._STAGE_NAME.get(stage, stage)
-
-        if status == "running":
-            safe_print(f"\n{stage_mark} {name}中...")
-        elif status == "done":
-            safe_print(f"{status_mark} {name}完成")
-        elif status == "failed":
-            safe_print(f"{status_mark} {name}失败")
+        line = _stage_line(stage, status)
+        if line is not None:
+            safe_print(line)
 
     def render_message(self, message: dict[str, Any]) -> None:
         """Render full assistant message block with separators."""
@@ -95,3 +107,48 @@ class ChatRenderer:
     def render_error(self, error_msg: str) -> None:
         """Render error block."""
         safe_print(f"\n{emoji('❌', '[ERROR]')} 错误: {error_msg}")
+
+
+class TokenBuffer:
+    """Coalesce streamed tokens so the terminal sees one write per batch.
+
+    Tokens are flushed once ``max_tokens`` are pending or ``max_delay_ns`` has
+    passed since the last flush (~30 Hz by default). Call ``flush()`` before
+    rendering any non-token block so output stays in order.
+    """
+
+    def __init__(
+        self,
+        renderer: ChatRenderer,
+        on_flush: Optional[Callable[[str], None]] = None,
+        max_tokens: int = 16,
+        max_delay_ns: int = 33_000_000,
+    ) -> None:
+        self._renderer = renderer
+        self._on_flush = on_flush
+        self._max_tokens = max_tokens
+        self._max_delay_ns = max_delay_ns
+        self._buf: list[str] = []
+        self._last_flush_ns = monotonic_ns()
+
+    def push(self, content: str) -> None:
+        """Queue a token, flushing when the batch is full or stale."""
+        if content:
+            self._buf.append(content)
+        if self._buf and (
+            len(self._buf) >= self._max_tokens
+            or monotonic_ns() - self._last_flush_ns > self._max_delay_ns
+        ):
+            self.flush()
+
+    def flush(self, newline: bool = False) -> None:
+        """Write pending tokens (if any), optionally followed by a newline."""
+        if self._buf:
+            text = "".join(self._buf)
+            self._buf.clear()
+            self._renderer.render_token(text)
+            if self._on_flush is not None:
+                self._on_flush(text)
+            self._last_flush_ns = monotonic_ns()
+        if newline:
+            safe_print("")
@@ -4,16 +4,45 @@ Local state management for CLI.
 Stores last record_id, session_id, and API base for convenience.
 """
 
+import contextlib
 import json
+import mmap
 import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on optional dependency
+    orjson = None
 
+
+def _json_loads(data: Any) -> Any:
+    # orjson parses a memoryview in place; stdlib json needs a bytes copy
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def _json_dumps(state: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(state, option=orjson.OPT_INDENT_2)
+    return json.dumps(state, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+# State files above this size are read through mmap
+_MMAP_MIN_SIZE = 4 * 1024
+
+
+@lru_cache(maxsize=1)
 def _get_state_file_path() -> Path:
     """
     Get the state file path based on OS.
     
+    Resolved once per process; the directory is created on first save.
+    
     Returns:
         Path to state.json file
     """
@@ -28,7 +57,6 @@ def _get_state_file_path() -> Path:
     else:  # Linux/macOS
         state_dir = Path.home() / ".truthcast"
     
-    state_dir.mkdir(parents=True, exist_ok=True)
     return state_dir / "state.json"
 
 
@@ -45,13 +73,42 @@ def load_state() -> Dict[str, Any]:
         return {}
     
     try:
-        with open(state_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        with open(state_file, "rb") as f:
+            # Large files are parsed straight from the page cache; small ones
+            # aren't worth the mmap setup cost.
+            if os.fstat(f.fileno()).st_size > _MMAP_MIN_SIZE:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return _json_loads(view)
+            return _json_loads(f.read())
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError, IOError):
         # If corrupted, return empty state
         return {}
 
 
+def _write_atomic(state_file: Path, data: bytes) -> None:
+    # Write a private sibling temp file and swap it in, so an interrupted or
+    # concurrent save never publishes a torn state.json. mkstemp gives each
+    # writer its own file (mode 0600); the buffered writer retries short
+    # writes, and on any failure the temp file is removed before re-raising.
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=state_file.parent, prefix=".state.", suffix=".tmp")
+    except FileNotFoundError:
+        # Only the path is cached: (re)create the directory if it is
+        # missing, e.g. on first use or after it was removed.
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=state_file.parent, prefix=".state.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, state_file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
 def save_state(state: Dict[str, Any]) -> None:
     """
     Save state to local file.
@@ -62,9 +119,8 @@ def save_state(state: Dict[str, Any]) -> None:
     state_file = _get_state_file_path()
     
     try:
-        with open(state_file, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
-    except IOError:
+        _write_atomic(state_file, _json_dumps(state))
+    except (IOError, OSError):
         # Silently fail if cannot write
         pass
 
@@ -78,6 +134,8 @@ def update_state(key: str, value: Any) -> None:
         value: Value to set
     """
     state = load_state()
+    if not isinstance(state, dict):
+        state = {}
     state[key] = value
     save_state(state)
 
@@ -13,7 +13,7 @@ from urllib import error, request
 
 import typer
 
-from app.cli._globals import get_global_config
+from app.cli._globals import get_client, get_global_config
 from app.cli.client import APIClient, APIError
 from app.cli.lib.state_manager import update_state
 from app.services.json_utils import safe_json_loads
@@ -33,12 +33,7 @@ def run_pipeline_locally(text: str) -> dict[str, Any]:
     This keeps the public callable expected by analyze command while reusing
     the same backend pipeline request path.
     """
-    config = get_global_config()
-    client = APIClient(
-        base_url=config.api_base,
-        timeout=float(config.timeout),
-        retry_times=config.retry_times,
-    )
+    client = get_client()
     try:
         return _run_analysis_pipeline(client, text)
     finally:
@@ -178,11 +173,7 @@ def run_local_agent_repl() -> bool:
     typer.echo("=" * 60)
     typer.echo("输入 /help 查看帮助；输入 /exit 退出。\n")
 
-    client = APIClient(
-        base_url=config.api_base,
-        timeout=config.timeout,
-        retry_times=config.retry_times,
-    )
+    client = get_client()
 
     try:
         while True:
@@ -5,10 +5,12 @@ Provides command-line interface for fake news detection, opinion simulation,
 and content generation.
 """
 
+import importlib
 import sys
 from pathlib import Path
 
 import typer
+from typer.core import TyperGroup
 
 # Load project environment variables immediately upon module import
 from app.core.env_loader import load_project_env
@@ -16,8 +18,7 @@ from app.core.env_loader import load_project_env
 # Initialize environment before any other imports that depend on it
 load_project_env()
 
-# Now safe to import the rest
-from app.cli.commands import analyze, chat, content, export, history, repl, simulate, state
+# Now safe to import the rest (command modules are imported lazily, see _LazyGroup)
 from app.cli.config import get_config
 from app.cli._globals import set_global_config, get_global_config
 from app.cli.lib.state_manager import update_state
@@ -71,23 +72,51 @@ def config_callback(
         pass
 
 
+# Command name -> (module, function), in help listing order. A module is only
+# imported when its command is resolved, so one invocation doesn't pull in
+# every command's dependencies.
+_LAZY_COMMANDS = {
+    "chat": ("app.cli.commands.chat", "chat"),
+    "repl": ("app.cli.commands.repl", "repl"),
+    "analyze": ("app.cli.commands.analyze", "analyze"),
+    "simulate": ("app.cli.commands.simulate", "simulate"),
+    "history": ("app.cli.commands.history", "history"),
+    "content": ("app.cli.commands.content", "content"),
+    "export": ("app.cli.commands.export", "export_cmd"),
+    "state": ("app.cli.commands.state", "state"),
+}
+
+
+class _LazyGroup(TyperGroup):
+    """Typer group that builds each subcommand on first lookup."""
+
+    def list_commands(self, ctx):
+        return list(_LAZY_COMMANDS)
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in _LAZY_COMMANDS:
+            module_name, attr = _LAZY_COMMANDS[cmd_name]
+            func = getattr(importlib.import_module(module_name), attr)
+            # Build the bare command as app.command() would; wrapping it in a
+            # throwaway Typer app would add --install/--show-completion to it.
+            command = typer.main.get_command_from_info(
+                typer.models.CommandInfo(name=cmd_name, callback=func),
+                pretty_exceptions_short=True,
+                rich_markup_mode=self.rich_markup_mode,
+            )
+            self.add_command(command, cmd_name)
+        return command
+
+
 app = typer.Typer(
     name="truthcast",
     help="TruthCast: Fake news detection + opinion simulation intelligent system",
     no_args_is_help=True,
     callback=config_callback,
+    cls=_LazyGroup,
 )
 
-# Register command groups
-app.command()(chat.chat)
-app.command(name="repl")(repl.repl)
-app.command()(analyze.analyze)
-app.command()(simulate.simulate)
-app.command()(history.history)
-app.command()(content.content)
-app.command(name="export")(export.export_cmd)
-app.command()(state.state)
-
 
 
 
@@ -2,103 +2,343 @@
 app/core/cache.py
 -----------------
 轻量级内存缓存（TTLCache），用于缓存高成本 LLM 调用结果。
-键由输入文本的 SHA-256 哈希构成，避免存储原始文本。
+键由输入文本的哈希构成，避免存储原始文本：安装 xxhash（speedups 可选依赖）时
+使用 XXH3-128，否则使用 SHA-256。键仅在进程内存中使用，两种算法可任意切换。
+
+detect_cache / claims_cache 为同一 TTLCache 存储上的两个命名空间视图（TTLCacheView），
+共享 LRU 容量、各自保留 TTL。
+
+SemanticTextCache 为近似匹配层：同一分组内按字符二元组 Jaccard 相似度命中，
+用于吸收仅有空白/标点/少量措辞差异的重复请求。
+
+AsyncSingleFlight 合并同键的并发未命中：首个请求执行生成，其余请求等待同一结果，
+避免缓存写入前的重复请求各自再调用一次 LLM。
 
 环境变量：
   TRUTHCAST_CACHE_DETECT_TTL   风险快照缓存 TTL（秒，默认 300）
   TRUTHCAST_CACHE_CLAIMS_TTL   主张抽取缓存 TTL（秒，默认 300）
+  TRUTHCAST_CACHE_CONTENT_TTL  应对内容生成缓存 TTL（秒，默认 3600）
   TRUTHCAST_CACHE_MAX_SIZE     最大缓存条目数（默认 100）
+  TRUTHCAST_CACHE_SEMANTIC_THRESHOLD  近似匹配相似度阈值（默认 0.95）
 """
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import os
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from threading import Lock
-from typing import Any
+from typing import Any, Awaitable, Callable
 
+from app.core.env_loader import float_env, int_env
 from app.core.logger import get_logger
 
 logger = get_logger("truthcast.cache")
 
+try:
+    from xxhash import xxh3_128_hexdigest as _digest
+except ImportError:  # pragma: no cover - 取决于可选依赖
 
-def _int_env(key: str, default: int) -> int:
-    try:
-        return int(os.getenv(key, default))
-    except (ValueError, TypeError):
-        return default
+    def _digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
 
 
 class TTLCache:
-    """简单线程安全 TTL 内存缓存（不依赖第三方库）"""
+    """简单线程安全 TTL + LRU 内存缓存（不依赖第三方库）
+
+    条目按最近访问顺序保存在 OrderedDict 中，满容量时 O(1) 淘汰最久未使用的条目；
+    查找不加锁，仅命中后调整 LRU 顺序时持锁；过期条目视为未命中，由写入时回收。
+    """
 
     def __init__(self, maxsize: int, ttl: int) -> None:
         self._maxsize = maxsize
         self._ttl = ttl
-        self._store: dict[str, tuple[Any, float]] = {}  # key -> (value, expire_at)
+        # 过期时间以 monotonic_ns 整数纳秒保存，读写时只做整数加法/比较
+        self._ttl_ns = ttl * 1_000_000_000
+        self._store: OrderedDict[str, tuple[Any, int]] = OrderedDict()  # key -> (value, expire_at_ns)
         self._lock = Lock()
 
     def _text_key(self, text: str) -> str:
-        # 仅做首尾空白归一，不做 lower()——中文无大小写，英文大小写可能语义不同
-        return hashlib.sha256(text.strip().encode()).hexdigest()
+        # 仅做首尾空白归一，不做 lower()——中文无大小写，英文大小写可能语义不同；
+        # 首尾本无空白时（常见情况）跳过 strip()，少复制一份文本
+        if text and (text[0].isspace() or text[-1].isspace()):
+            text = text.strip()
+        return _digest(text.encode())
 
     def get(self, text: str) -> Any | None:
+        return self._get_key(self._text_key(text))
+
+    def set(self, text: str, value: Any) -> None:
+        self._set_key(self._text_key(text), value)
+
+    def delete(self, text: str) -> None:
+        with self._lock:
+            self._store.pop(self._text_key(text), None)
+
+    def get_or_set(self, text: str, producer: Callable[[], Any]) -> tuple[Any, bool]:
+        """命中返回 (缓存值, True)；未命中调用 producer 生成并写入，返回 (新值, False)
+
+        文本只哈希一次；producer 在锁外执行，不阻塞其他读写（并发未命中可能各自生成一次）。
+        """
         key = self._text_key(text)
+        value = self._get_key(key)
+        if value is not None:
+            return value, True
+        value = producer()
+        self._set_key(key, value)
+        return value, False
+
+    def _get_key(self, key: str) -> Any | None:
+        # 查找与过期判断不加锁（单次 dict.get 在 GIL 下是原子的），未命中/过期时不争锁；
+        # 过期条目按未命中处理，留给 _set_key 回收。
+        # 命中后调整 LRU 顺序会改变 OrderedDict 的迭代顺序，须持锁进行，
+        # 否则与 _set_key 回收队首、TTLCacheView.clear 遍历等 Python 层迭代并发时会报
+        # "OrderedDict mutated during iteration"
+        entry = self._store.get(key)
+        if entry is None or time.monotonic_ns() > entry[1]:
+            return None
         with self._lock:
-            entry = self._store.get(key)
-            if entry is None:
-                return None
-            value, expire_at = entry
-            if time.monotonic() > expire_at:
-                del self._store[key]
-                return None
-            return value
+            try:
+                self._store.move_to_end(key)
+            except KeyError:
+                # 读取与淘汰并发：条目已被移除，值仍可返回
+                pass
+        return entry[0]
+
+    def _set_key(self, key: str, value: Any, ttl_ns: int | None = None) -> None:
+        now = time.monotonic_ns()
+        expire_at = now + (self._ttl_ns if ttl_ns is None else ttl_ns)
+        with self._lock:
+            store = self._store
+            # 顺带回收队首已过期的条目
+            while store:
+                head = next(iter(store))
+                if head == key or store[head][1] >= now:
+                    break
+                del store[head]
+            if key in store:
+                store.move_to_end(key)
+            elif len(store) >= self._maxsize:
+                # 淘汰最久未使用的条目
+                store.popitem(last=False)
+            store[key] = (value, expire_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    @property
+    def ttl(self) -> int:
+        return self._ttl
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class TTLCacheView:
+    """共享 TTLCache 存储上的命名空间视图，接口与 TTLCache 一致
+
+    多个视图共用同一份 LRU 容量，热点视图可占用冷门视图让出的空间；
+    各视图保留独立 TTL，键以 "命名空间:" 为前缀互不冲突。
+    """
+
+    def __init__(self, store: TTLCache, namespace: str, ttl: int) -> None:
+        self._store = store
+        self._prefix = namespace + ":"
+        self._ttl = ttl
+        self._ttl_ns = ttl * 1_000_000_000
+
+    def _text_key(self, text: str) -> str:
+        return self._prefix + self._store._text_key(text)
+
+    def get(self, text: str) -> Any | None:
+        return self._store._get_key(self._text_key(text))
 
     def set(self, text: str, value: Any) -> None:
+        self._store._set_key(self._text_key(text), value, self._ttl_ns)
+
+    def get_or_set(self, text: str, producer: Callable[[], Any]) -> tuple[Any, bool]:
+        """同 TTLCache.get_or_set"""
         key = self._text_key(text)
+        value = self._store._get_key(key)
+        if value is not None:
+            return value, True
+        value = producer()
+        self._store._set_key(key, value, self._ttl_ns)
+        return value, False
+
+    def clear(self) -> None:
+        """仅清除本命名空间的条目"""
+        store = self._store
+        with store._lock:
+            for key in [k for k in store._store if k.startswith(self._prefix)]:
+                del store._store[key]
+
+    @property
+    def ttl(self) -> int:
+        return self._ttl
+
+    def __len__(self) -> int:
+        return sum(1 for key in list(self._store._store) if key.startswith(self._prefix))
+
+
+def _char_bigrams(text: str) -> frozenset[str]:
+    # 去除全部空白后取字符二元组：中文无需分词，英文对空白差异不敏感
+    compact = "".join(text.split())
+    if len(compact) < 2:
+        return frozenset((compact,)) if compact else frozenset()
+    return frozenset(compact[i : i + 2] for i in range(len(compact) - 1))
+
+
+class SemanticTextCache:
+    """按文本相似度命中的 TTL 内存缓存（线程安全，不依赖第三方库）
+
+    bucket 为必须精确一致的上下文（如报告、风格、平台），text 为允许近似的文本。
+    """
+
+    def __init__(self, maxsize: int, ttl: int, threshold: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._threshold = threshold
+        # bucket_key -> [(bigrams, value, expire_at)]
+        self._buckets: dict[str, list[tuple[frozenset[str], Any, float]]] = {}
+        self._size = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def _bucket_key(bucket: str) -> str:
+        return _digest(bucket.encode())
+
+    def get(self, bucket: str, text: str) -> Any | None:
+        key = self._bucket_key(bucket)
+        grams = _char_bigrams(text)
+        if not grams:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entries = self._buckets.get(key)
+            if not entries:
+                return None
+            alive = [entry for entry in entries if entry[2] > now]
+            self._size -= len(entries) - len(alive)
+            if alive:
+                self._buckets[key] = alive
+            else:
+                del self._buckets[key]
+                return None
+
+            best_value: Any | None = None
+            best_score = 0.0
+            for cached_grams, value, _ in alive:
+                union = len(grams | cached_grams)
+                score = len(grams & cached_grams) / union if union else 0.0
+                if score > best_score:
+                    best_score, best_value = score, value
+            return best_value if best_score >= self._threshold else None
+
+    def set(self, bucket: str, text: str, value: Any) -> None:
+        key = self._bucket_key(bucket)
+        grams = _char_bigrams(text)
+        if not grams:
+            return
         expire_at = time.monotonic() + self._ttl
         with self._lock:
-            # 超出 maxsize 时先清除已过期条目，再按最早过期时间淘汰
-            if len(self._store) >= self._maxsize and key not in self._store:
-                now = time.monotonic()
-                # 先尝试清除所有已过期条目
-                expired_keys = [k for k, (_, exp) in self._store.items() if exp <= now]
-                for k in expired_keys:
-                    del self._store[k]
-                # 若仍超出则淘汰最早过期的条目（近似 LRU）
-                if len(self._store) >= self._maxsize:
-                    lru_key = min(self._store, key=lambda k: self._store[k][1])
-                    del self._store[lru_key]
-            self._store[key] = (value, expire_at)
+            if self._size >= self._maxsize:
+                # 淘汰最早过期的条目（近似 LRU）
+                oldest_key = min(self._buckets, key=lambda k: self._buckets[k][0][2])
+                entries = self._buckets[oldest_key]
+                entries.pop(0)
+                if not entries:
+                    del self._buckets[oldest_key]
+                self._size -= 1
+            self._buckets.setdefault(key, []).append((grams, value, expire_at))
+            self._size += 1
 
     def clear(self) -> None:
         with self._lock:
-            self._store.clear()
+            self._buckets.clear()
+            self._size = 0
 
     @property
     def ttl(self) -> int:
         return self._ttl
 
     def __len__(self) -> int:
-        return len(self._store)
+        return self._size
 
 
-# ---- 全局缓存实例 ----
-_maxsize = _int_env("TRUTHCAST_CACHE_MAX_SIZE", 100)
+class AsyncSingleFlight:
+    """同键并发协程去重（asyncio）
+
+    run(key, producer) 在该键无进行中任务时以 producer() 创建任务，否则等待已有任务。
+    任务经 asyncio.shield 等待：单个调用方被取消（如客户端断开）不会中断其他等待者；
+    任务结束后立即移除，结果的持久化交给 producer 自己写缓存。
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task[Any]] = {}
+
+    async def run(self, key: str, producer: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        # 任务绑定事件循环；其他循环遗留的任务（如测试中的不同 TestClient）不复用
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(producer())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待者都已取消时，标记异常已读取，避免 "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
 
-detect_cache = TTLCache(
-    maxsize=_maxsize,
-    ttl=_int_env("TRUTHCAST_CACHE_DETECT_TTL", 300),
+@dataclass(frozen=True, slots=True)
+class CacheSettings:
+    """缓存配置，模块导入时从环境变量读取一次"""
+
+    max_size: int
+    detect_ttl: int
+    claims_ttl: int
+    content_ttl: int
+    semantic_threshold: float
+
+
+SETTINGS = CacheSettings(
+    max_size=int_env("TRUTHCAST_CACHE_MAX_SIZE", 100),
+    detect_ttl=int_env("TRUTHCAST_CACHE_DETECT_TTL", 300),
+    claims_ttl=int_env("TRUTHCAST_CACHE_CLAIMS_TTL", 300),
+    content_ttl=int_env("TRUTHCAST_CACHE_CONTENT_TTL", 3600),
+    semantic_threshold=float_env("TRUTHCAST_CACHE_SEMANTIC_THRESHOLD", 0.95),
 )
 
-claims_cache = TTLCache(
-    maxsize=_maxsize,
-    ttl=_int_env("TRUTHCAST_CACHE_CLAIMS_TTL", 300),
+
+# ---- 全局缓存实例 ----
+# 风险快照与主张抽取共用一份存储（容量为两者之和），按命名空间区分键
+_detect_store = TTLCache(maxsize=2 * SETTINGS.max_size, ttl=SETTINGS.detect_ttl)
+
+detect_cache = TTLCacheView(_detect_store, "d", ttl=SETTINGS.detect_ttl)
+
+claims_cache = TTLCacheView(_detect_store, "c", ttl=SETTINGS.claims_ttl)
+
+content_cache = TTLCache(maxsize=SETTINGS.max_size, ttl=SETTINGS.content_ttl)
+
+content_semantic_cache = SemanticTextCache(
+    maxsize=SETTINGS.max_size,
+    ttl=SETTINGS.content_ttl,
+    threshold=SETTINGS.semantic_threshold,
 )
 
 logger.info(
-    "缓存已初始化：maxsize=%d, detect_ttl=%ds, claims_ttl=%ds",
-    _maxsize,
-    detect_cache.ttl,
-    claims_cache.ttl,
+    "缓存已初始化：maxsize=%d, detect_ttl=%ds, claims_ttl=%ds, content_ttl=%ds",
+    SETTINGS.max_size,
+    SETTINGS.detect_ttl,
+    SETTINGS.claims_ttl,
+    SETTINGS.content_ttl,
 )
@@ -1,59 +1,60 @@
 """
 app/core/concurrency.py
 -----------------------
-全局 LLM 并发限流（基于 threading.Semaphore）。
+全局 LLM 并发限流。
 
 同一时刻允许并发进行的 LLM 调用数受 Semaphore 控制，超过等待队列时间则
 抛出 429 Too Busy，避免对下游 LLM API 造成突发大量请求。
 
-所有路由为同步 def，故使用 threading.Semaphore 而非 asyncio.Semaphore。
+同步 def 路由（detect/chat，运行在线程池中）使用 llm_slot()（threading.Semaphore）；
+async def 路由（content）使用 llm_slot_async()（asyncio.Semaphore），等待期间
+不占用事件循环线程，也无需借道 run_in_executor。
+
+两个信号量各自按 TRUTHCAST_LLM_CONCURRENCY 计数：上限分别作用于同步路由与
+content 路由，两类同时满载时进程内最多约有 2 倍于该值的 LLM 调用在进行。
+按下游 API 配额设置时请据此折算（每个 worker 进程另计）。
 
 环境变量：
-  TRUTHCAST_LLM_CONCURRENCY       最大并发 LLM 调用数（默认 5）
+  TRUTHCAST_LLM_CONCURRENCY       每类路由的最大并发 LLM 调用数（默认 5）
   TRUTHCAST_MAX_QUEUE_WAIT_SEC    最大等待秒数（默认 30）
 """
 from __future__ import annotations
 
-import os
+import asyncio
 import threading
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Generator
 
 from fastapi import HTTPException
 
+from app.core.env_loader import int_env
 from app.core.logger import get_logger
 
 logger = get_logger("truthcast.concurrency")
 
+_concurrency = int_env("TRUTHCAST_LLM_CONCURRENCY", 5)
+_max_wait = int_env("TRUTHCAST_MAX_QUEUE_WAIT_SEC", 30)
 
-def _int_env(key: str, default: int) -> int:
-    try:
-        return int(os.getenv(key, default))
-    except (ValueError, TypeError):
-        return default
-
-
-_concurrency = _int_env("TRUTHCAST_LLM_CONCURRENCY", 5)
-_max_wait = _int_env("TRUTHCAST_MAX_QUEUE_WAIT_SEC", 30)
-
-# 全局信号量；由 init_semaphore() 在 FastAPI lifespan 启动时设置。
+# 全局信号量在模块导入时即创建（每个 worker 进程各自导入一次，prefork 安全），
+# 热路径上无需再做 None 判断；init_semaphore() 在 FastAPI lifespan 启动时重建。
 # 注意：单元测试若不走 lifespan，请在 fixture 中 mock 该变量或直接调用 init_semaphore()，
 # 避免不同测试复用同一计数器导致状态泄露。
-_semaphore: threading.Semaphore | None = None
+_semaphore: threading.Semaphore = threading.Semaphore(_concurrency)
+# asyncio.Semaphore 首次争用时绑定事件循环，故同样在 lifespan 中（即目标循环内）重建
+_async_semaphore: asyncio.Semaphore = asyncio.Semaphore(_concurrency)
 
 
 def init_semaphore() -> None:
     """在 FastAPI lifespan 启动时初始化 Semaphore"""
-    global _semaphore
+    global _semaphore, _async_semaphore
     _semaphore = threading.Semaphore(_concurrency)
+    _async_semaphore = asyncio.Semaphore(_concurrency)
     logger.info("并发限流已初始化：max_concurrency=%d, max_wait=%ds", _concurrency, _max_wait)
 
 
-def _get_semaphore() -> threading.Semaphore:
-    global _semaphore
-    if _semaphore is None:
-        _semaphore = threading.Semaphore(_concurrency)
-    return _semaphore
+def _raise_busy() -> None:
+    logger.warning("LLM 并发等待超时（%ds），返回 429", _max_wait)
+    raise HTTPException(status_code=429, detail="服务繁忙，等待超时，请稍后重试")
 
 
 @contextmanager
@@ -62,11 +63,27 @@ def llm_slot() -> Generator[None, None, None]:
     同步上下文管理器，限制同时持有的 LLM 调用槽位。
     超时视为请求过载，抛出 HTTP 429。
     """
-    sem = _get_semaphore()
+    sem = _semaphore
     acquired = sem.acquire(timeout=_max_wait)
     if not acquired:
-        logger.warning("LLM 并发等待超时（%ds），返回 429", _max_wait)
-        raise HTTPException(status_code=429, detail="服务繁忙，等待超时，请稍后重试")
+        _raise_busy()
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+@asynccontextmanager
+async def llm_slot_async() -> AsyncGenerator[None, None]:
+    """
+    llm_slot() 的异步版本，供 async def 路由使用。
+    超时视为请求过载，抛出 HTTP 429。
+    """
+    sem = _async_semaphore
+    try:
+        await asyncio.wait_for(sem.acquire(), _max_wait)
+    except asyncio.TimeoutError:
+        _raise_busy()
     try:
         yield
     finally:
@@ -1,7 +1,32 @@
 import os
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
+def int_env(key: str, default: int) -> int:
+    """按 (key, default) 读取一次整型环境变量；非法值回退默认值"""
+    try:
+        return int(os.getenv(key, default))
+    except (ValueError, TypeError):
+        return default
+
+
+@lru_cache(maxsize=None)
+def float_env(key: str, default: float) -> float:
+    """按 (key, default) 读取一次浮点环境变量；非法值回退默认值"""
+    try:
+        return float(os.getenv(key, default))
+    except (ValueError, TypeError):
+        return default
+
+
+def reset_env_cache() -> None:
+    """清空 int_env/float_env 的读取缓存（环境变量变更后或测试 fixture 中调用）"""
+    int_env.cache_clear()
+    float_env.cache_clear()
+
+
 def load_project_env(override: bool = False) -> None:
     root_env = Path(__file__).resolve().parents[2] / ".env"
     if not root_env.exists():
@@ -25,3 +50,5 @@ def load_project_env(override: bool = False) -> None:
 
         if override or key not in os.environ:
             os.environ[key] = value
+
+    reset_env_cache()
@@ -18,6 +18,7 @@ from app.api.routes_pipeline_state import router as pipeline_router
 from app.core.concurrency import init_semaphore
 from app.services.history_store import init_db
 from app.services.chat_store import init_db as init_chat_db
+from app.services.content_generation import aclose_http_client
 
 
 @asynccontextmanager
@@ -27,7 +28,8 @@ async def lifespan(app: FastAPI):
     init_chat_db()
     init_semaphore()
     yield
-    # 关闭时清理（预留）
+    # 关闭时清理：释放内容生成的共享 HTTP 连接池
+    await aclose_http_client()
 
 
 app = FastAPI(title="TruthCast MVP", version="0.1.0", lifespan=lifespan)
@@ -1,10 +1,31 @@
 from __future__ import annotations
 
-from typing import Any, Literal
+from enum import StrEnum
+from typing import Any
 
 from pydantic import BaseModel, Field
 
 
+# 枚举成员为单例，校验走 pydantic-core 的枚举查表；StrEnum 与原字面量字符串可直接比较/序列化
+class ChatRole(StrEnum):
+    USER = "user"
+    ASSISTANT = "assistant"
+    SYSTEM = "system"
+
+
+class ChatActionType(StrEnum):
+    LINK = "link"
+    COMMAND = "command"
+
+
+class ChatStreamEventType(StrEnum):
+    TOKEN = "token"
+    STAGE = "stage"
+    MESSAGE = "message"
+    DONE = "done"
+    ERROR = "error"
+
+
 class ChatReference(BaseModel):
     title: str
     href: str
@@ -12,7 +33,7 @@ class ChatReference(BaseModel):
 
 
 class ChatAction(BaseModel):
-    type: Literal["link", "command"]
+    type: ChatActionType
     label: str
     href: str | None = None
     command: str | None = None
@@ -20,7 +41,7 @@ class ChatAction(BaseModel):
 
 class ChatMessage(BaseModel):
     id: str | None = None
-    role: Literal["user", "assistant", "system"]
+    role: ChatRole
     content: str
     actions: list[ChatAction] = Field(default_factory=list)
     references: list[ChatReference] = Field(default_factory=list)
@@ -67,6 +88,6 @@ class ChatResponse(BaseModel):
 
 
 class ChatStreamEvent(BaseModel):
-    type: Literal["token", "stage", "message", "done", "error"]
+    type: ChatStreamEventType
     data: dict[str, Any]
 
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import re
-from typing import Any, Iterator, Literal
+from itertools import chain, islice
+from typing import Any, Callable, Iterator, Literal
 
 from pydantic import BaseModel, Field
+from pydantic_core import to_json
 
 from app.core.concurrency import llm_slot
 from app.core.guardrails import (
@@ -12,7 +13,7 @@ from app.core.guardrails import (
     validate_tool_call,
 )
 from app.orchestrator import orchestrator
-from app.schemas.chat import ChatAction, ChatMessage, ChatReference, ChatStreamEvent
+from app.schemas.chat import ChatAction, ChatMessage, ChatReference
 from app.services.history_store import get_history, list_history, save_report
 from app.services.intent_classifier import (
     IntentName,
@@ -23,6 +24,70 @@ from app.services.pipeline import align_evidences
 from app.services.risk_snapshot import detect_risk_snapshot
 
 
+# 每种事件的固定前缀预先拼好，逐条只序列化变化的 data 部分
+_SSE_PREFIXES: dict[str, str] = {
+    event_type: 'data: {"type":' + to_json(event_type).decode() + ',"data":'
+    for event_type in ("token", "stage", "message", "done", "error")
+}
+
+
+def sse_event(event_type: str, data: dict[str, Any]) -> str:
+    """生成 SSE 事件字符串（结构同 ChatStreamEvent）。
+
+    事件类型均为代码内字面量，无需逐条走模型校验；直接由 pydantic-core 序列化字典。
+    """
+    return _SSE_PREFIXES[event_type] + to_json(data).decode() + "}\n\n"
+
+
+def _emit_token(session_id: str, content: str) -> str:
+    return sse_event("token", {"content": content, "session_id": session_id})
+
+
+def _emit_message(session_id: str, msg: ChatMessage) -> str:
+    return sse_event("message", {"session_id": session_id, "message": msg})
+
+
+def _emit(buf: list[str], text: str) -> None:
+    """暂存一行进度文本，等到下一个耗时调用前（或收尾时）再统一下发。"""
+    buf.append(text)
+
+
+def _flush_tokens(session_id: str, buf: list[str]) -> str:
+    """把暂存的进度行合并为一个 token 帧并清空缓冲；缓冲为空时返回空串。"""
+    if not buf:
+        return ""
+    content = "".join(buf)
+    buf.clear()
+    return _emit_token(session_id, content)
+
+
+# 多处回复复用的固定动作，导入时构造一次（共享实例，调用方不得修改）
+_ACTION_OPEN_HISTORY = ChatAction(type="link", label="打开历史记录", href="/history")
+_ACTION_OPEN_RESULT = ChatAction(type="link", label="打开检测结果", href="/result")
+_ACTION_MORE_EVIDENCE = ChatAction(
+    type="command", label="补充证据（/more_evidence）", command="/more_evidence"
+)
+_ACTION_HELP = ChatAction(type="command", label="查看帮助", command="/help")
+
+
+def _record_not_found(record_id: str) -> ChatMessage:
+    return ChatMessage(
+        role="assistant",
+        content=f"未找到历史记录：{record_id}。",
+        actions=[_ACTION_OPEN_HISTORY],
+        references=[],
+    )
+
+
+def _history_ref(record: dict[str, Any]) -> ChatReference:
+    """历史记录引用卡片（风险 + 时间），各工具回复共用。"""
+    return ChatReference(
+        title=f"历史记录：{record['id']}",
+        href="/history",
+        description=f"风险: {record.get('risk_label')}（{record.get('risk_score')}） · 时间: {record.get('created_at')}",
+    )
+
+
 class ToolAnalyzeArgs(BaseModel):
     text: str = Field(min_length=1, max_length=12000)
     force: bool = Field(default=False)
@@ -119,20 +184,29 @@ ToolName = Literal[
 
 
 def _is_analyze_intent(text: str) -> bool:
-    t = text.strip()
-    return t.startswith("/analyze")
+    # 调用方（parse_tool）已 strip，不再重复扫描/复制长文本
+    return text.startswith("/analyze")
+
+
+def _has_analyze_force_flag(text: str) -> bool:
+    """判断是否为 "/analyze force=true ..." 形式（force=true 须为命令后的独立参数）"""
+    parts = text.split(None, 2)
+    if len(parts) < 2 or parts[0] != "/analyze" or not parts[1].startswith("force=true"):
+        return False
+    tail = parts[1][len("force=true") :]
+    return not tail or not (tail[0].isalnum() or tail[0] == "_")
 
 
 def _extract_analyze_text(text: str) -> str:
-    t = text.strip()
-    if t.startswith("/analyze"):
-        body = t[len("/analyze") :].strip()
+    # 入参须已 strip（同 _is_analyze_intent）
+    if text.startswith("/analyze"):
+        body = text[len("/analyze") :].strip()
         if body.startswith("force=true"):
             return body[len("force=true") :].strip()
         if body.startswith("force=false"):
             return body[len("force=false") :].strip()
         return body
-    return t
+    return text
 
 
 def _extract_payload_text(raw_text: str) -> str:
@@ -175,6 +249,181 @@ def _parse_command_kv(tokens: list[str]) -> dict[str, str]:
     return kv
 
 
+def _bound_record_id(meta: dict[str, Any]) -> str:
+    return str(meta.get("record_id") or meta.get("bound_record_id") or "")
+
+
+# ---- 斜杠命令解析：每个解析函数接收命令名之后的剩余文本与 session meta ----
+_CommandResult = tuple[ToolName, dict[str, Any]]
+
+
+def _cmd_load_history(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split(None, 1)
+    return ("load_history", {"record_id": parts[0] if parts else ""})
+
+
+def _cmd_why(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split(None, 1)
+    record_id = parts[0] if parts else ""
+    return ("why", {"record_id": record_id or _bound_record_id(meta)})
+
+
+def _cmd_list(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split(None, 1)
+    limit = 10
+    if parts:
+        try:
+            limit = int(parts[0].removeprefix("limit="))
+        except ValueError:
+            limit = 10
+    return ("list", {"limit": limit})
+
+
+def _cmd_more_evidence(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    return ("more_evidence", {"record_id": _bound_record_id(meta)})
+
+
+def _cmd_rewrite(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split(None, 1)
+    style = parts[0].removeprefix("style=") if parts else "short"
+    return ("rewrite", {"record_id": _bound_record_id(meta), "style": style})
+
+
+def _cmd_compare(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split(None, 2)
+    record_id_1 = parts[0] if len(parts) >= 1 else ""
+    record_id_2 = parts[1] if len(parts) >= 2 else ""
+    if not record_id_1:
+        record_id_1 = _bound_record_id(meta)
+    return ("compare", {"record_id_1": record_id_1, "record_id_2": record_id_2})
+
+
+def _cmd_deep_dive(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split()
+    record_id = parts[0] if len(parts) >= 1 else ""
+    focus = parts[1] if len(parts) >= 2 else "general"
+    claim_index = None
+    if len(parts) >= 3:
+        try:
+            claim_index = int(parts[2])
+        except ValueError:
+            pass
+    if not record_id:
+        record_id = _bound_record_id(meta)
+    return ("deep_dive", {"record_id": record_id, "focus": focus, "claim_index": claim_index})
+
+
+def _cmd_claims_only(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    return ("claims_only", {"text": rest.strip()})
+
+
+def _cmd_evidence_only(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    return ("evidence_only", {"text": rest.strip(), "record_id": _bound_record_id(meta)})
+
+
+def _cmd_record_tool(tool: ToolName) -> Callable[[str, dict[str, Any]], _CommandResult]:
+    """/align_only、/report_only、/simulate：首个参数为 record_id，缺省取会话绑定记录"""
+
+    def _parse(rest: str, meta: dict[str, Any]) -> _CommandResult:
+        parts = rest.split(None, 1)
+        record_id = parts[0] if parts else ""
+        return (tool, {"record_id": record_id or _bound_record_id(meta)})
+
+    return _parse
+
+
+def _content_generate(rest: str, meta: dict[str, Any], *, explicit: bool) -> _CommandResult:
+    kv = _parse_command_kv(rest.split())
+    force = _parse_bool_flag(kv.get("force", "false"))
+    # /content_generate 总是生成；/content 默认展示已有内容，force=true 时重新生成
+    operation = "generate" if explicit or force else "show"
+    return (
+        "content_generate",
+        {
+            "record_id": _bound_record_id(meta),
+            "style": kv.get("style", "formal"),
+            "detail": kv.get("detail", "full"),
+            "force": force,
+            "reuse_only": _parse_bool_flag(kv.get("reuse_only", "false")),
+            "text": kv.get("text", ""),
+            "operation": operation,
+        },
+    )
+
+
+def _cmd_content_generate(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    return _content_generate(rest, meta, explicit=True)
+
+
+def _cmd_content(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    return _content_generate(rest, meta, explicit=False)
+
+
+def _cmd_content_show(rest: str, meta: dict[str, Any]) -> _CommandResult:
+    parts = rest.split()
+    section = parts[0].lower() if len(parts) >= 1 else ""
+    variant = parts[1].lower() if len(parts) >= 2 else ""
+    kv = _parse_command_kv(parts)
+    faq_range = kv.get("range", variant if section == "faq" else "")
+    platforms = kv.get("platforms", variant if section == "scripts" else "")
+    return (
+        "content_generate",
+        {
+            "operation": "show",
+            "section": section,
+            "variant": variant,
+            "faq_range": faq_range,
+            "platforms": platforms,
+            "detail": kv.get("detail", "full"),
+            "style": kv.get("style", "formal"),
+            "record_id": _bound_record_id(meta),
+        },
+    )
+
+
+# 按优先级排列：命令名完全匹配时直接查表；否则按此顺序做前缀匹配，
+# 兼容命令名后紧跟参数（如 "/why123"）的旧写法
+_COMMAND_TABLE: tuple[tuple[str, Callable[[str, dict[str, Any]], _CommandResult]], ...] = (
+    ("/load_history", _cmd_load_history),
+    ("/why", _cmd_why),
+    ("/explain", _cmd_why),
+    ("/list", _cmd_list),
+    ("/history", _cmd_list),
+    ("/records", _cmd_list),
+    ("/more_evidence", _cmd_more_evidence),
+    ("/more", _cmd_more_evidence),
+    ("/rewrite", _cmd_rewrite),
+    ("/compare", _cmd_compare),
+    ("/deep_dive", _cmd_deep_dive),
+    ("/deepdive", _cmd_deep_dive),
+    ("/claims_only", _cmd_claims_only),
+    ("/claims-only", _cmd_claims_only),
+    ("/evidence_only", _cmd_evidence_only),
+    ("/evidence-only", _cmd_evidence_only),
+    ("/align_only", _cmd_record_tool("align_only")),
+    ("/align-only", _cmd_record_tool("align_only")),
+    ("/report_only", _cmd_record_tool("report_only")),
+    ("/report-only", _cmd_record_tool("report_only")),
+    ("/simulate", _cmd_record_tool("simulate")),
+    ("/content_generate", _cmd_content_generate),
+    ("/content-generate", _cmd_content_generate),
+    ("/content_show", _cmd_content_show),
+    ("/content-show", _cmd_content_show),
+    ("/content", _cmd_content),
+)
+_COMMANDS: dict[str, Callable[[str, dict[str, Any]], _CommandResult]] = dict(_COMMAND_TABLE)
+
+
+def _lookup_command(head: str) -> Callable[[str, dict[str, Any]], _CommandResult] | None:
+    handler = _COMMANDS.get(head)
+    if handler is not None:
+        return handler
+    for prefix, candidate in _COMMAND_TABLE:
+        if head.startswith(prefix):
+            return candidate
+    return None
+
+
 def parse_tool(text: str, session_meta: dict[str, Any] | None = None) -> tuple[ToolName, dict[str, Any]]:
     """把用户输入解析为后端允许的工具调用。
 
@@ -188,148 +437,17 @@ def parse_tool(text: str, session_meta: dict[str, Any] | None = None) -> tuple[T
 
     meta = session_meta or {}
 
-    if t.startswith("/load_history"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1] if len(parts) >= 2 else ""
-        return ("load_history", {"record_id": record_id})
-
-    if t.startswith("/why") or t.startswith("/explain"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1] if len(parts) >= 2 else ""
-        if not record_id:
-            record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("why", {"record_id": record_id})
-
-    if t.startswith("/list") or t.startswith("/history") or t.startswith("/records"):
-        parts = re.split(r"\s+", t)
-        limit = 10
-        if len(parts) >= 2:
-            raw = parts[1].strip()
-            if raw.startswith("limit="):
-                raw = raw[len("limit=") :]
-            try:
-                limit = int(raw)
-            except ValueError:
-                limit = 10
-        return ("list", {"limit": limit})
-
-    if t.startswith("/more_evidence") or t.startswith("/more"):
-        record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("more_evidence", {"record_id": record_id})
-
-    if t.startswith("/rewrite"):
-        parts = re.split(r"\s+", t)
-        style = parts[1].strip() if len(parts) >= 2 else "short"
-        if style.startswith("style="):
-            style = style[len("style=") :]
-        record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("rewrite", {"record_id": record_id, "style": style})
-
-    if t.startswith("/compare"):
-        parts = re.split(r"\s+", t)
-        record_id_1 = parts[1] if len(parts) >= 2 else ""
-        record_id_2 = parts[2] if len(parts) >= 3 else ""
-        bound_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        if not record_id_1 and bound_id:
-            record_id_1 = bound_id
-        return ("compare", {"record_id_1": record_id_1, "record_id_2": record_id_2})
-
-    if t.startswith("/deep_dive") or t.startswith("/deepdive"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1] if len(parts) >= 2 else ""
-        focus = parts[2] if len(parts) >= 3 else "general"
-        claim_index = None
-        if len(parts) >= 4:
-            try:
-                claim_index = int(parts[3])
-            except ValueError:
-                pass
-        if not record_id:
-            record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("deep_dive", {"record_id": record_id, "focus": focus, "claim_index": claim_index})
-
-    if t.startswith("/claims_only") or t.startswith("/claims-only"):
-        value = t.split(" ", 1)
-        claim_text = value[1].strip() if len(value) >= 2 else ""
-        return ("claims_only", {"text": claim_text})
-
-    if t.startswith("/evidence_only") or t.startswith("/evidence-only"):
-        value = t.split(" ", 1)
-        evidence_text = value[1].strip() if len(value) >= 2 else ""
-        fallback_record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("evidence_only", {"text": evidence_text, "record_id": fallback_record_id})
-
-    if t.startswith("/align_only") or t.startswith("/align-only"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1].strip() if len(parts) >= 2 else ""
-        if not record_id:
-            record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("align_only", {"record_id": record_id})
-
-    if t.startswith("/report_only") or t.startswith("/report-only"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1].strip() if len(parts) >= 2 else ""
-        if not record_id:
-            record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("report_only", {"record_id": record_id})
-
-    if t.startswith("/simulate"):
-        parts = re.split(r"\s+", t)
-        record_id = parts[1].strip() if len(parts) >= 2 else ""
-        if not record_id:
-            record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        return ("simulate", {"record_id": record_id})
-
-    if t.startswith("/content_generate") or t.startswith("/content-generate") or (t.startswith("/content") and not t.startswith("/content_show") and not t.startswith("/content-show")):
-        parts = re.split(r"\s+", t)
-        record_id = str(meta.get("record_id") or meta.get("bound_record_id") or "")
-        kv = _parse_command_kv(parts[1:])
-        style = kv.get("style", "formal")
-        detail = kv.get("detail", "full")
-        force = _parse_bool_flag(kv.get("force", "false"))
-        reuse_only = _parse_bool_flag(kv.get("reuse_only", "false"))
-        text_arg = kv.get("text", "")
-        operation = "generate"
-        if t.startswith("/content") and not t.startswith("/content_generate") and not t.startswith("/content-generate"):
-            operation = "generate" if force else "show"
-        return (
-            "content_generate",
-            {
-                "record_id": record_id,
-                "style": style,
-                "detail": detail,
-                "force": force,
-                "reuse_only": reuse_only,
-                "text": text_arg,
-                "operation": operation,
-            },
-        )
-
-    if t.startswith("/content_show") or t.startswith("/content-show"):
-        parts = re.split(r"\s+", t)
-        section = parts[1].strip().lower() if len(parts) >= 2 else ""
-        variant = parts[2].strip().lower() if len(parts) >= 3 else ""
-        kv = _parse_command_kv(parts[1:])
-        faq_range = kv.get("range", variant if section == "faq" else "")
-        platforms = kv.get("platforms", variant if section == "scripts" else "")
-        return (
-            "content_generate",
-            {
-                "operation": "show",
-                "section": section,
-                "variant": variant,
-                "faq_range": faq_range,
-                "platforms": platforms,
-                "detail": kv.get("detail", "full"),
-                "style": kv.get("style", "formal"),
-                "record_id": str(meta.get("record_id") or meta.get("bound_record_id") or ""),
-            },
-        )
+    if t[0] == "/":
+        # 只切出命令名一次，剩余文本交给对应解析函数
+        parts = t.split(None, 1)
+        handler = _lookup_command(parts[0])
+        if handler is not None:
+            return handler(parts[1] if len(parts) == 2 else "", meta)
 
-    if _is_analyze_intent(t):
-        analyze_text = _extract_analyze_text(t)
-        force_flag = bool(re.search(r"^/analyze\s+force=true\b", t))
-        return ("analyze", {"text": analyze_text, "force": force_flag})
+        if _is_analyze_intent(t):
+            analyze_text = _extract_analyze_text(t)
+            force_flag = _has_analyze_force_flag(t)
+            return ("analyze", {"text": analyze_text, "force": force_flag})
 
     intent, intent_args = classify_intent(t)
     tool_name = _intent_to_tool(intent)
@@ -470,76 +588,79 @@ def build_intent_clarify_message(raw_text: str) -> ChatMessage:
             ChatAction(type="command", label="对比两条记录", command="/compare"),
             ChatAction(type="command", label="加载历史记录", command="/load_history"),
             ChatAction(type="command", label="查看历史记录", command="/list"),
-            ChatAction(type="command", label="查看帮助", command="/help"),
+            _ACTION_HELP,
         ],
         references=[],
         meta={"intent": "clarify", "input_preview": preview},
     )
 
 
+# 帮助/用法提示内容固定，模块导入时构造一次；返回的是共享实例，调用方不得修改
+_HELP_MESSAGE = ChatMessage(
+    role="assistant",
+    content=(
+        "当前对话工作台已启用后端工具白名单编排（V2）。\n\n"
+        "可用命令：\n"
+        "- /analyze <待分析文本>：发起全链路分析\n"
+        "- /load_history <record_id>：加载历史记录到前端上下文（仅命令）\n"
+        "- /why <record_id>：解释为什么给出该风险/结论（支持自然语言：“为什么判定高风险”）\n"
+        "- /list [N]：列出最近 N 条历史记录的 record_id（默认 10，例如 /list 20）\n"
+        "- /more_evidence：基于当前上下文，给出补充证据的下一步动作\n"
+        "- /rewrite [short|neutral|friendly]：改写解释版本（仅命令）\n"
+        "- /compare <record_id_1> <record_id_2>：对比两条历史记录的分析结果\n"
+        "- /deep_dive <record_id> [focus] [claim_index]：深入分析某一焦点领域\n"
+        "  - focus 可选：general（默认）/evidence/claims/timeline/sources\n"
+        "  - claim_index：指定深入分析第几条主张（从0开始）\n\n"
+        "- /claims_only <文本>：仅提取主张\n"
+        "- /evidence_only <文本>：仅检索证据（复用会话主张）\n"
+        "- /align_only [record_id]：仅做证据对齐\n"
+        "- /report_only [record_id]：仅生成报告\n"
+        "- /simulate [record_id]：仅执行舆情预演\n"
+        "- /content_generate [style=...]：仅生成应对内容\n\n"
+        "- /content [style=... detail=brief|full force=true|false reuse_only=true|false]：CLI 友好应对内容\n"
+        "- /content_show clarification short|medium|long：查看澄清稿指定版本\n"
+        "- /content_show faq 1-5：查看 FAQ 区间\n"
+        "- /content_show scripts weibo,wechat：查看指定平台话术\n\n"
+        "标注「仅命令」的工具不支持自然语言，其他工具均支持自然语言表达。\n\n"
+        "record_id 来源：分析完成后会写入历史记录；也可以用 /list 查询后再 /load_history {record_id}。\n\n"
+        "你也可以直接粘贴长文本（系统会先询问你要完整分析还是单技能处理）。"
+    ),
+    actions=[
+        ChatAction(type="link", label="检测结果", href="/result"),
+        ChatAction(type="link", label="历史记录", href="/history"),
+    ],
+    references=[],
+)
+
+
+_WHY_USAGE_MESSAGE = ChatMessage(
+    role="assistant",
+    content=(
+        "用法：/why <record_id>\n\n"
+        "- 先使用 /list 查看最近的 record_id\n"
+        "- 或先 /load_history <record_id> 加载到前端上下文后再追问\n"
+    ),
+    actions=[
+        ChatAction(type="command", label="列出最近记录（/list）", command="/list"),
+        ChatAction(type="link", label="打开历史记录页面", href="/history"),
+    ],
+    references=[],
+)
+
+
 def build_help_message() -> ChatMessage:
-    return ChatMessage(
-        role="assistant",
-        content=(
-            "当前对话工作台已启用后端工具白名单编排（V2）。\n\n"
-            "可用命令：\n"
-            "- /analyze <待分析文本>：发起全链路分析\n"
-            "- /load_history <record_id>：加载历史记录到前端上下文（仅命令）\n"
-            "- /why <record_id>：解释为什么给出该风险/结论（支持自然语言：“为什么判定高风险”）\n"
-            "- /list [N]：列出最近 N 条历史记录的 record_id（默认 10，例如 /list 20）\n"
-            "- /more_evidence：基于当前上下文，给出补充证据的下一步动作\n"
-            "- /rewrite [short|neutral|friendly]：改写解释版本（仅命令）\n"
-            "- /compare <record_id_1> <record_id_2>：对比两条历史记录的分析结果\n"
-            "- /deep_dive <record_id> [focus] [claim_index]：深入分析某一焦点领域\n"
-            "  - focus 可选：general（默认）/evidence/claims/timeline/sources\n"
-            "  - claim_index：指定深入分析第几条主张（从0开始）\n\n"
-            "- /claims_only <文本>：仅提取主张\n"
-            "- /evidence_only <文本>：仅检索证据（复用会话主张）\n"
-            "- /align_only [record_id]：仅做证据对齐\n"
-            "- /report_only [record_id]：仅生成报告\n"
-            "- /simulate [record_id]：仅执行舆情预演\n"
-            "- /content_generate [style=...]：仅生成应对内容\n\n"
-            "- /content [style=... detail=brief|full force=true|false reuse_only=true|false]：CLI 友好应对内容\n"
-            "- /content_show clarification short|medium|long：查看澄清稿指定版本\n"
-            "- /content_show faq 1-5：查看 FAQ 区间\n"
-            "- /content_show scripts weibo,wechat：查看指定平台话术\n\n"
-            "标注「仅命令」的工具不支持自然语言，其他工具均支持自然语言表达。\n\n"
-            "record_id 来源：分析完成后会写入历史记录；也可以用 /list 查询后再 /load_history {record_id}。\n\n"
-            "你也可以直接粘贴长文本（系统会先询问你要完整分析还是单技能处理）。"
-        ),
-        actions=[
-            ChatAction(type="link", label="检测结果", href="/result"),
-            ChatAction(type="link", label="历史记录", href="/history"),
-        ],
-        references=[],
-    )
+    return _HELP_MESSAGE
 
 
 def build_why_usage_message() -> ChatMessage:
-    return ChatMessage(
-        role="assistant",
-        content=(
-            "用法：/why <record_id>\n\n"
-            "- 先使用 /list 查看最近的 record_id\n"
-            "- 或先 /load_history <record_id> 加载到前端上下文后再追问\n"
-        ),
-        actions=[
-            ChatAction(type="command", label="列出最近记录（/list）", command="/list"),
-            ChatAction(type="link", label="打开历史记录页面", href="/history"),
-        ],
-        references=[],
-    )
+    return _WHY_USAGE_MESSAGE
 
 
 def run_more_evidence(args: ToolMoreEvidenceArgs) -> ChatMessage:
     record = get_history(args.record_id)
     if not record:
-        return ChatMessage(
-            role="assistant",
-            content=f"未找到历史记录：{args.record_id}。",
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
-            references=[],
-        )
+        return _record_not_found(args.record_id)
+    record_id = record["id"]
 
     return ChatMessage(
         role="assistant",
@@ -551,31 +672,76 @@ def run_more_evidence(args: ToolMoreEvidenceArgs) -> ChatMessage:
         actions=[
             ChatAction(type="command", label="重试证据检索（/retry evidence）", command="/retry evidence"),
             ChatAction(type="command", label="重试综合报告（/retry report）", command="/retry report"),
-            ChatAction(type="link", label="打开检测结果", href="/result"),
-        ],
-        references=[
-            ChatReference(
-                title=f"历史记录：{record['id']}",
-                href="/history",
-                description=f"风险: {record.get('risk_label')}（{record.get('risk_score')}） · 时间: {record.get('created_at')}",
-            )
+            _ACTION_OPEN_RESULT,
         ],
-        meta={"record_id": record["id"]},
+        references=[_history_ref(record)],
+        meta={"record_id": record_id},
+    )
+
+
+# 仅接受 http(s) 链接；元组形式一次调用完成两种前缀匹配，且不会误收 "httpfoo" 之类。
+# routes_chat 的证据引用过滤也导入此处定义，两处规则保持一致
+HTTP_SCHEMES = ("http://", "https://")
+
+
+def _clean_str(value: Any) -> str:
+    """历史 JSON 字段取字符串：非字符串视为空；首尾无空白时 strip() 原样返回，不复制。"""
+    return value.strip() if isinstance(value, str) else ""
+
+
+_BULLET_SEP = "\n- "
+
+
+def _join_top(items: list[Any], sep: str, n: int = 3) -> str:
+    return sep.join(map(str, islice(items, n)))
+
+
+def _fmt_rewrite_short(risk_label: Any, risk_score: Any, reasons: list[Any], points: list[Any]) -> str:
+    reasons_line = f"风险快照原因：{_join_top(reasons, '；')}\n" if reasons else ""
+    points_line = f"可疑点：{_join_top(points, '；')}\n" if points else ""
+    return (
+        f"改写（短版）：结论为【{risk_label}】（score={risk_score}）。\n"
+        f"{reasons_line}{points_line}"
+        "（提示：可用 /more_evidence 或 /retry evidence 补充证据）"
+    )
+
+
+def _fmt_rewrite_friendly(risk_label: Any, risk_score: Any, reasons: list[Any], points: list[Any]) -> str:
+    points_block = f"你可以重点留意：\n- {_join_top(points, _BULLET_SEP)}\n" if points else ""
+    return (
+        f"改写（亲切版）：目前的辅助判断是【{risk_label}】（score={risk_score}）。\n"
+        "我主要参考了风险快照的触发原因，以及报告里整理的可疑点/证据对齐结果。\n"
+        f"{points_block}"
+        "如果你希望我再多找一些证据，可以直接输入 /more_evidence。"
+    )
+
+
+def _fmt_rewrite_neutral(risk_label: Any, risk_score: Any, reasons: list[Any], points: list[Any]) -> str:
+    reasons_block = f"风险快照原因（节选）：\n- {_join_top(reasons, _BULLET_SEP)}\n" if reasons else ""
+    points_block = f"报告可疑点（节选）：\n- {_join_top(points, _BULLET_SEP)}\n" if points else ""
+    return (
+        f"改写（中性版）：综合判断为【{risk_label}】（score={risk_score}）。\n"
+        "依据来源：风险快照触发原因 + 报告可疑点 + 主张-证据对齐结果。\n"
+        f"{reasons_block}{points_block}"
     )
 
 
+# 按风格分派改写模板；键集合即支持的改写风格
+_REWRITE_FORMATTERS: dict[str, Callable[[Any, Any, list[Any], list[Any]], str]] = {
+    "short": _fmt_rewrite_short,
+    "friendly": _fmt_rewrite_friendly,
+    "neutral": _fmt_rewrite_neutral,
+}
+
+
 def run_rewrite(args: ToolRewriteArgs) -> ChatMessage:
     record = get_history(args.record_id)
     if not record:
-        return ChatMessage(
-            role="assistant",
-            content=f"未找到历史记录：{args.record_id}。",
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
-            references=[],
-        )
+        return _record_not_found(args.record_id)
+    record_id = record["id"]
 
     style = (args.style or "short").strip().lower()
-    if style not in {"short", "neutral", "friendly"}:
+    if style not in _REWRITE_FORMATTERS:
         style = "short"
 
     detect_data = record.get("detect_data") or {}
@@ -586,63 +752,27 @@ def run_rewrite(args: ToolRewriteArgs) -> ChatMessage:
     risk_label = report.get("risk_label", record.get("risk_label"))
     risk_score = report.get("risk_score", record.get("risk_score"))
 
-    if style == "short":
-        content = (
-            f"改写（短版）：结论为【{risk_label}】（score={risk_score}）。\n"
-            + ("风险快照原因：" + "；".join([str(x) for x in reasons[:3]]) + "\n" if reasons else "")
-            + ("可疑点：" + "；".join([str(x) for x in suspicious_points[:3]]) + "\n" if suspicious_points else "")
-            + "（提示：可用 /more_evidence 或 /retry evidence 补充证据）"
-        )
-    elif style == "friendly":
-        content = (
-            f"改写（亲切版）：目前的辅助判断是【{risk_label}】（score={risk_score}）。\n"
-            "我主要参考了风险快照的触发原因，以及报告里整理的可疑点/证据对齐结果。\n"
-            + ("你可以重点留意：\n- " + "\n- ".join([str(x) for x in suspicious_points[:3]]) + "\n" if suspicious_points else "")
-            + "如果你希望我再多找一些证据，可以直接输入 /more_evidence。"
-        )
-    else:
-        content = (
-            f"改写（中性版）：综合判断为【{risk_label}】（score={risk_score}）。\n"
-            "依据来源：风险快照触发原因 + 报告可疑点 + 主张-证据对齐结果。\n"
-            + ("风险快照原因（节选）：\n- " + "\n- ".join([str(x) for x in reasons[:3]]) + "\n" if reasons else "")
-            + ("报告可疑点（节选）：\n- " + "\n- ".join([str(x) for x in suspicious_points[:3]]) + "\n" if suspicious_points else "")
-        )
+    content = _REWRITE_FORMATTERS[style](risk_label, risk_score, reasons, suspicious_points)
 
     return ChatMessage(
         role="assistant",
         content=content,
         actions=[
-            ChatAction(type="command", label="补充证据（/more_evidence）", command="/more_evidence"),
-            ChatAction(type="link", label="打开检测结果", href="/result"),
-        ],
-        references=[
-            ChatReference(
-                title=f"历史记录：{record['id']}",
-                href="/history",
-                description=f"风险: {record.get('risk_label')}（{record.get('risk_score')}） · 时间: {record.get('created_at')}",
-            )
+            _ACTION_MORE_EVIDENCE,
+            _ACTION_OPEN_RESULT,
         ],
-        meta={"record_id": record["id"], "style": style},
+        references=[_history_ref(record)],
+        meta={"record_id": record_id, "style": style},
     )
 
 
 def run_load_history(args: ToolLoadHistoryArgs) -> ChatMessage:
     record = get_history(args.record_id)
     if not record:
-        return ChatMessage(
-            role="assistant",
-            content=f"未找到历史记录：{args.record_id}。",
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
-            references=[],
-        )
+        return _record_not_found(args.record_id)
+    record_id = record["id"]
 
-    refs: list[ChatReference] = [
-        ChatReference(
-            title=f"历史记录：{record['id']}",
-            href="/history",
-            description=f"风险: {record.get('risk_label')}（{record.get('risk_score')}） · 时间: {record.get('created_at')}",
-        )
-    ]
+    refs: list[ChatReference] = [_history_ref(record)]
 
     return ChatMessage(
         role="assistant",
@@ -650,11 +780,11 @@ def run_load_history(args: ToolLoadHistoryArgs) -> ChatMessage:
             "已定位到历史记录。你可以点击下方命令，将其加载到前端上下文（pipeline-store），然后到结果页查看模块化结果。"
         ),
         actions=[
-            ChatAction(type="command", label="加载到前端上下文", command=f"/load_history {record['id']}"),
-            ChatAction(type="link", label="打开检测结果", href="/result"),
+            ChatAction(type="command", label="加载到前端上下文", command=f"/load_history {record_id}"),
+            _ACTION_OPEN_RESULT,
         ],
         references=refs,
-        meta={"record_id": record["id"]},
+        meta={"record_id": record_id},
     )
 
 
@@ -674,15 +804,40 @@ def _calc_evidence_insufficient_ratio(claim_reports: list[dict[str, Any]]) -> fl
     return insufficient / total
 
 
+# /why 回复末尾的固定动作（改写 + 页面入口），与记录无关，导入时构造一次
+_WHY_TRAILING_ACTIONS: tuple[ChatAction, ...] = (
+    ChatAction(type="command", label="改写为短版（/rewrite short）", command="/rewrite short"),
+    ChatAction(type="command", label="改写为中性版（/rewrite neutral）", command="/rewrite neutral"),
+    ChatAction(type="command", label="改写为亲切版（/rewrite friendly）", command="/rewrite friendly"),
+    _ACTION_OPEN_RESULT,
+    _ACTION_OPEN_HISTORY,
+)
+
+
+def _iter_evidence_links(claim_reports: list[dict[str, Any]]) -> Iterator[dict[str, str]]:
+    """单趟遍历前 3 条主张各自的前 3 条证据，按 URL 去重产出 http(s) 证据链接。"""
+    seen_urls: set[str] = set()
+    evidences = chain.from_iterable(islice(row.get("evidences") or (), 3) for row in islice(claim_reports, 3))
+    for ev in evidences:
+        url = _clean_str(ev.get("url"))
+        if not url.startswith(HTTP_SCHEMES) or url in seen_urls:
+            continue
+        seen_urls.add(url)
+        title = _clean_str(ev.get("title")) or url
+        yield {
+            "title": title[:80],
+            "href": url,
+            "description": f"证据立场: {ev.get('stance')} · 置信度: {ev.get('alignment_confidence')}",
+        }
+
+
 def run_why(args: ToolWhyArgs) -> ChatMessage:
     record = get_history(args.record_id)
     if not record:
-        return ChatMessage(
-            role="assistant",
-            content=f"未找到历史记录：{args.record_id}。",
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
-            references=[],
-        )
+        return _record_not_found(args.record_id)
+    record_id = record["id"]
+    record_label = record.get("risk_label")
+    record_score = record.get("risk_score")
 
     detect_data = record.get("detect_data") or {}
     report = record.get("report") or {}
@@ -690,36 +845,20 @@ def run_why(args: ToolWhyArgs) -> ChatMessage:
     reasons = detect_data.get("reasons") or []
     suspicious_points = report.get("suspicious_points") or []
     claim_reports = report.get("claim_reports") or []
+    report_score = report.get("risk_score")
 
-    refs: list[ChatReference] = [
-        ChatReference(
-            title=f"历史记录：{record['id']}",
-            href="/history",
-            description=f"风险: {record.get('risk_label')}（{record.get('risk_score')}） · 时间: {record.get('created_at')}",
-        )
-    ]
+    # 主张级对齐摘要同时用于 blocks 与正文，只生成一次
+    claim_lines: list[str] = []
+    for row in islice(claim_reports, 3):
+        claim_text = (row.get("claim") or {}).get("claim_text") or ""
+        verdict = row.get("verdict") or ""
+        claim_lines.append(f"主张：{claim_text[:60]}… → 结论：{verdict}")
 
-    seen_urls: set[str] = set()
-    for row in claim_reports[:3]:
-        for ev in (row.get("evidences") or [])[:3]:
-            url = str(ev.get("url") or "").strip()
-            title = str(ev.get("title") or url).strip()
-            if not url or not url.startswith("http"):
-                continue
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            refs.append(
-                ChatReference(
-                    title=title[:80] or url,
-                    href=url,
-                    description=f"证据立场: {ev.get('stance')} · 置信度: {ev.get('alignment_confidence')}",
-                )
-            )
-            if len(refs) >= 8:
-                break
-        if len(refs) >= 8:
-            break
+    refs: list[ChatReference] = [_history_ref(record)]
+
+    # 证据链接先收集为原始 dict：blocks 直接使用，refs 再由其构造模型，免去 model_dump 往返
+    evidence_links = list(islice(_iter_evidence_links(claim_reports), 7))
+    refs.extend(ChatReference(**link) for link in evidence_links)
 
     # ====== 结构化 blocks（供前端做“引用卡片/折叠区块”展示）======
     # 约定：写入 ChatMessage.meta.blocks，不改动顶层 schema，便于渐进增强与持久化。
@@ -730,7 +869,7 @@ def run_why(args: ToolWhyArgs) -> ChatMessage:
             {
                 "kind": "section",
                 "title": "风险快照触发原因",
-                "items": [str(r) for r in reasons[:5]],
+                "items": [str(r) for r in islice(reasons, 5)],
                 "collapsed": False,
             }
         )
@@ -739,33 +878,26 @@ def run_why(args: ToolWhyArgs) -> ChatMessage:
             {
                 "kind": "section",
                 "title": "报告可疑点",
-                "items": [str(p) for p in suspicious_points[:5]],
+                "items": [str(p) for p in islice(suspicious_points, 5)],
+                "collapsed": True,
+            }
+        )
+    if claim_lines:
+        blocks.append(
+            {
+                "kind": "section",
+                "title": "主张级证据对齐（节选）",
+                "items": claim_lines,
                 "collapsed": True,
             }
         )
-    if claim_reports:
-        items: list[str] = []
-        for row in claim_reports[:3]:
-            claim_text = (row.get("claim") or {}).get("claim_text") or ""
-            verdict = row.get("verdict") or ""
-            items.append(f"主张：{claim_text[:60]}… → 结论：{verdict}")
-        if items:
-            blocks.append(
-                {
-                    "kind": "section",
-                    "title": "主张级证据对齐（节选）",
-                    "items": items,
-                    "collapsed": True,
-                }
-            )
 
-    # refs[0] 是历史记录入口；其余多为证据链接
-    if len(refs) > 1:
+    if evidence_links:
         blocks.append(
             {
                 "kind": "links",
-                "title": f"证据链接（节选 {len(refs) - 1} 条）",
-                "links": [r.model_dump() for r in refs[1:]],
+                "title": f"证据链接（节选 {len(evidence_links)} 条）",
+                "links": evidence_links,
                 "collapsed": True,
             }
         )
@@ -774,66 +906,63 @@ def run_why(args: ToolWhyArgs) -> ChatMessage:
     lines.append("解释（最小可用）：本结论来自风险快照 + 报告阶段对主张与证据的综合判断。")
     lines.append("")
     lines.append(
-        f"- 风险快照：{detect_data.get('label', record.get('risk_label'))}（score={detect_data.get('score', record.get('risk_score'))}）"
+        f"- 风险快照：{detect_data.get('label', record_label)}（score={detect_data.get('score', record_score)}）"
     )
     if reasons:
         lines.append("  - 触发原因：")
-        for r in reasons[:5]:
-            lines.append(f"    - {r}")
+        lines.extend(f"    - {r}" for r in islice(reasons, 5))
 
     lines.append(
-        f"- 综合报告：{report.get('risk_label', record.get('risk_label'))}（score={report.get('risk_score', record.get('risk_score'))}）"
+        f"- 综合报告：{report.get('risk_label', record_label)}（score={report.get('risk_score', record_score)}）"
     )
     if suspicious_points:
         lines.append("  - 可疑点摘要：")
-        for p in suspicious_points[:5]:
-            lines.append(f"    - {p}")
+        lines.extend(f"    - {p}" for p in islice(suspicious_points, 5))
 
-    if claim_reports:
+    if claim_lines:
         lines.append("  - 主张级证据对齐（节选）：")
-        for row in claim_reports[:3]:
-            claim_text = (row.get("claim") or {}).get("claim_text") or ""
-            verdict = row.get("verdict") or ""
-            lines.append(f"    - 主张：{claim_text[:60]}… → 结论：{verdict}")
+        lines.extend(f"    - {line}" for line in claim_lines)
 
     lines.append("")
     lines.append("提示：你可以先加载该 record_id 到前端上下文，再打开结果页查看完整模块化结果与证据链。")
 
-    risk_score_val = report.get("risk_score") or record.get("risk_score") or 0
+    risk_score_val = report_score or record_score or 0
     evidence_insufficient_ratio = _calc_evidence_insufficient_ratio(claim_reports)
 
     base_actions: list[ChatAction] = [
-        ChatAction(type="command", label="加载到前端上下文", command=f"/load_history {record['id']}"),
-        ChatAction(type="command", label="补充证据（/more_evidence）", command="/more_evidence"),
+        ChatAction(type="command", label="加载到前端上下文", command=f"/load_history {record_id}"),
+        _ACTION_MORE_EVIDENCE,
     ]
 
     if risk_score_val >= 70:
         base_actions.append(ChatAction(type="link", label="生成应对内容", href="/content"))
-        base_actions.append(ChatAction(type="command", label="深入分析证据", command=f"/deep_dive {record['id']} evidence"))
+        base_actions.append(ChatAction(type="command", label="深入分析证据", command=f"/deep_dive {record_id} evidence"))
     else:
-        base_actions.append(ChatAction(type="command", label="查看证据来源", command=f"/deep_dive {record['id']} sources"))
+        base_actions.append(ChatAction(type="command", label="查看证据来源", command=f"/deep_dive {record_id} sources"))
         base_actions.append(ChatAction(type="command", label="对比历史记录", command="/list"))
 
     if evidence_insufficient_ratio > 0.5:
         base_actions.insert(0, ChatAction(type="command", label="补充检索证据", command="/more_evidence"))
 
-    base_actions.extend([
-        ChatAction(type="command", label="改写为短版（/rewrite short）", command="/rewrite short"),
-        ChatAction(type="command", label="改写为中性版（/rewrite neutral）", command="/rewrite neutral"),
-        ChatAction(type="command", label="改写为亲切版（/rewrite friendly）", command="/rewrite friendly"),
-        ChatAction(type="link", label="打开检测结果", href="/result"),
-        ChatAction(type="link", label="打开历史记录", href="/history"),
-    ])
+    base_actions.extend(_WHY_TRAILING_ACTIONS)
 
     return ChatMessage(
         role="assistant",
         content="\n".join(lines),
         actions=base_actions,
         references=refs,
-        meta={"record_id": record["id"], "blocks": blocks},
+        meta={"record_id": record_id, "blocks": blocks},
     )
 
 
+def _render_history_row(item: tuple[int, dict[str, Any]]) -> str:
+    """渲染 /list 的单条历史记录（序号、时间、风险，及可选摘要行）。"""
+    idx, r = item
+    line = f"{idx}. {r.get('id')} · {r.get('created_at')} · {r.get('risk_label')}({r.get('risk_score')})"
+    preview = r.get("input_preview")
+    return f"{line}\n   摘要: {preview}" if preview else line
+
+
 def run_list(args: ToolListArgs) -> ChatMessage:
     limit = int(args.limit)
     rows = list_history(limit=limit)
@@ -847,35 +976,29 @@ def run_list(args: ToolListArgs) -> ChatMessage:
             ),
             actions=[
                 ChatAction(type="command", label="示例：开始分析", command="/analyze 网传某事件100%真实，内部人士称..."),
-                ChatAction(type="link", label="打开历史记录", href="/history"),
+                _ACTION_OPEN_HISTORY,
             ],
             references=[],
         )
 
-    lines: list[str] = []
-    lines.append(f"最近 {len(rows)} 条历史记录（可用于 /load_history）：")
-    for idx, r in enumerate(rows, start=1):
-        rid = r.get("id")
-        created_at = r.get("created_at")
-        preview = r.get("input_preview") or ""
-        risk_label = r.get("risk_label")
-        risk_score = r.get("risk_score")
-        lines.append(f"{idx}. {rid} · {created_at} · {risk_label}({risk_score})")
-        if preview:
-            lines.append(f"   摘要: {preview}")
-    lines.append("")
-    lines.append("用法：/load_history <record_id>（例如：/load_history " + str(rows[0].get("id")) + ")")
+    first_id = rows[0].get("id")
+    content = "".join(
+        (
+            f"最近 {len(rows)} 条历史记录（可用于 /load_history）：\n",
+            "\n".join(map(_render_history_row, enumerate(rows, start=1))),
+            f"\n\n用法：/load_history <record_id>（例如：/load_history {first_id})",
+        )
+    )
 
     actions: list[ChatAction] = [
-        ChatAction(type="link", label="打开历史记录", href="/history"),
+        _ACTION_OPEN_HISTORY,
     ]
-    first_id = rows[0].get("id")
     if first_id:
         actions.insert(0, ChatAction(type="command", label="加载最新记录到前端", command=f"/load_history {first_id}"))
 
     return ChatMessage(
         role="assistant",
-        content="\n".join(lines),
+        content=content,
         actions=actions,
         references=[],
     )
@@ -892,15 +1015,18 @@ def run_analyze_stream(session_id: str, args: ToolAnalyzeArgs) -> Iterator[str]:
             actions=[ChatAction(type="link", label="检测结果", href="/result")],
             references=[],
         )
-        event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-        yield f"data: {event.model_dump_json()}\n\n"
+        yield _emit_message(session_id, msg)
         return
 
-    yield f"data: {ChatStreamEvent(type='token', data={'content': '已收到文本，开始分析…\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    # 进度行先入缓冲，仅在耗时调用前冲刷，让客户端在长等待前看到进度；
+    # 相邻且无耗时操作间隔的帧合并为一次写出
+    pending: list[str] = []
+    _emit(pending, "已收到文本，开始分析…\n")
 
+    yield _flush_tokens(session_id, pending)
     with llm_slot():
         risk = detect_risk_snapshot(text, force=args.force, enable_news_gate=True)
-    yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 风险快照：完成（{risk.label}，score={risk.score}）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    _emit(pending, f"- 风险快照：完成（{risk.label}，score={risk.score}）\n")
 
     if (not args.force) and risk.strategy and risk.strategy.is_news is False:
         reason = risk.strategy.news_reason or "文本新闻特征不足"
@@ -914,28 +1040,31 @@ def run_analyze_stream(session_id: str, args: ToolAnalyzeArgs) -> Iterator[str]:
             ),
             actions=[
                 ChatAction(type="command", label="仅提取主张", command=f"/claims_only {text[:200]}"),
-                ChatAction(type="command", label="查看帮助", command="/help"),
+                _ACTION_HELP,
             ],
             references=[],
         )
-        event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-        yield f"data: {event.model_dump_json()}\n\n"
+        yield _flush_tokens(session_id, pending) + _emit_message(session_id, msg)
         return
 
+    yield _flush_tokens(session_id, pending)
     with llm_slot():
         claims = orchestrator.run_claims(text, strategy=risk.strategy)
-    yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 主张抽取：完成（{len(claims)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    _emit(pending, f"- 主张抽取：完成（{len(claims)} 条）\n")
 
+    yield _flush_tokens(session_id, pending)
     evidences = orchestrator.run_evidence(text=text, claims=claims, strategy=risk.strategy)
-    yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 联网检索证据：完成（候选 {len(evidences)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    _emit(pending, f"- 联网检索证据：完成（候选 {len(evidences)} 条）\n")
 
+    yield _flush_tokens(session_id, pending)
     with llm_slot():
         aligned = align_evidences(claims=claims, evidences=evidences, strategy=risk.strategy)
-    yield f"data: {ChatStreamEvent(type='token', data={'content': f'- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    _emit(pending, f"- 证据聚合与对齐：完成（对齐 {len(aligned)} 条）\n")
 
+    yield _flush_tokens(session_id, pending)
     with llm_slot():
         report = orchestrator.run_report(text=text, claims=claims, evidences=aligned, strategy=risk.strategy)
-    yield f"data: {ChatStreamEvent(type='token', data={'content': '- 综合报告：完成\n', 'session_id': session_id}).model_dump_json()}\n\n"
+    _emit(pending, "- 综合报告：完成\n")
 
     record_id = save_report(
         input_text=text,
@@ -955,8 +1084,8 @@ def run_analyze_stream(session_id: str, args: ToolAnalyzeArgs) -> Iterator[str]:
             description="可在历史记录页查看详情并回放。",
         )
     ]
-    for item in aligned[:5]:
-        if item.url and item.url.startswith("http"):
+    for item in islice(aligned, 5):
+        if item.url and item.url.startswith(HTTP_SCHEMES):
             top_refs.append(
                 ChatReference(
                     title=item.title[:80] or item.url,
@@ -976,8 +1105,8 @@ def run_analyze_stream(session_id: str, args: ToolAnalyzeArgs) -> Iterator[str]:
             f"- 场景: {report.get('detected_scenario')}\n"
         ),
         actions=[
-            ChatAction(type="link", label="打开检测结果", href="/result"),
-            ChatAction(type="link", label="打开历史记录", href="/history"),
+            _ACTION_OPEN_RESULT,
+            _ACTION_OPEN_HISTORY,
             ChatAction(type="command", label="加载本次结果到前端", command=f"/load_history {record_id}"),
             ChatAction(type="command", label="为什么这样判定", command=f"/why {record_id}"),
         ],
@@ -985,8 +1114,7 @@ def run_analyze_stream(session_id: str, args: ToolAnalyzeArgs) -> Iterator[str]:
         meta={"record_id": record_id},
     )
 
-    event = ChatStreamEvent(type="message", data={"session_id": session_id, "message": msg.model_dump()})
-    yield f"data: {event.model_dump_json()}\n\n"
+    yield _flush_tokens(session_id, pending) + _emit_message(session_id, msg)
 
 
 def run_compare(args: ToolCompareArgs) -> ChatMessage:
@@ -1004,7 +1132,7 @@ def run_compare(args: ToolCompareArgs) -> ChatMessage:
         return ChatMessage(
             role="assistant",
             content="\n".join(errors),
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
+            actions=[_ACTION_OPEN_HISTORY],
             references=[],
         )
 
@@ -1082,7 +1210,7 @@ def run_compare(args: ToolCompareArgs) -> ChatMessage:
             ChatAction(type="command", label="加载记录 2", command=f"/load_history {record_2['id']}"),
             ChatAction(type="command", label="深入分析记录 1", command=f"/deep_dive {record_1['id']}"),
             ChatAction(type="command", label="深入分析记录 2", command=f"/deep_dive {record_2['id']}"),
-            ChatAction(type="link", label="打开历史记录", href="/history"),
+            _ACTION_OPEN_HISTORY,
         ],
         references=refs,
         meta={"record_id_1": record_1["id"], "record_id_2": record_2["id"], "blocks": blocks},
@@ -1096,7 +1224,7 @@ def run_deep_dive(args: ToolDeepDiveArgs) -> ChatMessage:
         return ChatMessage(
             role="assistant",
             content=f"未找到历史记录：{args.record_id}",
-            actions=[ChatAction(type="link", label="打开历史记录", href="/history")],
+            actions=[_ACTION_OPEN_HISTORY],
             references=[],
         )
 
@@ -1125,7 +1253,7 @@ def run_deep_dive(args: ToolDeepDiveArgs) -> ChatMessage:
                 if stance in stance_counts:
                     stance_counts[stance] += 1
                 url = ev.get("url")
-                if url and url.startswith("http"):
+                if url and url.startswith(HTTP_SCHEMES):
                     source_urls.append(url)
 
         lines.append(f"- 证据立场分布:")
@@ -1171,7 +1299,7 @@ def run_deep_dive(args: ToolDeepDiveArgs) -> ChatMessage:
         lines.append(f"- 更新时间: {record.get('updated_at')}")
         if detect_data.get("reasons"):
             lines.append("- 风险快照触发原因:")
-            for r in detect_data.get("reasons", [])[:3]:
+            for r in islice(detect_data.get("reasons", []), 3):
                 lines.append(f"  - {r}")
         lines.append("")
 
@@ -1181,7 +1309,7 @@ def run_deep_dive(args: ToolDeepDiveArgs) -> ChatMessage:
         for cr in claim_reports:
             for ev in cr.get("evidences", []):
                 url = ev.get("url")
-                if url and url.startswith("http") and url not in seen_urls:
+                if url and url.startswith(HTTP_SCHEMES) and url not in seen_urls:
                     seen_urls.add(url)
                     title = ev.get("title", url)[:60]
                     lines.append(f"  - [{title}]({url})")
@@ -1207,7 +1335,7 @@ def run_deep_dive(args: ToolDeepDiveArgs) -> ChatMessage:
             ChatAction(type="command", label="补充证据", command="/more_evidence"),
             ChatAction(type="command", label="深入证据", command=f"/deep_dive {record['id']} evidence"),
             ChatAction(type="command", label="深入主张", command=f"/deep_dive {record['id']} claims"),
-            ChatAction(type="link", label="打开检测结果", href="/result"),
+            _ACTION_OPEN_RESULT,
         ],
         references=refs,
         meta={"record_id": record["id"], "focus": focus, "blocks": blocks},
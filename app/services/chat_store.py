@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
 
 
 DB_PATH = Path("data/chat/chat.db")
@@ -90,13 +90,18 @@ def init_db() -> None:
         _create_tables(fallback)
 
 
+def _dumps(value: Any) -> str:
+    """序列化为 JSON 文本入库：pydantic-core 一步完成模型/字典编码，免去 jsonable_encoder 的逐层转换。"""
+    return to_json(value).decode()
+
+
 def create_session(title: str | None = None, meta: dict[str, Any] | None = None) -> dict[str, Any]:
     """创建会话并返回会话对象。"""
 
     init_db()
     session_id = f"chat_{uuid.uuid4().hex}"
     now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    meta_json = json.dumps(jsonable_encoder(meta), ensure_ascii=False) if meta else None
+    meta_json = _dumps(meta) if meta else None
 
     insert_sql = """
         INSERT INTO chat_sessions (session_id, title, created_at, updated_at, meta_json)
@@ -226,8 +231,8 @@ def append_message(
     role: str,
     content: str,
     *,
-    actions: list[dict[str, Any]] | None = None,
-    references: list[dict[str, Any]] | None = None,
+    actions: list[Any] | None = None,
+    references: list[Any] | None = None,
     meta: dict[str, Any] | None = None,
     created_at: str | None = None,
 ) -> dict[str, Any]:
@@ -236,9 +241,9 @@ def append_message(
     init_db()
     message_id = f"msg_{uuid.uuid4().hex}"
     now = created_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    actions_json = json.dumps(jsonable_encoder(actions), ensure_ascii=False) if actions else "[]"
-    references_json = json.dumps(jsonable_encoder(references), ensure_ascii=False) if references else "[]"
-    meta_json = json.dumps(jsonable_encoder(meta), ensure_ascii=False) if meta else None
+    actions_json = _dumps(actions) if actions else "[]"
+    references_json = _dumps(references) if references else "[]"
+    meta_json = _dumps(meta) if meta else None
 
     insert_sql = """
         INSERT INTO chat_messages (
@@ -337,7 +342,7 @@ def update_session_meta(session_id: str, key: str, value: Any) -> bool:
 
     meta = session.get("meta", {})
     meta[key] = value
-    meta_json = json.dumps(jsonable_encoder(meta), ensure_ascii=False)
+    meta_json = _dumps(meta)
 
     sql = "UPDATE chat_sessions SET meta_json=?, updated_at=? WHERE session_id=?"
     now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -372,7 +377,7 @@ def update_session_meta_fields(session_id: str, updates: dict[str, Any]) -> bool
     meta = session.get("meta", {})
     for key, value in updates.items():
         meta[key] = value
-    meta_json = json.dumps(jsonable_encoder(meta), ensure_ascii=False)
+    meta_json = _dumps(meta)
 
     sql = "UPDATE chat_sessions SET meta_json=?, updated_at=? WHERE session_id=?"
     now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -7,9 +7,9 @@
 - 多平台话术生成
 """
 
-import os
+import asyncio
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 from app.core.logger import get_logger
 from app.schemas.detect import (
@@ -20,22 +20,18 @@ from app.schemas.detect import (
     FAQItem,
     PlatformScript,
     Platform,
+    ReportResponse,
 )
 
+from ._fallback import track_fallbacks
+from ._http import aclose_client as aclose_http_client
+from ._http import run_sync as run_content_sync
 from .clarification import generate_clarification
 from .faq import generate_faq
-from .platform_scripts import generate_platform_scripts
+from .platform_scripts import generate_platform_scripts, generate_platform_scripts_streaming
 
 logger = get_logger(__name__)
 
-# 配置
-CONTENT_LLM_ENABLED = os.getenv("TRUTHCAST_CONTENT_LLM_ENABLED", "false").lower() == "true"
-CONTENT_LLM_MODEL = os.getenv("TRUTHCAST_CONTENT_LLM_MODEL", "")
-CONTENT_LLM_BASE_URL = os.getenv("TRUTHCAST_CONTENT_LLM_BASE_URL", os.getenv("TRUTHCAST_LLM_BASE_URL", "https://api.openai.com/v1"))
-CONTENT_LLM_API_KEY = os.getenv("TRUTHCAST_CONTENT_LLM_API_KEY", os.getenv("TRUTHCAST_LLM_API_KEY", ""))
-CONTENT_TIMEOUT_SEC = int(os.getenv("TRUTHCAST_CONTENT_TIMEOUT_SEC", "45"))
-DEBUG_CONTENT = os.getenv("TRUTHCAST_DEBUG_CONTENT", "true").lower() == "true"
-
 
 async def generate_full_content(request: ContentGenerateRequest) -> ContentGenerateResponse:
     """
@@ -49,31 +45,37 @@ async def generate_full_content(request: ContentGenerateRequest) -> ContentGener
     """
     logger.info("[Content] 开始生成应对内容, 风格=%s, 平台数=%d", request.style, len(request.platforms))
     
-    # 生成澄清稿
-    clarification = await generate_clarification(
-        original_text=request.text,
-        report=request.report,
-        simulation=request.simulation,
-        style=request.style,
-    )
-    
-    # 生成 FAQ
-    faq = None
+    # 澄清稿与 FAQ 互不依赖，并发生成；多平台话术只依赖澄清稿，
+    # 澄清稿一完成即启动，与仍在进行的 FAQ 重叠
+    faq_task: asyncio.Task[list[FAQItem]] | None = None
     if request.include_faq:
-        faq = await generate_faq(
+        faq_task = asyncio.create_task(
+            generate_faq(
+                original_text=request.text,
+                report=request.report,
+                simulation=request.simulation,
+                count=request.faq_count,
+            )
+        )
+    try:
+        clarification = await generate_clarification(
             original_text=request.text,
             report=request.report,
             simulation=request.simulation,
-            count=request.faq_count,
+            style=request.style,
         )
-    
-    # 生成多平台话术
-    platform_scripts = await generate_platform_scripts(
-        clarification=clarification,
-        report=request.report,
-        simulation=request.simulation,
-        platforms=request.platforms,
-    )
+        platform_scripts = await generate_platform_scripts(
+            clarification=clarification,
+            report=request.report,
+            simulation=request.simulation,
+            platforms=request.platforms,
+        )
+        faq = await faq_task if faq_task is not None else None
+    finally:
+        # 前序步骤异常（或请求被取消）时不留悬挂的 FAQ 请求；
+        # 不用 TaskGroup，以免异常被包装为 ExceptionGroup 改变调用方看到的类型
+        if faq_task is not None and not faq_task.done():
+            faq_task.cancel()
     
     # 构建响应
     response = ContentGenerateResponse(
@@ -115,37 +117,66 @@ async def generate_faq_only(request: ContentGenerateRequest) -> list[FAQItem]:
     )
 
 
+# 规则化澄清稿占位的固定文案（report 无摘要/可疑点时使用）
+_PLACEHOLDER_SHORT = "针对网传信息，我们已完成核查：当前缺乏可靠证据支持相关说法，请勿轻信与传播。"
+_PLACEHOLDER_CONCLUSION = "【核查结论】目前证据不足，建议保持谨慎并等待权威信息。"
+_PLACEHOLDER_SUSPICIOUS = "【可疑点】信息来源不明、缺乏可核查细节或权威出处。"
+_PLACEHOLDER_ADVICE = "【建议】不转发、不传播；如需引用，请附上权威来源链接。"
+_PLACEHOLDER_LONG_HEAD = "【说明】我们对网传内容进行了要点梳理与证据核对，结论基于当前可获得的信息。"
+_PLACEHOLDER_LONG_TAIL = "【后续】如出现新的权威通报或可靠证据，将及时更新。"
+
+
+def _placeholder_clarification(report: ReportResponse) -> ClarificationContent:
+    """基于 report 的轻量规则摘要构造澄清稿占位，不触发澄清稿生成链路"""
+    summary = (report.summary or "").strip()
+    suspicious_text = "；".join([s for s in (report.suspicious_points or []) if s])
+
+    short = summary or _PLACEHOLDER_SHORT
+    medium = "\n".join(
+        (
+            f"【核查结论】{summary}" if summary else _PLACEHOLDER_CONCLUSION,
+            f"【可疑点】{suspicious_text}" if suspicious_text else _PLACEHOLDER_SUSPICIOUS,
+            _PLACEHOLDER_ADVICE,
+        )
+    ).strip()
+    long = "\n\n".join((_PLACEHOLDER_LONG_HEAD, medium, _PLACEHOLDER_LONG_TAIL)).strip()
+    return ClarificationContent(short=short[:300], medium=medium[:1200], long=long[:3000])
+
+
 async def generate_platform_scripts_only(request: ContentGenerateRequest) -> list[PlatformScript]:
     """仅生成多平台话术"""
+    # 未指定平台时结果必为空，无需构造澄清稿占位
+    if not request.platforms:
+        return []
+
     # 说明：多平台话术生成需要“澄清稿”作为输入。
     # - 若前端已生成澄清稿，则可通过 request.clarification 复用，避免重复调用。
     # - 若未提供，则使用基于 report 的轻量规则摘要构造一个澄清稿占位（不再强制调用 generate_clarification）。
     clarification = request.clarification
     if clarification is None:
-        summary = (request.report.summary or "").strip()
-        suspicious = request.report.suspicious_points or []
-        suspicious_text = "；".join([s for s in suspicious if s])
-
-        # 简单规则化澄清稿：保证平台话术可生成且不额外触发澄清稿生成链路
-        short = summary or "针对网传信息，我们已完成核查：当前缺乏可靠证据支持相关说法，请勿轻信与传播。"
-        medium_parts = [
-            f"【核查结论】{summary}" if summary else "【核查结论】目前证据不足，建议保持谨慎并等待权威信息。",
-            f"【可疑点】{suspicious_text}" if suspicious_text else "【可疑点】信息来源不明、缺乏可核查细节或权威出处。",
-            "【建议】不转发、不传播；如需引用，请附上权威来源链接。",
-        ]
-        medium = "\n".join([p for p in medium_parts if p]).strip()
-        long_parts = [
-            "【说明】我们对网传内容进行了要点梳理与证据核对，结论基于当前可获得的信息。",
-            medium,
-            "【后续】如出现新的权威通报或可靠证据，将及时更新。",
-        ]
-        long = "\n\n".join([p for p in long_parts if p]).strip()
-
-        clarification = ClarificationContent(short=short[:300], medium=medium[:1200], long=long[:3000])
-    
+        clarification = _placeholder_clarification(request.report)
+
     return await generate_platform_scripts(
         clarification=clarification,
         report=request.report,
         simulation=request.simulation,
         platforms=request.platforms,
     )
+
+
+async def stream_platform_scripts_only(request: ContentGenerateRequest) -> AsyncIterator[PlatformScript]:
+    """仅生成多平台话术（流式）：按完成先后逐个产出，澄清稿来源同 generate_platform_scripts_only"""
+    if not request.platforms:
+        return
+
+    clarification = request.clarification
+    if clarification is None:
+        clarification = _placeholder_clarification(request.report)
+
+    async for script in generate_platform_scripts_streaming(
+        clarification=clarification,
+        report=request.report,
+        simulation=request.simulation,
+        platforms=request.platforms,
+    ):
+        yield script
@@ -0,0 +1,34 @@
+"""
+规则兜底标记
+
+LLM 未启用或调用失败时，各生成器改用规则兜底并调用 mark_fallback()；
+路由层用 track_fallbacks() 包住一次生成，据此跳过缓存写入，
+避免一次短暂的 LLM 故障让降级内容在整个缓存 TTL 内被复用。
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator
+
+# 保存可变集合：asyncio 子任务复制上下文时引用同一集合，子任务中的标记对调用方可见
+_fallbacks: contextvars.ContextVar[set[str] | None] = contextvars.ContextVar(
+    "content_fallbacks", default=None
+)
+
+
+def mark_fallback(module: str) -> None:
+    """记录某子模块使用了规则兜底（不在 track_fallbacks 内时忽略）"""
+    tracked = _fallbacks.get()
+    if tracked is not None:
+        tracked.add(module)
+
+
+@contextmanager
+def track_fallbacks() -> Iterator[set[str]]:
+    """收集块内（含其创建的子任务）使用规则兜底的子模块名"""
+    tracked: set[str] = set()
+    token = _fallbacks.set(tracked)
+    try:
+        yield tracked
+    finally:
+        _fallbacks.reset(token)
@@ -0,0 +1,52 @@
+"""
+内容生成模块共享的 httpx.AsyncClient
+
+澄清稿 / FAQ / 多平台话术的 LLM 请求复用同一连接池，省去逐次 TCP/TLS 握手。
+AsyncClient 的连接绑定事件循环，因此按事件循环各持有一个客户端：
+服务进程内始终复用主循环上的客户端；asyncio.run 临时循环用 run_sync 执行，结束时关闭。
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Coroutine, TypeVar
+from weakref import WeakKeyDictionary
+
+import httpx
+
+T = TypeVar("T")
+
+_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# HTTP/2 需可选依赖 h2（pip install httpx[http2]），未安装时退回 HTTP/1.1 连接复用
+_HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+
+
+def get_client() -> httpx.AsyncClient:
+    """返回当前事件循环上的共享客户端（超时由各请求单独指定）"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_LIMITS, http2=_HTTP2_ENABLED)
+        _clients[loop] = client
+    return client
+
+
+async def aclose_client() -> None:
+    """关闭当前事件循环上的共享客户端（应用关闭或临时循环结束时调用）"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """在新事件循环中执行协程，结束后关闭该循环上的共享客户端"""
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await aclose_client()
+
+    return asyncio.run(_main())
@@ -0,0 +1,26 @@
+"""
+内容生成共用的中文标签映射（模块级常量，避免在循环/每次调用中重建字典）
+"""
+
+# 主张最终立场（prompt 摘要用）
+STANCE_ZH: dict[str, str] = {
+    "support": "支持",
+    "oppose": "反对",
+    "insufficient_evidence": "证据不足",
+}
+
+# 主张最终立场（规则兜底 FAQ 的回答措辞）
+STANCE_VERDICT_ZH: dict[str, str] = {
+    "support": "有证据支持",
+    "oppose": "存在反驳证据",
+    "insufficient_evidence": "证据不足",
+}
+
+# 风险标签
+RISK_LABEL_ZH: dict[str, str] = {
+    "credible": "可信",
+    "suspicious": "可疑",
+    "high_risk": "高风险",
+    "needs_context": "需要补充语境",
+    "likely_misinformation": "疑似不实信息",
+}
@@ -0,0 +1,196 @@
+"""
+内容生成共享 LLM 调用
+
+澄清稿、FAQ、平台话术三个子模块的 LLM 调用流程完全一致（鉴权头、payload、
+trace、解析 JSON、失败返回 None），只在 system prompt、temperature、max_tokens 上不同，
+统一在此实现，各子模块只保留 prompt 构造与规则兜底。
+
+网络错误/超时与 429、5xx 视为暂时性故障，按指数退避（full jitter）重试，
+总尝试次数由 TRUTHCAST_CONTENT_LLM_MAX_ATTEMPTS 控制（默认 3）；
+其余错误直接走规则兜底。
+
+同时在途的 LLM 请求数由 TRUTHCAST_CONTENT_MAX_INFLIGHT 限制（默认 8）：多平台话术按平台
+并发扇出，突发请求易超出服务商 RPM/TPM。名额只在单次请求期间占用，退避等待时释放。
+
+TRUTHCAST_CONTENT_PROMPT_CACHE_KEY=true 时按报告附带 prompt_cache_key（OpenAI），
+同一报告的多次调用（尤其多平台话术共用澄清稿前缀）路由到同一提示缓存。
+部分 OpenAI 兼容服务不接受未知字段，故默认关闭。
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import httpx
+
+try:
+    # 可选加速（pip install truthcast[speedups]），直接解析响应字节
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - 取决于可选依赖
+    _json_loads = json.loads
+
+from app.core.logger import get_logger
+from app.schemas.detect import ReportResponse
+from app.services.content_generation._http import get_client
+from app.services.content_generation._trace import record_trace
+from app.services.content_generation.config import get_content_config
+from app.services.json_utils import safe_json_loads
+
+logger = get_logger(__name__)
+
+# asyncio.Semaphore 争用时绑定事件循环，按循环各持有一个（同 _http.get_client）
+_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _inflight_slot(limit: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(limit)
+        _semaphores[loop] = sem
+    return sem
+
+
+# 输出上限按预期字数估算：中文约 1~2 token/字，取 2 留足余量，另加 JSON 键名与结构开销。
+# 上限过大不会让回答更好，但会占用服务商按 max_tokens 预估的 TPM 配额
+_TOKENS_PER_CHAR = 2
+_JSON_OVERHEAD_TOKENS = 256
+_MAX_OUTPUT_TOKENS = 8000
+
+
+def output_token_budget(chars: int) -> int:
+    """按预期输出字数估算 max_tokens（不超过 8000）"""
+    return min(_MAX_OUTPUT_TOKENS, chars * _TOKENS_PER_CHAR + _JSON_OVERHEAD_TOKENS)
+
+
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+_RETRY_BACKOFF_INITIAL = 0.5
+_RETRY_BACKOFF_MAX = 8.0
+
+
+def _backoff_delay(attempt: int) -> float:
+    """第 attempt 次（从 1 开始）失败后的等待秒数；随机抖动避免并发请求同步重试"""
+    cap = min(_RETRY_BACKOFF_MAX, _RETRY_BACKOFF_INITIAL * 2 ** (attempt - 1))
+    return random.uniform(0, cap)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+async def _post_with_retry(
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    timeout: float,
+    max_attempts: int,
+    max_inflight: int,
+    tag: str,
+) -> httpx.Response:
+    slot = _inflight_slot(max_inflight)
+    attempt = 1
+    while True:
+        try:
+            async with slot:
+                response = await get_client().post(url, headers=headers, json=payload, timeout=timeout)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError as exc:
+            if attempt >= max_attempts or not _is_retryable(exc):
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning(
+                "[%s] LLM 调用暂时失败（第 %d/%d 次）: %s，%.2fs 后重试",
+                tag, attempt, max_attempts, exc, delay,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def prompt_cache_key(report: ReportResponse) -> str | None:
+    """按报告内容生成 prompt_cache_key；未开启时返回 None（不做序列化与哈希）"""
+    if not get_content_config().prompt_cache_key:
+        return None
+    digest = hashlib.blake2b(report.model_dump_json().encode(), digest_size=16).hexdigest()
+    return f"truthcast-content-{digest}"
+
+
+async def call_llm(
+    prompt: str,
+    system_prompt: str,
+    module_name: str,
+    temperature: float = 0.7,
+    max_tokens: int = 8000,
+    *,
+    log_tag: str | None = None,
+    cache_key: str | None = None,
+) -> dict[str, Any] | None:
+    """调用 LLM 并解析 JSON 输出；未启用、请求失败或解析失败时返回 None"""
+    config = get_content_config()
+    tag = log_tag or module_name
+    if not config.llm_enabled or not config.api_key:
+        logger.info("[%s] LLM not enabled or no API key", tag)
+        return None
+
+    headers = {
+        "Authorization": f"Bearer {config.api_key}",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "model": config.model or "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        # JSON mode：服务端保证返回 JSON 对象，不再夹带 Markdown 代码块或说明文字
+        "response_format": {"type": "json_object"},
+    }
+    if cache_key:
+        payload["prompt_cache_key"] = cache_key
+
+    record_trace(
+        module_name,
+        "llm_request",
+        {
+            "base_url": config.base_url,
+            "model": payload["model"],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "system_prompt": system_prompt,
+            "user_prompt": prompt,
+        },
+    )
+
+    try:
+        response = await _post_with_retry(
+            f"{config.base_url}/chat/completions",
+            headers,
+            payload,
+            config.timeout_sec,
+            config.max_attempts,
+            config.max_inflight,
+            tag,
+        )
+        data = _json_loads(response.content)
+        content = data["choices"][0]["message"]["content"]
+        result = safe_json_loads(content, module_name)
+        record_trace(
+            module_name,
+            "llm_response",
+            {
+                "raw_content": content,
+                "result": result,
+            },
+        )
+        return result
+    except Exception as exc:
+        logger.error("[%s] LLM 调用失败: %s", tag, exc)
+        record_trace(module_name, "llm_error", {"error": str(exc)})
+        return None
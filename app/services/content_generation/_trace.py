@@ -0,0 +1,121 @@
+"""
+内容生成 debug trace 写入
+
+各子模块的 LLM 请求/响应/错误记录先序列化为一行 JSON 放入有界队列，
+由后台线程批量追加到 debug/content_trace.jsonl：请求路径上不再逐条 open/close 文件，
+路径在导入时计算一次，目录只在首次写入失败时创建。队列满时丢弃该条 trace，从不阻塞请求。
+"""
+
+import atexit
+import json
+import queue
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.core.logger import get_logger
+from app.services.content_generation.config import get_content_config
+from app.services.json_utils import serialize_for_json
+
+try:
+    # 可选加速（pip install truthcast[speedups]）；trace 常含完整 prompt 与响应，体积较大
+    import orjson
+except ImportError:  # pragma: no cover - 取决于可选依赖
+    orjson = None
+
+logger = get_logger(__name__)
+
+# 项目根目录/debug/content_trace.jsonl，导入时计算一次
+TRACE_PATH = Path(__file__).resolve().parents[3] / "debug" / "content_trace.jsonl"
+
+_QUEUE_MAX = 1024
+_BATCH_MAX = 64
+
+_queue: "queue.Queue[str]" = queue.Queue(maxsize=_QUEUE_MAX)
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+
+def _append(data: str) -> None:
+    with open(TRACE_PATH, "a", encoding="utf-8") as f:
+        f.write(data)
+
+
+def _write_batch(lines: list[str]) -> None:
+    data = "".join(lines)
+    try:
+        try:
+            _append(data)
+        except FileNotFoundError:
+            # 目录仅在首次写入（或被删除）时创建，常规路径每批只做一次 open/write
+            TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _append(data)
+    except Exception as exc:
+        logger.error("写入 content trace 失败: %s", exc)
+
+
+def _writer_loop() -> None:
+    while True:
+        batch = [_queue.get()]
+        # 取到一条后顺带取走已排队的其余条目，合并为一次写入
+        while len(batch) < _BATCH_MAX:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        _write_batch(batch)
+        for _ in batch:
+            _queue.task_done()
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_writer_loop, name="content-trace-writer", daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+
+def _dumps_line(entry: dict[str, Any]) -> str:
+    # payload 多为 JSON 原生类型（prompt、响应文本、解析后的 dict），直接编码；
+    # 仅遇到 Pydantic 模型等非原生对象时才经 serialize_for_json 转换，省去整棵树的预遍历
+    if orjson is not None:
+        return orjson.dumps(
+            entry,
+            default=serialize_for_json,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+        ).decode()
+    return json.dumps(entry, ensure_ascii=False, default=serialize_for_json) + "\n"
+
+
+def record_trace(module: str, stage: str, payload: dict[str, Any]) -> None:
+    """记录一条 debug trace（TRUTHCAST_DEBUG_CONTENT 关闭时直接返回）"""
+    if not get_content_config().debug:
+        return
+    try:
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "module": module,
+            "stage": stage,
+            "payload": payload,
+        }
+        line = _dumps_line(entry)
+    except Exception as exc:
+        logger.error("序列化 content trace 失败: %s", exc)
+        return
+
+    _ensure_writer()
+    try:
+        _queue.put_nowait(line)
+    except queue.Full:
+        logger.warning("content trace 队列已满，丢弃一条 %s/%s 记录", module, stage)
+
+
+def flush() -> None:
+    """等待已排队的 trace 全部落盘（进程退出时自动调用）"""
+    if _writer is not None:
+        _queue.join()
@@ -7,12 +7,8 @@
 - 长版：约600字，适合正式发布
 """
 
-import json
 import os
-from datetime import datetime, timezone
-from typing import Any
-
-import httpx
+from functools import lru_cache
 
 from app.core.logger import get_logger
 from app.schemas.detect import (
@@ -21,23 +17,24 @@ from app.schemas.detect import (
     ReportResponse,
     SimulateResponse,
 )
-from app.services.json_utils import safe_json_loads, serialize_for_json
+from app.services.content_generation._fallback import mark_fallback
+from app.services.content_generation._i18n import RISK_LABEL_ZH, STANCE_ZH
+from app.services.content_generation._llm_client import call_llm, output_token_budget, prompt_cache_key
 
 logger = get_logger(__name__)
 
-# 配置
-CONTENT_LLM_ENABLED = os.getenv("TRUTHCAST_CONTENT_LLM_ENABLED", "false").lower() == "true"
-CONTENT_LLM_MODEL = os.getenv("TRUTHCAST_CONTENT_LLM_MODEL", "")
-CONTENT_LLM_BASE_URL = os.getenv("TRUTHCAST_CONTENT_LLM_BASE_URL", os.getenv("TRUTHCAST_LLM_BASE_URL", "https://api.openai.com/v1"))
-CONTENT_LLM_API_KEY = os.getenv("TRUTHCAST_CONTENT_LLM_API_KEY", os.getenv("TRUTHCAST_LLM_API_KEY", ""))
-CONTENT_TIMEOUT_SEC = int(os.getenv("TRUTHCAST_CONTENT_TIMEOUT_SEC", "45"))
-DEBUG_CONTENT = os.getenv("TRUTHCAST_DEBUG_CONTENT", "true").lower() == "true"
+SYSTEM_PROMPT = "你是公关专家，擅长撰写澄清稿和应对文案。输出必须为严格的 JSON 格式。"
 
 # 字数限制
 CLARIFICATION_SHORT_MAX = int(os.getenv("TRUTHCAST_CLARIFICATION_SHORT_MAX", "150"))
 CLARIFICATION_MEDIUM_MAX = int(os.getenv("TRUTHCAST_CLARIFICATION_MEDIUM_MAX", "400"))
 CLARIFICATION_LONG_MAX = int(os.getenv("TRUTHCAST_CLARIFICATION_LONG_MAX", "800"))
 
+# 三版合计超出上述字数的部分会被截断，输出上限按合计字数估算
+_MAX_TOKENS = output_token_budget(
+    CLARIFICATION_SHORT_MAX + CLARIFICATION_MEDIUM_MAX + CLARIFICATION_LONG_MAX
+)
+
 
 def _get_style_guidance(style: ClarificationStyle) -> str:
     """获取风格指导"""
@@ -53,11 +50,7 @@ def _build_claim_summary(report: ReportResponse) -> str:
     """构建主张摘要"""
     lines = []
     for cr in report.claim_reports:
-        stance_zh = {
-            "support": "支持",
-            "oppose": "反对",
-            "insufficient_evidence": "证据不足",
-        }.get(cr.final_stance, cr.final_stance)
+        stance_zh = STANCE_ZH.get(cr.final_stance, cr.final_stance)
         
         lines.append(f"- 主张: {cr.claim.claim_text[:50]}...")
         lines.append(f"  立场: {stance_zh}")
@@ -80,140 +73,77 @@ def _build_simulation_summary(simulation: SimulateResponse | None) -> str:
     return "\n".join(lines)
 
 
-def _record_trace(stage: str, payload: dict[str, Any]) -> None:
-    """记录 debug trace"""
-    if not DEBUG_CONTENT:
-        return
-    
-    try:
-        current_file = os.path.abspath(__file__)
-        services_dir = os.path.dirname(current_file)
-        content_dir = os.path.dirname(services_dir)
-        app_dir = os.path.dirname(content_dir)
-        project_root = os.path.dirname(app_dir)
-        
-        debug_dir = os.path.join(project_root, "debug")
-        os.makedirs(debug_dir, exist_ok=True)
-        trace_file = os.path.join(debug_dir, "content_trace.jsonl")
-        
-        entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "module": "clarification",
-            "stage": stage,
-            "payload": serialize_for_json(payload),
-        }
-        with open(trace_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception as exc:
-        logger.error("写入 content trace 失败: %s", exc)
-
-
-async def _call_llm(prompt: str) -> dict | None:
+async def _call_llm(prompt: str, cache_key: str | None = None) -> dict | None:
     """调用 LLM 生成澄清稿"""
-    if not CONTENT_LLM_ENABLED or not CONTENT_LLM_API_KEY:
-        logger.info("[Clarification] LLM not enabled or no API key")
-        return None
-    
-    headers = {
-        "Authorization": f"Bearer {CONTENT_LLM_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    
-    system_prompt = "你是公关专家，擅长撰写澄清稿和应对文案。输出必须为严格的 JSON 格式。"
-    user_prompt = prompt
+    return await call_llm(
+        prompt, SYSTEM_PROMPT, "clarification", temperature=0.7, max_tokens=_MAX_TOKENS,
+        log_tag="Clarification", cache_key=cache_key,
+    )
 
-    payload = {
-        "model": CONTENT_LLM_MODEL or "gpt-4o-mini",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "temperature": 0.7,
-        "max_tokens": 8000,
-    }
-    
-    _record_trace(
-        "llm_request",
-        {
-            "base_url": CONTENT_LLM_BASE_URL,
-            "model": payload.get("model"),
-            "temperature": payload.get("temperature"),
-            "max_tokens": payload.get("max_tokens"),
-            "system_prompt": system_prompt,
-            "user_prompt": user_prompt,
-        },
+
+def _report_fingerprint(report: ReportResponse) -> tuple:
+    """提取规则兜底读取的报告字段，冻结为可哈希的缓存键"""
+    return (
+        report.risk_label,
+        report.risk_level,
+        report.risk_score,
+        report.summary,
+        tuple(report.suspicious_points),
     )
-    
-    try:
-        async with httpx.AsyncClient(timeout=CONTENT_TIMEOUT_SEC) as client:
-            response = await client.post(
-                f"{CONTENT_LLM_BASE_URL}/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"]
-            result = safe_json_loads(content)
-            _record_trace(
-                "llm_response",
-                {
-                    "raw_content": content,
-                    "result": result,
-                },
-            )
-            return result
-    except Exception as exc:
-        logger.error("[Clarification] LLM 调用失败: %s", exc)
-        _record_trace("llm_error", {"error": str(exc)})
-        return None
 
 
-def _fallback_clarification(
-    report: ReportResponse,
-    style: ClarificationStyle,
-) -> ClarificationContent:
-    """规则兜底生成澄清稿"""
-    # 基于报告生成简化版澄清稿
-    risk_label_zh = {
-        "credible": "可信",
-        "suspicious": "可疑",
-        "high_risk": "高风险",
-        "needs_context": "需要补充语境",
-        "likely_misinformation": "疑似不实信息",
-    }.get(report.risk_label, report.risk_label)
+@lru_cache(maxsize=512)
+def _fallback_clarification_texts(fingerprint: tuple) -> tuple[str, str, str]:
+    """按报告指纹生成短/中/长三版澄清稿文本（纯函数，结果可缓存）"""
+    risk_label, risk_level, risk_score, summary, suspicious_points = fingerprint
+    risk_label_zh = RISK_LABEL_ZH.get(risk_label, risk_label)
     
     # 短版
-    short = f"经核实，该信息的可信度评估为「{risk_label_zh}」。"
-    if report.suspicious_points:
-        short += f"主要关注点：{report.suspicious_points[0][:30]}。"
-    short += "建议以官方渠道发布的信息为准。"
+    short_parts = [f"经核实，该信息的可信度评估为「{risk_label_zh}」。"]
+    if suspicious_points:
+        short_parts.append(f"主要关注点：{suspicious_points[0][:30]}。")
+    short_parts.append("建议以官方渠道发布的信息为准。")
+    short = "".join(short_parts)
     
     # 中版
-    medium = f"针对近期传播的相关信息，经核查评估为「{risk_label_zh}」。"
-    medium += f"风险等级：{report.risk_level}（满分100分中{report.risk_score}分）。"
-    if report.suspicious_points:
-        medium += f"主要疑点：{'；'.join(report.suspicious_points[:2])}。"
-    medium += "请广大公众以官方渠道发布的信息为准，不传谣、不信谣。"
+    medium_parts = [
+        f"针对近期传播的相关信息，经核查评估为「{risk_label_zh}」。",
+        f"风险等级：{risk_level}（满分100分中{risk_score}分）。",
+    ]
+    if suspicious_points:
+        medium_parts.append(f"主要疑点：{'；'.join(suspicious_points[:2])}。")
+    medium_parts.append("请广大公众以官方渠道发布的信息为准，不传谣、不信谣。")
+    medium = "".join(medium_parts)
     
     # 长版
-    long = f"【情况说明】\n\n"
-    long += f"针对近期网络传播的相关信息，现就核查情况说明如下：\n\n"
-    long += f"一、信息评估\n经核查，该信息的可信度评估为「{risk_label_zh}」，风险等级{report.risk_level}。\n\n"
-    long += f"二、核查依据\n{report.summary}\n\n"
-    if report.suspicious_points:
-        long += f"三、主要疑点\n"
-        for i, point in enumerate(report.suspicious_points, 1):
-            long += f"{i}. {point}\n"
-    long += f"\n四、建议\n请广大公众以官方渠道发布的信息为准，不传谣、不信谣，共同维护清朗网络空间。"
-    
-    return ClarificationContent(
-        short=short[:CLARIFICATION_SHORT_MAX],
-        medium=medium[:CLARIFICATION_MEDIUM_MAX],
-        long=long[:CLARIFICATION_LONG_MAX],
+    long_parts = [
+        "【情况说明】\n\n",
+        "针对近期网络传播的相关信息，现就核查情况说明如下：\n\n",
+        f"一、信息评估\n经核查，该信息的可信度评估为「{risk_label_zh}」，风险等级{risk_level}。\n\n",
+        f"二、核查依据\n{summary}\n\n",
+    ]
+    if suspicious_points:
+        long_parts.append("三、主要疑点\n")
+        long_parts.extend(f"{i}. {point}\n" for i, point in enumerate(suspicious_points, 1))
+    long_parts.append("\n四、建议\n请广大公众以官方渠道发布的信息为准，不传谣、不信谣，共同维护清朗网络空间。")
+    long = "".join(long_parts)
+    
+    return (
+        short[:CLARIFICATION_SHORT_MAX],
+        medium[:CLARIFICATION_MEDIUM_MAX],
+        long[:CLARIFICATION_LONG_MAX],
     )
 
 
+def _fallback_clarification(
+    report: ReportResponse,
+    style: ClarificationStyle,
+) -> ClarificationContent:
+    """规则兜底生成澄清稿（文本与风格无关，按报告指纹缓存）"""
+    short, medium, long = _fallback_clarification_texts(_report_fingerprint(report))
+    return ClarificationContent(short=short, medium=medium, long=long)
+
+
 async def generate_clarification(
     original_text: str,
     report: ReportResponse,
@@ -239,7 +169,7 @@ async def generate_clarification(
     claim_summary = _build_claim_summary(report)
     simulation_summary = _build_simulation_summary(simulation)
     
-    text_preview = original_text[:500] if len(original_text) > 500 else original_text
+    text_preview = original_text[:500]
     
     prompt = f"""你是公关专家，需要针对以下检测结果生成澄清稿。
 
@@ -276,7 +206,7 @@ async def generate_clarification(
 """
     
     # 尝试 LLM 生成
-    result = await _call_llm(prompt)
+    result = await _call_llm(prompt, prompt_cache_key(report))
     
     if result and "short" in result and "medium" in result and "long" in result:
         return ClarificationContent(
@@ -287,4 +217,5 @@ async def generate_clarification(
     
     # 回退到规则生成
     logger.info("[Clarification] 使用规则兜底生成")
+    mark_fallback("clarification")
     return _fallback_clarification(report, style)
@@ -0,0 +1,45 @@
+"""
+应对内容生成的 LLM 配置
+
+澄清稿 / FAQ / 多平台话术三个子模块共用同一组环境变量，
+此处解析一次并缓存，子模块只读取结果。
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.env_loader import int_env
+
+
+@dataclass(frozen=True, slots=True)
+class ContentLLMConfig:
+    """内容生成 LLM 配置（不可变，进程内共享）"""
+
+    llm_enabled: bool
+    model: str
+    base_url: str
+    api_key: str
+    timeout_sec: int
+    max_attempts: int
+    max_inflight: int
+    prompt_cache_key: bool
+    debug: bool
+
+
+@lru_cache(maxsize=1)
+def get_content_config() -> ContentLLMConfig:
+    return ContentLLMConfig(
+        llm_enabled=os.getenv("TRUTHCAST_CONTENT_LLM_ENABLED", "false").lower() == "true",
+        model=os.getenv("TRUTHCAST_CONTENT_LLM_MODEL", ""),
+        base_url=os.getenv(
+            "TRUTHCAST_CONTENT_LLM_BASE_URL",
+            os.getenv("TRUTHCAST_LLM_BASE_URL", "https://api.openai.com/v1"),
+        ),
+        api_key=os.getenv("TRUTHCAST_CONTENT_LLM_API_KEY", os.getenv("TRUTHCAST_LLM_API_KEY", "")),
+        timeout_sec=int_env("TRUTHCAST_CONTENT_TIMEOUT_SEC", 45),
+        max_attempts=max(1, int_env("TRUTHCAST_CONTENT_LLM_MAX_ATTEMPTS", 3)),
+        max_inflight=max(1, int_env("TRUTHCAST_CONTENT_MAX_INFLIGHT", 8)),
+        prompt_cache_key=os.getenv("TRUTHCAST_CONTENT_PROMPT_CACHE_KEY", "false").lower() == "true",
+        debug=os.getenv("TRUTHCAST_DEBUG_CONTENT", "true").lower() == "true",
+    )
@@ -8,12 +8,10 @@
 - 小红书、抖音、快手、B站
 """
 
-import json
+import asyncio
 import os
-from datetime import datetime, timezone
-from typing import Any
-
-import httpx
+from dataclasses import dataclass
+from typing import AsyncIterator
 
 from app.core.logger import get_logger
 from app.schemas.detect import (
@@ -23,17 +21,13 @@ from app.schemas.detect import (
     ReportResponse,
     SimulateResponse,
 )
-from app.services.json_utils import safe_json_loads, serialize_for_json
+from app.services.content_generation._fallback import mark_fallback
+from app.services.content_generation._llm_client import call_llm, output_token_budget, prompt_cache_key
+from app.services.content_generation.config import get_content_config
 
 logger = get_logger(__name__)
 
-# 配置
-CONTENT_LLM_ENABLED = os.getenv("TRUTHCAST_CONTENT_LLM_ENABLED", "false").lower() == "true"
-CONTENT_LLM_MODEL = os.getenv("TRUTHCAST_CONTENT_LLM_MODEL", "")
-CONTENT_LLM_BASE_URL = os.getenv("TRUTHCAST_CONTENT_LLM_BASE_URL", os.getenv("TRUTHCAST_LLM_BASE_URL", "https://api.openai.com/v1"))
-CONTENT_LLM_API_KEY = os.getenv("TRUTHCAST_CONTENT_LLM_API_KEY", os.getenv("TRUTHCAST_LLM_API_KEY", ""))
-CONTENT_TIMEOUT_SEC = int(os.getenv("TRUTHCAST_CONTENT_TIMEOUT_SEC", "45"))
-DEBUG_CONTENT = os.getenv("TRUTHCAST_DEBUG_CONTENT", "true").lower() == "true"
+SYSTEM_PROMPT = "你是新媒体运营专家，擅长针对不同平台生成适配的发布话术。输出必须为严格的 JSON 格式。"
 
 # 平台字数限制
 PLATFORM_WEIBO_MAX = int(os.getenv("TRUTHCAST_PLATFORM_WEIBO_MAX", "280"))
@@ -44,170 +38,116 @@ PLATFORM_KUAISHOU_MAX_SEC = int(os.getenv("TRUTHCAST_PLATFORM_KUAISHOU_MAX_SEC",
 PLATFORM_BILIBILI_MAX_SEC = int(os.getenv("TRUTHCAST_PLATFORM_BILIBILI_MAX_SEC", "180"))
 
 
+@dataclass(frozen=True, slots=True)
+class PlatformConfig:
+    """单个平台的话术约束（is_time 为 True 时 max_length 单位为秒，话术为口播脚本）"""
+
+    name: str
+    max_length: int
+    is_time: bool
+    features: tuple[str, ...]
+    tips: tuple[str, ...]
+
+
 # 平台配置
-PLATFORM_CONFIGS = {
-    Platform.WEIBO: {
-        "name": "微博",
-        "max_length": PLATFORM_WEIBO_MAX,
-        "features": ["话题标签", "转发友好", "口语化"],
-        "tips": ["最佳发布时间：工作日早8-9点或晚8-10点", "建议配图1-3张", "积极回复评论增加互动"],
-    },
-    Platform.WECHAT: {
-        "name": "微信公众号",
-        "max_length": PLATFORM_WECHAT_MAX,
-        "features": ["排版友好", "可插入引用", "图文并茂"],
-        "tips": ["标题建议使用疑问句或数字", "正文分段清晰", "配图建议3-5张"],
-    },
-    Platform.SHORT_VIDEO: {
-        "name": "短视频口播",
-        "max_length": 90,  # 秒
-        "features": ["开头吸引", "核心信息", "结尾互动"],
-        "tips": ["开头3秒抓眼球", "字幕清晰易读", "BGM选择合适"],
-    },
-    Platform.NEWS: {
-        "name": "新闻通稿",
-        "max_length": 800,
-        "features": ["倒金字塔结构", "正式客观", "可引用权威"],
-        "tips": ["标题简洁有力", "导语包含核心信息", "可联系权威媒体"],
-    },
-    Platform.OFFICIAL: {
-        "name": "官方声明",
-        "max_length": 600,
-        "features": ["正式严谨", "标题正文落款", "法律合规"],
-        "tips": ["需经法务审核", "落款需盖章", "保留签发记录"],
-    },
-    Platform.XIAOHONGSHU: {
-        "name": "小红书",
-        "max_length": PLATFORM_XIAOHONGSHU_MAX,
-        "features": ["标题吸引", "emoji适当", "种草风/分享风"],
-        "tips": ["标题可用疑问句或数字开头", "配图建议精美封面", "标签3-5个"],
-    },
-    Platform.DOUYIN: {
-        "name": "抖音",
-        "max_length": PLATFORM_DOUYIN_MAX_SEC,
-        "features": ["开头3秒抓眼球", "快节奏", "情绪饱满"],
-        "tips": ["开头前3秒最重要", "BGM选择热门音乐", "字幕大且清晰"],
-    },
-    Platform.KUAISHOU: {
-        "name": "快手",
-        "max_length": PLATFORM_KUAISHOU_MAX_SEC,
-        "features": ["接地气", "亲切", "互动引导强"],
-        "tips": ["开头可用提问吸引", "结尾引导评论", "画面自然真实"],
-    },
-    Platform.BILIBILI: {
-        "name": "B站",
-        "max_length": PLATFORM_BILIBILI_MAX_SEC,
-        "features": ["专业深度", "可引用数据", "2-3分钟"],
-        "tips": ["开头设置悬念", "可引用数据来源", "弹幕互动点设计"],
-    },
+PLATFORM_CONFIGS: dict[Platform, PlatformConfig] = {
+    Platform.WEIBO: PlatformConfig(
+        "微博",
+        PLATFORM_WEIBO_MAX,
+        False,
+        ("话题标签", "转发友好", "口语化"),
+        ("最佳发布时间：工作日早8-9点或晚8-10点", "建议配图1-3张", "积极回复评论增加互动"),
+    ),
+    Platform.WECHAT: PlatformConfig(
+        "微信公众号",
+        PLATFORM_WECHAT_MAX,
+        False,
+        ("排版友好", "可插入引用", "图文并茂"),
+        ("标题建议使用疑问句或数字", "正文分段清晰", "配图建议3-5张"),
+    ),
+    Platform.SHORT_VIDEO: PlatformConfig(
+        "短视频口播",
+        90,
+        True,
+        ("开头吸引", "核心信息", "结尾互动"),
+        ("开头3秒抓眼球", "字幕清晰易读", "BGM选择合适"),
+    ),
+    Platform.NEWS: PlatformConfig(
+        "新闻通稿",
+        800,
+        False,
+        ("倒金字塔结构", "正式客观", "可引用权威"),
+        ("标题简洁有力", "导语包含核心信息", "可联系权威媒体"),
+    ),
+    Platform.OFFICIAL: PlatformConfig(
+        "官方声明",
+        600,
+        False,
+        ("正式严谨", "标题正文落款", "法律合规"),
+        ("需经法务审核", "落款需盖章", "保留签发记录"),
+    ),
+    Platform.XIAOHONGSHU: PlatformConfig(
+        "小红书",
+        PLATFORM_XIAOHONGSHU_MAX,
+        False,
+        ("标题吸引", "emoji适当", "种草风/分享风"),
+        ("标题可用疑问句或数字开头", "配图建议精美封面", "标签3-5个"),
+    ),
+    Platform.DOUYIN: PlatformConfig(
+        "抖音",
+        PLATFORM_DOUYIN_MAX_SEC,
+        True,
+        ("开头3秒抓眼球", "快节奏", "情绪饱满"),
+        ("开头前3秒最重要", "BGM选择热门音乐", "字幕大且清晰"),
+    ),
+    Platform.KUAISHOU: PlatformConfig(
+        "快手",
+        PLATFORM_KUAISHOU_MAX_SEC,
+        True,
+        ("接地气", "亲切", "互动引导强"),
+        ("开头可用提问吸引", "结尾引导评论", "画面自然真实"),
+    ),
+    Platform.BILIBILI: PlatformConfig(
+        "B站",
+        PLATFORM_BILIBILI_MAX_SEC,
+        True,
+        ("专业深度", "可引用数据", "2-3分钟"),
+        ("开头设置悬念", "可引用数据来源", "弹幕互动点设计"),
+    ),
 }
 
+# 视频类平台：篇幅按时长计，话术为口播脚本
+_VIDEO_PLATFORMS = frozenset(p for p, cfg in PLATFORM_CONFIGS.items() if cfg.is_time)
+
 
 def _get_platform_requirements(platforms: list[Platform]) -> str:
     """获取平台要求描述"""
     lines = []
     for i, p in enumerate(platforms, 1):
-        config = PLATFORM_CONFIGS.get(p, {})
-        lines.append(f"{i}. {config.get('name', p.value)} ({p.value}):")
-        if "max_length" in config:
-            if p in [Platform.DOUYIN, Platform.KUAISHOU, Platform.BILIBILI, Platform.SHORT_VIDEO]:
-                lines.append(f"   - 时长: {config['max_length']}秒以内")
-            else:
-                lines.append(f"   - 字数: {config['max_length']}字以内")
-        if config.get("features"):
-            lines.append(f"   - 特点: {', '.join(config['features'])}")
-        if config.get("tips"):
-            lines.append(f"   - 发布建议: {config['tips'][0]}")
+        cfg = PLATFORM_CONFIGS.get(p)
+        if cfg is None:
+            lines.append(f"{i}. {p.value} ({p.value}):")
+            continue
+        lines.append(f"{i}. {cfg.name} ({p.value}):")
+        if cfg.is_time:
+            lines.append(f"   - 时长: {cfg.max_length}秒以内")
+        else:
+            lines.append(f"   - 字数: {cfg.max_length}字以内")
+        if cfg.features:
+            lines.append(f"   - 特点: {', '.join(cfg.features)}")
+        if cfg.tips:
+            lines.append(f"   - 发布建议: {cfg.tips[0]}")
     return "\n".join(lines)
 
 
-def _record_trace(stage: str, payload: dict[str, Any]) -> None:
-    """记录 debug trace"""
-    if not DEBUG_CONTENT:
-        return
-    
-    try:
-        current_file = os.path.abspath(__file__)
-        services_dir = os.path.dirname(current_file)
-        content_dir = os.path.dirname(services_dir)
-        app_dir = os.path.dirname(content_dir)
-        project_root = os.path.dirname(app_dir)
-        
-        debug_dir = os.path.join(project_root, "debug")
-        os.makedirs(debug_dir, exist_ok=True)
-        trace_file = os.path.join(debug_dir, "content_trace.jsonl")
-        
-        entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "module": "platform_scripts",
-            "stage": stage,
-            "payload": serialize_for_json(payload),
-        }
-        with open(trace_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception as exc:
-        logger.error("写入 content trace 失败: %s", exc)
-
-
-async def _call_llm(prompt: str) -> dict | None:
+async def _call_llm(
+    prompt: str, max_tokens: int = 8000, cache_key: str | None = None
+) -> dict | None:
     """调用 LLM 生成平台话术"""
-    if not CONTENT_LLM_ENABLED or not CONTENT_LLM_API_KEY:
-        logger.info("[PlatformScripts] LLM not enabled or no API key")
-        return None
-    
-    headers = {
-        "Authorization": f"Bearer {CONTENT_LLM_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    
-    system_prompt = "你是新媒体运营专家，擅长针对不同平台生成适配的发布话术。输出必须为严格的 JSON 格式。"
-    user_prompt = prompt
-
-    payload = {
-        "model": CONTENT_LLM_MODEL or "gpt-4o-mini",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "temperature": 0.7,
-        "max_tokens": 8000,
-    }
-    
-    _record_trace(
-        "llm_request",
-        {
-            "base_url": CONTENT_LLM_BASE_URL,
-            "model": payload.get("model"),
-            "temperature": payload.get("temperature"),
-            "max_tokens": payload.get("max_tokens"),
-            "system_prompt": system_prompt,
-            "user_prompt": user_prompt,
-        },
+    return await call_llm(
+        prompt, SYSTEM_PROMPT, "platform_scripts", temperature=0.7,
+        max_tokens=max_tokens, log_tag="PlatformScripts", cache_key=cache_key,
     )
-    
-    try:
-        async with httpx.AsyncClient(timeout=CONTENT_TIMEOUT_SEC) as client:
-            response = await client.post(
-                f"{CONTENT_LLM_BASE_URL}/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-            content = data["choices"][0]["message"]["content"]
-            result = safe_json_loads(content)
-            _record_trace(
-                "llm_response",
-                {
-                    "raw_content": content,
-                    "result": result,
-                },
-            )
-            return result
-    except Exception as exc:
-        logger.error("[PlatformScripts] LLM 调用失败: %s", exc)
-        _record_trace("llm_error", {"error": str(exc)})
-        return None
 
 
 def _fallback_platform_script(
@@ -216,14 +156,15 @@ def _fallback_platform_script(
     report: ReportResponse,
 ) -> PlatformScript:
     """规则兜底生成平台话术"""
-    config = PLATFORM_CONFIGS.get(platform, {})
+    cfg = PLATFORM_CONFIGS.get(platform)
+    tips = list(cfg.tips) if cfg is not None else []
     
     if platform == Platform.WEIBO:
         content = clarification.short[:PLATFORM_WEIBO_MAX]
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             hashtags=["#真相来了", "#辟谣"],
             estimated_read_time="30秒",
         )
@@ -233,7 +174,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time="2分钟",
         )
     
@@ -242,7 +183,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time="60秒",
         )
     
@@ -251,7 +192,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time="3分钟",
         )
     
@@ -260,7 +201,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time="2分钟",
         )
     
@@ -269,7 +210,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time="1分钟",
         )
     
@@ -278,7 +219,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time=f"{PLATFORM_DOUYIN_MAX_SEC}秒",
         )
     
@@ -287,7 +228,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time=f"{PLATFORM_KUAISHOU_MAX_SEC}秒",
         )
     
@@ -296,7 +237,7 @@ def _fallback_platform_script(
         return PlatformScript(
             platform=platform,
             content=content,
-            tips=config.get("tips", []),
+            tips=tips,
             estimated_read_time=f"{PLATFORM_BILIBILI_MAX_SEC}秒",
         )
     
@@ -309,29 +250,41 @@ def _fallback_platform_script(
         )
 
 
-async def generate_platform_scripts(
+# 单平台请求只需生成一条话术，输出上限按该平台篇幅估算：
+# 视频类按口播语速约 5 字/秒折算字数，另留 tips / hashtags 字段的字数
+_SPOKEN_CHARS_PER_SEC = 5
+_EXTRA_FIELD_CHARS = 150
+_DEFAULT_SINGLE_PLATFORM_MAX_TOKENS = 1024
+
+
+def _single_platform_max_tokens(cfg: PlatformConfig) -> int:
+    chars = cfg.max_length * _SPOKEN_CHARS_PER_SEC if cfg.is_time else cfg.max_length
+    return output_token_budget(chars + _EXTRA_FIELD_CHARS)
+
+
+_SINGLE_PLATFORM_MAX_TOKENS: dict[Platform, int] = {
+    p: _single_platform_max_tokens(cfg) for p, cfg in PLATFORM_CONFIGS.items()
+}
+
+
+def _build_single_platform_prompt(
+    platform: Platform,
     clarification: ClarificationContent,
     report: ReportResponse,
-    simulation: SimulateResponse | None,
-    platforms: list[Platform],
-) -> list[PlatformScript]:
-    """
-    生成多平台话术
-    
-    Args:
-        clarification: 澄清稿
-        report: 检测报告
-        simulation: 舆情预演结果
-        platforms: 目标平台列表
-        
-    Returns:
-        list[PlatformScript]: 平台话术列表
-    """
-    logger.info("[PlatformScripts] 开始生成多平台话术, 平台数=%d", len(platforms))
-    
-    platform_requirements = _get_platform_requirements(platforms)
-    
-    prompt = f"""你是新媒体运营专家，需要针对以下澄清稿生成多平台适配话术。
+) -> str:
+    """构建单个平台的话术生成 prompt"""
+    requirements = _get_platform_requirements([platform])
+    hashtag_rule = (
+        "hashtags 字段给出 2-3 个话题标签"
+        if platform == Platform.WEIBO
+        else "hashtags 字段可为 null"
+    )
+    script_rule = (
+        "content 为口播脚本格式"
+        if platform in _VIDEO_PLATFORMS
+        else "content 为可直接发布的正文"
+    )
+    return f"""你是新媒体运营专家，需要针对以下澄清稿生成指定平台的适配话术。
 
 【澄清稿基础内容】
 短版（约100字）：
@@ -348,67 +301,133 @@ async def generate_platform_scripts(
 - 场景: {report.detected_scenario}
 
 【目标平台】
-{platform_requirements}
+{requirements}
 
 【输出要求】
-为每个平台生成适配话术，输出 JSON 格式：
+只为该平台生成一条话术，输出 JSON 格式：
 {{
-  "scripts": [
-    {{
-      "platform": "weibo",
-      "content": "微博正文...",
-      "tips": ["发布建议1", "发布建议2"],
-      "hashtags": ["#话题1", "#话题2"]
-    }},
-    {{
-      "platform": "xiaohongshu",
-      "content": "小红书正文...",
-      "tips": ["发布建议1"],
-      "hashtags": null
-    }},
-    {{
-      "platform": "douyin",
-      "content": "抖音口播脚本...",
-      "tips": ["BGM建议", "字幕建议"],
-      "hashtags": null
-    }}
-  ]
+  "platform": "{platform.value}",
+  "content": "话术正文...",
+  "tips": ["发布建议1", "发布建议2"],
+  "hashtags": null
 }}
 
 注意：
-1. 微博必须包含 hashtags 字段（2-3个话题标签）
-2. 视频平台（抖音/快手/B站/短视频）的 content 应该是口播脚本格式
+1. {script_rule}
+2. {hashtag_rule}
 3. tips 字段给出具体的发布建议
 """
-    
-    # 尝试 LLM 生成
-    result = await _call_llm(prompt)
-    
-    if result and "scripts" in result:
-        scripts = []
-        platform_map = {p.value: p for p in platforms}
-        
-        for item in result["scripts"]:
-            platform_str = item.get("platform", "")
-            platform = platform_map.get(platform_str)
-            if platform:
-                scripts.append(PlatformScript(
-                    platform=platform,
-                    content=item.get("content", ""),
-                    tips=item.get("tips", []),
-                    hashtags=item.get("hashtags"),
-                    estimated_read_time=None,
-                ))
+
+
+def _script_from_llm(
+    platform: Platform,
+    result: dict | None,
+    clarification: ClarificationContent,
+    report: ReportResponse,
+) -> PlatformScript:
+    """把单平台 LLM 结果转为 PlatformScript；结果缺失或无正文时规则兜底"""
+    if not isinstance(result, dict) or not result.get("content"):
+        mark_fallback("platform_scripts")
+        return _fallback_platform_script(platform, clarification, report)
+    return PlatformScript(
+        platform=platform,
+        content=result.get("content", ""),
+        tips=result.get("tips") or [],
+        hashtags=result.get("hashtags"),
+        estimated_read_time=None,
+    )
+
+
+async def generate_platform_scripts(
+    clarification: ClarificationContent,
+    report: ReportResponse,
+    simulation: SimulateResponse | None,
+    platforms: list[Platform],
+) -> list[PlatformScript]:
+    """
+    生成多平台话术
+
+    每个平台独立发起一次 LLM 调用并发执行：总耗时取最慢的单个平台，
+    且单个平台失败只回退该平台，不影响其余平台。
+
+    Args:
+        clarification: 澄清稿
+        report: 检测报告
+        simulation: 舆情预演结果
+        platforms: 目标平台列表
         
-        # 补充缺失的平台
-        existing_platforms = {s.platform for s in scripts}
+    Returns:
+        list[PlatformScript]: 平台话术列表（顺序与 platforms 一致）
+    """
+    # 无目标平台：直接返回，省去 LLM 调用
+    if not platforms:
+        return []
+
+    logger.info("[PlatformScripts] 开始生成多平台话术, 平台数=%d", len(platforms))
+
+    config = get_content_config()
+    if not config.llm_enabled or not config.api_key:
+        logger.info("[PlatformScripts] LLM 未启用，使用规则兜底生成")
+        mark_fallback("platform_scripts")
+        return [_fallback_platform_script(p, clarification, report) for p in platforms]
+
+    # 各平台 prompt 共用澄清稿前缀，使用同一缓存键
+    cache_key = prompt_cache_key(report)
+    return list(
+        await asyncio.gather(
+            *(_generate_single(p, clarification, report, cache_key) for p in platforms)
+        )
+    )
+
+
+async def _generate_single(
+    platform: Platform,
+    clarification: ClarificationContent,
+    report: ReportResponse,
+    cache_key: str | None = None,
+) -> PlatformScript:
+    """单个平台：一次 LLM 调用，失败或无正文时规则兜底"""
+    result = await _call_llm(
+        _build_single_platform_prompt(platform, clarification, report),
+        max_tokens=_SINGLE_PLATFORM_MAX_TOKENS.get(platform, _DEFAULT_SINGLE_PLATFORM_MAX_TOKENS),
+        cache_key=cache_key,
+    )
+    return _script_from_llm(platform, result, clarification, report)
+
+
+async def generate_platform_scripts_streaming(
+    clarification: ClarificationContent,
+    report: ReportResponse,
+    simulation: SimulateResponse | None,
+    platforms: list[Platform],
+) -> AsyncIterator[PlatformScript]:
+    """
+    流式生成多平台话术：各平台并发调用，按完成先后逐个产出
+
+    首条话术的等待时间约为单个平台的耗时，而非最慢平台的耗时；
+    调用方提前停止迭代（如客户端断开）时取消尚未完成的平台请求。
+    """
+    if not platforms:
+        return
+
+    logger.info("[PlatformScripts] 开始流式生成多平台话术, 平台数=%d", len(platforms))
+
+    config = get_content_config()
+    if not config.llm_enabled or not config.api_key:
+        logger.info("[PlatformScripts] LLM 未启用，使用规则兜底生成")
+        mark_fallback("platform_scripts")
         for p in platforms:
-            if p not in existing_platforms:
-                scripts.append(_fallback_platform_script(p, clarification, report))
-        
-        if scripts:
-            return scripts
-    
-    # 回退到规则生成
-    logger.info("[PlatformScripts] 使用规则兜底生成")
-    return [_fallback_platform_script(p, clarification, report) for p in platforms]
+            yield _fallback_platform_script(p, clarification, report)
+        return
+
+    cache_key = prompt_cache_key(report)
+    tasks = [
+        asyncio.ensure_future(_generate_single(p, clarification, report, cache_key))
+        for p in platforms
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from html import escape
 from io import BytesIO
 from typing import Any
 
+from app.schemas.detect import EvidenceItem
 from app.schemas.export import ExportDataRequest
 
 _RISK_LABEL_MAP = {
@@ -83,6 +85,9 @@ _SIM_STANCE_MAP = {
     "curious": "好奇",
 }
 
+# 立场译文：舆情立场优先，其次通用立场（"supportive"/"neutral" 等两表重叠的键以舆情为准）
+_ZH_STANCE_MAP = {**_STANCE_MAP, **_SIM_STANCE_MAP}
+
 _PRIORITY_MAP = {"urgent": "紧急", "high": "高", "medium": "中"}
 _CATEGORY_MAP = {
     "official": "官方",
@@ -98,6 +103,37 @@ def _zh(value: str | None, mapping: dict[str, str]) -> str:
     return mapping.get(value, value)
 
 
+def _html_map(mapping: dict[str, str]) -> dict[str, str]:
+    return {key: escape(text) for key, text in mapping.items()}
+
+
+# HTML 报告中的枚举译文：模块加载时预先转义，命中时跳过 _zh 与 escape
+_RISK_LABEL_HTML = _html_map(_RISK_LABEL_MAP)
+_RISK_LEVEL_HTML = _html_map(_RISK_LEVEL_MAP)
+_SCENARIO_HTML = _html_map(_SCENARIO_MAP)
+_STANCE_HTML = _html_map(_STANCE_MAP)
+_SOURCE_TYPE_HTML = _html_map(_SOURCE_TYPE_MAP)
+_DOMAIN_HTML = _html_map(_DOMAIN_MAP)
+_EMOTION_HTML = _html_map(_EMOTION_MAP)
+_PRIORITY_HTML = _html_map(_PRIORITY_MAP)
+_CATEGORY_HTML = _html_map(_CATEGORY_MAP)
+_ZH_STANCE_HTML = _html_map(_ZH_STANCE_MAP)
+
+
+def _zh_html(value: str | None, escaped_mapping: dict[str, str]) -> str:
+    """等价于 escape(_zh(value, mapping))，escaped_mapping 须由 _html_map 生成"""
+    if not value:
+        return "-"
+    text = escaped_mapping.get(value)
+    return text if text is not None else escape(value)
+
+
+def _html_link(url: str) -> str:
+    # href 与链接文字为同一转义结果，只转义一次
+    escaped = escape(url)
+    return f"<a href='{escaped}'>{escaped}</a>"
+
+
 def _safe(value: str | None) -> str:
     return value or "-"
 
@@ -113,10 +149,13 @@ def _percent(value: float | int) -> str:
 
 
 def _zh_stance(value: str | None) -> str:
-    mapped = _zh(value, _SIM_STANCE_MAP)
-    if mapped == (value or "-"):
-        mapped = _zh(value, _STANCE_MAP)
-    return mapped
+    return _zh(value, _ZH_STANCE_MAP)
+
+
+def _item_attr(item: object, key: str, default: Any = None) -> Any:
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
 
 
 def _collect_primary_clarification(content_data: object) -> object | None:
@@ -130,32 +169,17 @@ def _collect_primary_clarification(content_data: object) -> object | None:
     if not clarifications:
         return None
     if primary_id:
+        # 单遍查找即可：只查一次，建 id 索引同样是 O(N)
         for item in clarifications:
-            item_id = (
-                item.get("id") if isinstance(item, dict) else getattr(item, "id", None)
-            )
-            if item_id == primary_id:
-                content = (
-                    item.get("content")
-                    if isinstance(item, dict)
-                    else getattr(item, "content", None)
-                )
+            if _item_attr(item, "id") == primary_id:
+                content = _item_attr(item, "content")
                 if content is not None:
                     return content
-    latest = sorted(
-        clarifications,
-        key=lambda x: (
-            x.get("generated_at", "")
-            if isinstance(x, dict)
-            else getattr(x, "generated_at", "")
-        ),
-        reverse=True,
-    )[0]
-    return (
-        latest.get("content")
-        if isinstance(latest, dict)
-        else getattr(latest, "content", None)
+    # 只需最新一条：max 单遍扫描，并列时与原稳定降序排序一样取靠前者
+    latest = max(
+        clarifications, key=lambda item: _item_attr(item, "generated_at", "")
     )
+    return _item_attr(latest, "content")
 
 
 def _clarification_field(clarification: object, field: str) -> str:
@@ -164,12 +188,29 @@ def _clarification_field(clarification: object, field: str) -> str:
     return str(getattr(clarification, field, "") or "")
 
 
-def _apply_word_zh_font(document: Any, font_name: str = "Microsoft YaHei") -> None:
+# Word 样式中的 Clark 形式属性名：(w:eastAsia, (w:asciiTheme, w:hAnsiTheme, w:eastAsiaTheme))
+_WordFontAttrs = tuple[str, tuple[str, ...]]
+
+
+@lru_cache(maxsize=1)
+def _word_font_attrs() -> _WordFontAttrs | None:
+    # 首次 Word 导出时解析一次，python-docx 仍按需导入，不拖慢应用启动
     try:
         from docx.oxml.ns import qn
     except Exception:
+        return None
+    theme_attrs = tuple(qn(f"w:{name}Theme") for name in ("ascii", "hAnsi", "eastAsia"))
+    return qn("w:eastAsia"), theme_attrs
+
+
+def _apply_word_zh_font(document: Any, font_name: str = "Microsoft YaHei") -> None:
+    attrs = _word_font_attrs()
+    if attrs is None:
         return
+    east_asia, theme_attrs = attrs
 
+    # 正文、表格单元格与列表段落均继承 Normal，标题继承各级 Heading：只改样式即可，
+    # 无需逐个 run 写入。默认模板的标题样式带 *Theme 字体属性，其优先级高于显式字体名，须一并去除
     style_names = ["Normal", "Heading 1", "Heading 2", "Heading 3", "Heading 4"]
     for style_name in style_names:
         try:
@@ -177,27 +218,28 @@ def _apply_word_zh_font(document: Any, font_name: str = "Microsoft YaHei") -> No
         except Exception:
             continue
         style.font.name = font_name
-        style._element.get_or_add_rPr().rFonts.set(qn("w:eastAsia"), font_name)
+        r_fonts = style._element.get_or_add_rPr().get_or_add_rFonts()
+        for attr in theme_attrs:
+            r_fonts.attrib.pop(attr, None)
+        r_fonts.set(east_asia, font_name)
 
-    for paragraph in document.paragraphs:
-        for run in paragraph.runs:
-            run.font.name = font_name
-            run._element.get_or_add_rPr().rFonts.set(qn("w:eastAsia"), font_name)
 
-    for table in document.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = font_name
-                        run._element.get_or_add_rPr().rFonts.set(
-                            qn("w:eastAsia"), font_name
-                        )
+def _add_word_table(doc: Any, header: list[str], rows: list[list[str]]) -> Any:
+    # 按最终行数一次建表：逐行 add_row 每次都要改写 XML 树并复制网格列宽
+    table = doc.add_table(rows=len(rows) + 1, cols=len(header))
+    for table_row, values in zip(table.rows, [header, *rows]):
+        for cell, value in zip(table_row.cells, values):
+            cell.text = value
+    return table
 
 
-def _group_evidence(data: ExportDataRequest) -> list[tuple[str, str, list[object]]]:
+# (claim_id, claim_text, 对齐到该主张的证据)
+_EvidenceGroup = tuple[str, str, list[EvidenceItem]]
+
+
+def _group_evidence(data: ExportDataRequest) -> list[_EvidenceGroup]:
     if data.report and data.report.claim_reports:
-        grouped: list[tuple[str, str, list[object]]] = []
+        grouped: list[_EvidenceGroup] = []
         for claim_report in data.report.claim_reports:
             grouped.append(
                 (
@@ -209,7 +251,7 @@ def _group_evidence(data: ExportDataRequest) -> list[tuple[str, str, list[object
         return grouped
 
     claim_text_map = {claim.claim_id: claim.claim_text for claim in data.claims}
-    buckets: dict[str, list[object]] = {}
+    buckets: dict[str, list[EvidenceItem]] = {}
     for evidence in data.evidences:
         buckets.setdefault(evidence.claim_id or "unknown", []).append(evidence)
 
@@ -221,8 +263,71 @@ def _group_evidence(data: ExportDataRequest) -> list[tuple[str, str, list[object
     return grouped
 
 
-def _build_html(data: ExportDataRequest) -> str:
-    parts: list[str] = []
+# 固定结构的汇总表整表一次格式化，每条证据只生成一个片段
+_DETECT_TABLE_TMPL = (
+    "<table><tr><th>项目</th><th>值</th></tr>\n"
+    "<tr><td>风险标签</td><td>{label}</td></tr>\n"
+    "<tr><td>风险分数</td><td>{score}</td></tr>\n"
+    "<tr><td>置信度</td><td>{confidence}</td></tr>\n"
+    "</table>"
+)
+
+_EVIDENCE_TABLE_TMPL = (
+    "<table><tr><th>属性</th><th>值</th></tr>\n"
+    "<tr><td>立场</td><td>{stance}</td></tr>\n"
+    "<tr><td>来源</td><td>{source}</td></tr>\n"
+    "<tr><td>来源类型</td><td>{source_type}</td></tr>\n"
+    "<tr><td>权重</td><td>{weight:.2f}</td></tr>\n"
+    "<tr><td>领域</td><td>{domain}</td></tr>\n"
+    "{alignment}</table>"
+)
+
+_ALIGNMENT_ROW_TMPL = "<tr><td>对齐置信度</td><td>{:.2f}</td></tr>\n"
+
+_REPORT_TABLE_TMPL = (
+    "<table><tr><th>项目</th><th>值</th></tr>\n"
+    "<tr><td>风险评级</td><td>{risk_label}（{risk_level}风险）</td></tr>\n"
+    "<tr><td>风险分数</td><td>{risk_score}</td></tr>\n"
+    "<tr><td>识别场景</td><td>{scenario}</td></tr>\n"
+    "<tr><td>证据覆盖域</td><td>{domains}</td></tr>\n"
+    "</table>"
+)
+
+# HTML 文档头尾为静态文本，模块加载时确定
+_HTML_HEAD = """
+<!doctype html>
+<html lang="zh-CN">
+<head>
+  <meta charset="utf-8" />
+  <style>
+    @page { size: A4; margin: 18mm; }
+    body { font-family: 'Noto Sans CJK SC', 'Microsoft YaHei', 'PingFang SC', sans-serif; font-size: 12px; line-height: 1.6; color: #1f2937; }
+    h1 { font-size: 24px; margin: 0 0 12px; }
+    h2 { font-size: 18px; margin: 20px 0 8px; border-bottom: 1px solid #e5e7eb; padding-bottom: 4px; }
+    h3 { font-size: 14px; margin: 14px 0 6px; }
+    h4 { font-size: 12px; margin: 10px 0 4px; }
+    p, li { white-space: pre-wrap; word-break: break-word; }
+    table { width: 100%; border-collapse: collapse; margin: 8px 0 12px; }
+    th, td { border: 1px solid #d1d5db; text-align: left; vertical-align: top; padding: 6px; }
+    .quote { background: #f9fafb; border-left: 4px solid #93c5fd; padding: 8px 10px; }
+  </style>
+</head>
+<body>"""
+
+_HTML_TAIL = """<hr />
+<p>本报告由 TruthCast 智能研判台自动生成，仅供辅助决策参考。</p>
+</body>
+</html>
+"""
+
+
+def _build_html(
+    data: ExportDataRequest,
+    *,
+    grouped: list[_EvidenceGroup] | None = None,
+) -> str:
+    # 文档头尾与正文片段放在同一列表中一次 join，避免正文再拷贝进外层模板
+    parts: list[str] = [_HTML_HEAD]
     parts.append("<h1>TruthCast 智能研判报告</h1>")
     parts.append(f"<p><strong>导出时间：</strong>{escape(_exported_at(data))}</p>")
 
@@ -241,9 +346,7 @@ def _build_html(data: ExportDataRequest) -> str:
         )
         source_url = _safe(data.report.source_url)
         if source_url != "-":
-            parts.append(
-                f"<tr><td>链接</td><td><a href='{escape(source_url)}'>{escape(source_url)}</a></td></tr>"
-            )
+            parts.append(f"<tr><td>链接</td><td>{_html_link(source_url)}</td></tr>")
         else:
             parts.append("<tr><td>链接</td><td>-</td></tr>")
         parts.append(
@@ -254,13 +357,15 @@ def _build_html(data: ExportDataRequest) -> str:
     if data.detect_data:
         detect = data.detect_data
         parts.append("<h2>风险快照</h2>")
-        parts.append("<table><tr><th>项目</th><th>值</th></tr>")
         parts.append(
-            f"<tr><td>风险标签</td><td>{escape(_zh(detect.label, _RISK_LABEL_MAP))}</td></tr>"
+            _DETECT_TABLE_TMPL.format_map(
+                {
+                    "label": _zh_html(detect.label, _RISK_LABEL_HTML),
+                    "score": detect.score,
+                    "confidence": detect.confidence,
+                }
+            )
         )
-        parts.append(f"<tr><td>风险分数</td><td>{detect.score}</td></tr>")
-        parts.append(f"<tr><td>置信度</td><td>{detect.confidence}</td></tr>")
-        parts.append("</table>")
         if detect.reasons:
             parts.append("<h3>风险理由</h3><ul>")
             for reason in detect.reasons:
@@ -279,7 +384,7 @@ def _build_html(data: ExportDataRequest) -> str:
             )
         parts.append("</table>")
 
-    grouped_evidence = _group_evidence(data)
+    grouped_evidence = _group_evidence(data) if grouped is None else grouped
     if grouped_evidence:
         parts.append("<h2>证据链</h2>")
         for claim_id, claim_text, evidences in grouped_evidence:
@@ -288,59 +393,50 @@ def _build_html(data: ExportDataRequest) -> str:
                 parts.append("<p>暂无对齐证据</p>")
                 continue
             for idx, evidence in enumerate(evidences, start=1):
-                is_summary = getattr(evidence, "source_type", "") == "web_summary"
-                title = (
-                    _safe(getattr(evidence, "summary", None))
-                    if is_summary
-                    else _safe(getattr(evidence, "title", None))
-                )
+                is_summary = evidence.source_type == "web_summary"
+                title = _safe(evidence.summary if is_summary else evidence.title)
                 parts.append(f"<h4>证据 {idx}: {escape(title)}</h4>")
-                parts.append("<table><tr><th>属性</th><th>值</th></tr>")
+                alignment = evidence.alignment_confidence
                 parts.append(
-                    f"<tr><td>立场</td><td>{escape(_zh(getattr(evidence, 'stance', None), _STANCE_MAP))}</td></tr>"
-                )
-                parts.append(
-                    f"<tr><td>来源</td><td>{escape(_safe(getattr(evidence, 'source', None)))}</td></tr>"
-                )
-                parts.append(
-                    f"<tr><td>来源类型</td><td>{escape(_zh(getattr(evidence, 'source_type', None), _SOURCE_TYPE_MAP))}</td></tr>"
-                )
-                parts.append(
-                    f"<tr><td>权重</td><td>{float(getattr(evidence, 'source_weight', 0.0)):.2f}</td></tr>"
-                )
-                parts.append(
-                    f"<tr><td>领域</td><td>{escape(_zh(getattr(evidence, 'domain', None), _DOMAIN_MAP))}</td></tr>"
-                )
-                if getattr(evidence, "alignment_confidence", None) is not None:
-                    parts.append(
-                        f"<tr><td>对齐置信度</td><td>{float(getattr(evidence, 'alignment_confidence')):.2f}</td></tr>"
+                    _EVIDENCE_TABLE_TMPL.format_map(
+                        {
+                            "stance": _zh_html(evidence.stance, _STANCE_HTML),
+                            "source": escape(_safe(evidence.source)),
+                            "source_type": _zh_html(
+                                evidence.source_type, _SOURCE_TYPE_HTML
+                            ),
+                            "weight": float(evidence.source_weight),
+                            "domain": _zh_html(evidence.domain, _DOMAIN_HTML),
+                            "alignment": (
+                                _ALIGNMENT_ROW_TMPL.format(float(alignment))
+                                if alignment is not None
+                                else ""
+                            ),
+                        }
                     )
-                parts.append("</table>")
+                )
 
-                summary = getattr(evidence, "summary", None)
+                summary = evidence.summary
                 if summary and not is_summary:
                     parts.append(f"<p><strong>摘要：</strong>{escape(summary)}</p>")
 
-                rationale = getattr(evidence, "alignment_rationale", None)
+                rationale = evidence.alignment_rationale
                 if rationale:
                     parts.append(
                         f"<p><strong>对齐理由：</strong>{escape(rationale)}</p>"
                     )
 
-                source_urls = getattr(evidence, "source_urls", None)
+                source_urls = evidence.source_urls
                 if source_urls:
                     parts.append(
                         f"<p><strong>来源链接（{len(source_urls)}条）</strong></p><ul>"
                     )
                     for url in source_urls:
-                        parts.append(
-                            f"<li><a href='{escape(url)}'>{escape(url)}</a></li>"
-                        )
+                        parts.append(f"<li>{_html_link(url)}</li>")
                     parts.append("</ul>")
                 else:
-                    url = _safe(getattr(evidence, "url", None))
                     parts.append(
-                        f"<p><strong>链接：</strong><a href='{escape(url)}'>{escape(url)}</a></p>"
+                        f"<p><strong>链接：</strong>{_html_link(_safe(evidence.url))}</p>"
                     )
 
     if data.report:
@@ -351,16 +447,17 @@ def _build_html(data: ExportDataRequest) -> str:
             if report.evidence_domains
             else "-"
         )
-        parts.append("<table><tr><th>项目</th><th>值</th></tr>")
-        parts.append(
-            f"<tr><td>风险评级</td><td>{escape(_zh(report.risk_label, _RISK_LABEL_MAP))}（{escape(_zh(report.risk_level, _RISK_LEVEL_MAP))}风险）</td></tr>"
-        )
-        parts.append(f"<tr><td>风险分数</td><td>{report.risk_score}</td></tr>")
         parts.append(
-            f"<tr><td>识别场景</td><td>{escape(_zh(report.detected_scenario, _SCENARIO_MAP))}</td></tr>"
+            _REPORT_TABLE_TMPL.format_map(
+                {
+                    "risk_label": _zh_html(report.risk_label, _RISK_LABEL_HTML),
+                    "risk_level": _zh_html(report.risk_level, _RISK_LEVEL_HTML),
+                    "risk_score": report.risk_score,
+                    "scenario": _zh_html(report.detected_scenario, _SCENARIO_HTML),
+                    "domains": escape(domains_zh),
+                }
+            )
         )
-        parts.append(f"<tr><td>证据覆盖域</td><td>{escape(domains_zh)}</td></tr>")
-        parts.append("</table>")
         parts.append(f"<p><strong>摘要：</strong>{escape(report.summary)}</p>")
         if report.suspicious_points:
             parts.append("<h3>可疑点</h3><ul>")
@@ -375,7 +472,7 @@ def _build_html(data: ExportDataRequest) -> str:
                     f"<p><strong>主张：</strong>{escape(claim_report.claim.claim_text)}</p>"
                 )
                 parts.append(
-                    f"<p><strong>最终立场：</strong>{escape(_zh_stance(claim_report.final_stance))}</p>"
+                    f"<p><strong>最终立场：</strong>{_zh_html(claim_report.final_stance, _ZH_STANCE_HTML)}</p>"
                 )
                 if claim_report.notes:
                     parts.append("<ul>")
@@ -391,18 +488,15 @@ def _build_html(data: ExportDataRequest) -> str:
         parts.append("<table><tr><th>情绪</th><th>占比</th></tr>")
         for key, value in simulation.emotion_distribution.items():
             parts.append(
-                f"<tr><td>{escape(_zh(key, _EMOTION_MAP))}</td><td>{_percent(value)}</td></tr>"
+                f"<tr><td>{_zh_html(key, _EMOTION_HTML)}</td><td>{_percent(value)}</td></tr>"
             )
         parts.append("</table>")
 
         parts.append("<h3>立场分布</h3>")
         parts.append("<table><tr><th>立场</th><th>占比</th></tr>")
         for key, value in simulation.stance_distribution.items():
-            stance_text = _zh(key, _SIM_STANCE_MAP)
-            if stance_text == key:
-                stance_text = _zh(key, _STANCE_MAP)
             parts.append(
-                f"<tr><td>{escape(stance_text)}</td><td>{_percent(value)}</td></tr>"
+                f"<tr><td>{_zh_html(key, _ZH_STANCE_HTML)}</td><td>{_percent(value)}</td></tr>"
             )
         parts.append("</table>")
 
@@ -414,7 +508,7 @@ def _build_html(data: ExportDataRequest) -> str:
                     f"<p><strong>概率：</strong>{_percent(narrative.probability)}</p>"
                 )
                 parts.append(
-                    f"<p><strong>立场：</strong>{escape(_zh_stance(narrative.stance))}</p>"
+                    f"<p><strong>立场：</strong>{_zh_html(narrative.stance, _ZH_STANCE_HTML)}</p>"
                 )
                 parts.append(
                     f"<p><strong>触发词：</strong>{escape(', '.join(narrative.trigger_keywords) if narrative.trigger_keywords else '-')}</p>"
@@ -450,8 +544,8 @@ def _build_html(data: ExportDataRequest) -> str:
             for action in simulation.suggestion.actions:
                 parts.append(
                     "<tr>"
-                    f"<td>{escape(_zh(action.priority, _PRIORITY_MAP))}</td>"
-                    f"<td>{escape(_zh(action.category, _CATEGORY_MAP))}</td>"
+                    f"<td>{_zh_html(action.priority, _PRIORITY_HTML)}</td>"
+                    f"<td>{_zh_html(action.category, _CATEGORY_HTML)}</td>"
                     f"<td>{escape(action.action)}</td>"
                     f"<td>{escape(_safe(action.timeline))}</td>"
                     f"<td>{escape(_safe(action.responsible))}</td>"
@@ -494,32 +588,8 @@ def _build_html(data: ExportDataRequest) -> str:
                 parts.append(f"<h4>{escape(platform)}</h4>")
                 parts.append(f"<p>{escape(script.content)}</p>")
 
-    body = "\n".join(parts)
-    return f"""
-<!doctype html>
-<html lang=\"zh-CN\">
-<head>
-  <meta charset=\"utf-8\" />
-  <style>
-    @page {{ size: A4; margin: 18mm; }}
-    body {{ font-family: 'Noto Sans CJK SC', 'Microsoft YaHei', 'PingFang SC', sans-serif; font-size: 12px; line-height: 1.6; color: #1f2937; }}
-    h1 {{ font-size: 24px; margin: 0 0 12px; }}
-    h2 {{ font-size: 18px; margin: 20px 0 8px; border-bottom: 1px solid #e5e7eb; padding-bottom: 4px; }}
-    h3 {{ font-size: 14px; margin: 14px 0 6px; }}
-    h4 {{ font-size: 12px; margin: 10px 0 4px; }}
-    p, li {{ white-space: pre-wrap; word-break: break-word; }}
-    table {{ width: 100%; border-collapse: collapse; margin: 8px 0 12px; }}
-    th, td {{ border: 1px solid #d1d5db; text-align: left; vertical-align: top; padding: 6px; }}
-    .quote {{ background: #f9fafb; border-left: 4px solid #93c5fd; padding: 8px 10px; }}
-  </style>
-</head>
-<body>
-{body}
-<hr />
-<p>本报告由 TruthCast 智能研判台自动生成，仅供辅助决策参考。</p>
-</body>
-</html>
-"""
+    parts.append(_HTML_TAIL)
+    return "\n".join(parts)
 
 
 def generate_pdf_bytes(data: ExportDataRequest) -> bytes:
@@ -528,64 +598,317 @@ def generate_pdf_bytes(data: ExportDataRequest) -> bytes:
     except Exception:
         return _generate_pdf_with_reportlab(data)
 
-    html = _build_html(data)
+    # 证据分组只算一次：weasyprint 失败降级时 reportlab 排版直接复用
+    grouped = _group_evidence(data)
+    html = _build_html(data, grouped=grouped)
     try:
         rendered = HTML(string=html).write_pdf()
         if not rendered:
-            return _generate_pdf_with_reportlab(data)
+            return _generate_pdf_with_reportlab(data, grouped=grouped)
         return bytes(rendered)
     except Exception:
-        return _generate_pdf_with_reportlab(data)
+        return _generate_pdf_with_reportlab(data, grouped=grouped)
 
 
-def _generate_pdf_with_reportlab(data: ExportDataRequest) -> bytes:
+def _generate_pdf_with_reportlab(
+    data: ExportDataRequest,
+    *,
+    grouped: list[_EvidenceGroup] | None = None,
+) -> bytes:
+    """weasyprint 不可用时的降级渲染：直接由 data 构建 Platypus 流式版面，不经 HTML 中转"""
     try:
+        from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import mm
         from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-        from reportlab.pdfgen import canvas
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
     except Exception as exc:
         raise RuntimeError(
             "PDF 导出失败：weasyprint 不可用且 reportlab 未安装，请安装依赖后重试"
         ) from exc
 
-    html_text = _build_html(data)
-    lines = [
-        line.strip()
-        for line in html_text.replace("<", "\n<").replace(">", ">\n").splitlines()
-    ]
-    lines = [line for line in lines if line and not line.startswith("<")]
-
-    width, height = A4
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
     font_name = "Helvetica"
-    line_height = 16
-
     try:
         pdfmetrics.registerFont(UnicodeCIDFont("STSong-Light"))
         font_name = "STSong-Light"
-        line_height = 18
     except Exception:
-        font_name = "Helvetica"
-
-    y = height - 30
-    pdf.setFont(font_name, 11)
-    for line in lines:
-        text = line.replace("&nbsp;", " ")
-        if len(text) > 110:
-            chunks = [text[i : i + 110] for i in range(0, len(text), 110)]
-        else:
-            chunks = [text]
-        for chunk in chunks:
-            y -= line_height
-            if y < 30:
-                pdf.showPage()
-                pdf.setFont(font_name, 11)
-                y = height - 30
-            pdf.drawString(30, y, chunk)
-
-    pdf.save()
+        pass
+
+    def _style(name: str, size: float, space_before: float = 0) -> ParagraphStyle:
+        return ParagraphStyle(
+            name,
+            fontName=font_name,
+            fontSize=size,
+            leading=size * 1.5,
+            spaceBefore=space_before,
+            spaceAfter=4,
+            wordWrap="CJK",
+        )
+
+    body = _style("body", 10)
+    headings = {
+        1: _style("h1", 18),
+        2: _style("h2", 14, space_before=10),
+        3: _style("h3", 12, space_before=6),
+        4: _style("h4", 10.5, space_before=4),
+    }
+    cell = ParagraphStyle("cell", parent=body, spaceAfter=0)
+    # 所有表格共用一份样式
+    table_style = TableStyle(
+        [
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d5db")),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f3f4f6")),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]
+    )
+    page_width, _ = A4
+    margin = 18 * mm
+    content_width = page_width - 2 * margin
+
+    story: list[Any] = []
+
+    def heading(text: str, level: int) -> None:
+        story.append(Paragraph(escape(text), headings[level]))
+
+    def para(text: str, label: str | None = None) -> None:
+        markup = escape(text).replace("\n", "<br/>")
+        if label:
+            markup = f"<b>{escape(label)}</b>{markup}"
+        story.append(Paragraph(markup, body))
+
+    def bullets(items: list[str]) -> None:
+        for item in items:
+            story.append(Paragraph(f"• {escape(item)}", body))
+
+    def table(header: list[str], rows: list[list[str]]) -> None:
+        cells = [
+            [Paragraph(escape(str(value)), cell) for value in row]
+            for row in [header, *rows]
+        ]
+        col_width = content_width / len(header)
+        flowable = Table(cells, colWidths=[col_width] * len(header), repeatRows=1)
+        flowable.setStyle(table_style)
+        story.append(flowable)
+
+    heading("TruthCast 智能研判报告", 1)
+    para(_exported_at(data), label="导出时间：")
+
+    heading("原始输入", 2)
+    para(data.input_text)
+
+    if data.report and (
+        data.report.source_url
+        or data.report.source_title
+        or data.report.source_publish_date
+    ):
+        heading("原始来源", 2)
+        table(
+            ["项目", "值"],
+            [
+                ["标题", _safe(data.report.source_title)],
+                ["链接", _safe(data.report.source_url)],
+                ["发布时间", _safe(data.report.source_publish_date)],
+            ],
+        )
+
+    if data.detect_data:
+        detect = data.detect_data
+        heading("风险快照", 2)
+        table(
+            ["项目", "值"],
+            [
+                ["风险标签", _zh(detect.label, _RISK_LABEL_MAP)],
+                ["风险分数", str(detect.score)],
+                ["置信度", str(detect.confidence)],
+            ],
+        )
+        if detect.reasons:
+            heading("风险理由", 3)
+            bullets(detect.reasons)
+
+    if data.claims:
+        heading("主张抽取", 2)
+        table(
+            ["ID", "主张内容"],
+            [[claim.claim_id, claim.claim_text] for claim in data.claims],
+        )
+
+    grouped_evidence = _group_evidence(data) if grouped is None else grouped
+    if grouped_evidence:
+        heading("证据链", 2)
+        for claim_id, claim_text, evidences in grouped_evidence:
+            heading(f"{claim_id}: {claim_text}", 3)
+            if not evidences:
+                para("暂无对齐证据")
+                continue
+            for idx, evidence in enumerate(evidences, start=1):
+                is_summary = evidence.source_type == "web_summary"
+                title = _safe(evidence.summary if is_summary else evidence.title)
+                heading(f"证据 {idx}: {title}", 4)
+                rows = [
+                    ["立场", _zh(evidence.stance, _STANCE_MAP)],
+                    ["来源", _safe(evidence.source)],
+                    ["来源类型", _zh(evidence.source_type, _SOURCE_TYPE_MAP)],
+                    ["权重", f"{float(evidence.source_weight):.2f}"],
+                    ["领域", _zh(evidence.domain, _DOMAIN_MAP)],
+                ]
+                alignment = evidence.alignment_confidence
+                if alignment is not None:
+                    rows.append(["对齐置信度", f"{float(alignment):.2f}"])
+                table(["属性", "值"], rows)
+
+                summary = evidence.summary
+                if summary and not is_summary:
+                    para(summary, label="摘要：")
+                rationale = evidence.alignment_rationale
+                if rationale:
+                    para(rationale, label="对齐理由：")
+                source_urls = evidence.source_urls
+                if source_urls:
+                    para("", label=f"来源链接（{len(source_urls)}条）")
+                    bullets(list(source_urls))
+                else:
+                    para(_safe(evidence.url), label="链接：")
+
+    if data.report:
+        report = data.report
+        heading("综合报告", 2)
+        domains_zh = (
+            "、".join(_zh(d, _DOMAIN_MAP) for d in report.evidence_domains)
+            if report.evidence_domains
+            else "-"
+        )
+        table(
+            ["项目", "值"],
+            [
+                [
+                    "风险评级",
+                    f"{_zh(report.risk_label, _RISK_LABEL_MAP)}（{_zh(report.risk_level, _RISK_LEVEL_MAP)}风险）",
+                ],
+                ["风险分数", str(report.risk_score)],
+                ["识别场景", _zh(report.detected_scenario, _SCENARIO_MAP)],
+                ["证据覆盖域", domains_zh],
+            ],
+        )
+        para(report.summary, label="摘要：")
+        if report.suspicious_points:
+            heading("可疑点", 3)
+            bullets(report.suspicious_points)
+        if report.claim_reports:
+            heading("主张级结论", 3)
+            for claim_report in report.claim_reports:
+                heading(claim_report.claim.claim_id, 4)
+                para(claim_report.claim.claim_text, label="主张：")
+                para(_zh_stance(claim_report.final_stance), label="最终立场：")
+                bullets(claim_report.notes)
+
+    if data.simulation:
+        simulation = data.simulation
+        heading("舆情预演", 2)
+
+        heading("情绪分布", 3)
+        table(
+            ["情绪", "占比"],
+            [
+                [_zh(key, _EMOTION_MAP), _percent(value)]
+                for key, value in simulation.emotion_distribution.items()
+            ],
+        )
+
+        heading("立场分布", 3)
+        table(
+            ["立场", "占比"],
+            [
+                [_zh_stance(key), _percent(value)]
+                for key, value in simulation.stance_distribution.items()
+            ],
+        )
+
+        if simulation.narratives:
+            heading("叙事分支", 3)
+            for idx, narrative in enumerate(simulation.narratives, start=1):
+                heading(f"{idx}. {narrative.title}", 4)
+                para(_percent(narrative.probability), label="概率：")
+                para(_zh_stance(narrative.stance), label="立场：")
+                para(
+                    ", ".join(narrative.trigger_keywords)
+                    if narrative.trigger_keywords
+                    else "-",
+                    label="触发词：",
+                )
+                para(narrative.sample_message, label="代表言论：")
+
+        if simulation.timeline:
+            heading("时间线", 3)
+            table(
+                ["小时", "事件", "预估触达"],
+                [
+                    [str(item.hour), item.event, item.expected_reach]
+                    for item in simulation.timeline
+                ],
+            )
+
+        if simulation.flashpoints:
+            heading("引爆点", 3)
+            bullets(simulation.flashpoints)
+
+        heading("应对建议", 3)
+        if simulation.suggestion.summary:
+            para(simulation.suggestion.summary)
+        if simulation.suggestion.actions:
+            table(
+                ["优先级", "类别", "行动", "时间", "责任方"],
+                [
+                    [
+                        _zh(action.priority, _PRIORITY_MAP),
+                        _zh(action.category, _CATEGORY_MAP),
+                        action.action,
+                        _safe(action.timeline),
+                        _safe(action.responsible),
+                    ]
+                    for action in simulation.suggestion.actions
+                ],
+            )
+
+    if data.content:
+        content = data.content
+        heading("应对内容", 2)
+        primary = _collect_primary_clarification(content)
+        if primary is not None:
+            heading("澄清稿（主稿）", 3)
+            para(_clarification_field(primary, "short"), label="短版：")
+            para(_clarification_field(primary, "medium"), label="中版：")
+            para(_clarification_field(primary, "long"), label="长版：")
+        if content.faq:
+            heading("FAQ", 3)
+            for item in content.faq:
+                para(item.question, label="Q: ")
+                para(item.answer, label="A: ")
+        if content.platform_scripts:
+            heading("多平台话术", 3)
+            for script in content.platform_scripts:
+                platform = (
+                    script.platform.value
+                    if hasattr(script.platform, "value")
+                    else str(script.platform)
+                )
+                heading(platform, 4)
+                para(script.content)
+
+    para("本报告由 TruthCast 智能研判台自动生成，仅供辅助决策参考。")
+
+    buffer = BytesIO()
+    SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin,
+        title="TruthCast 智能研判报告",
+    ).build(story)
     return buffer.getvalue()
 
 
@@ -633,13 +956,11 @@ def generate_word_bytes(data: ExportDataRequest) -> bytes:
 
     if data.claims:
         doc.add_heading("主张抽取", level=2)
-        table = doc.add_table(rows=1, cols=2)
-        table.rows[0].cells[0].text = "ID"
-        table.rows[0].cells[1].text = "主张内容"
-        for claim in data.claims:
-            row = table.add_row().cells
-            row[0].text = claim.claim_id
-            row[1].text = claim.claim_text
+        _add_word_table(
+            doc,
+            ["ID", "主张内容"],
+            [[claim.claim_id, claim.claim_text] for claim in data.claims],
+        )
 
     grouped_evidence = _group_evidence(data)
     if grouped_evidence:
@@ -650,48 +971,38 @@ def generate_word_bytes(data: ExportDataRequest) -> bytes:
                 doc.add_paragraph("暂无对齐证据")
                 continue
             for idx, evidence in enumerate(evidences, start=1):
-                is_summary = getattr(evidence, "source_type", "") == "web_summary"
-                title = (
-                    _safe(getattr(evidence, "summary", None))
-                    if is_summary
-                    else _safe(getattr(evidence, "title", None))
-                )
+                is_summary = evidence.source_type == "web_summary"
+                title = _safe(evidence.summary if is_summary else evidence.title)
                 doc.add_heading(f"证据 {idx}: {title}", level=4)
                 detail = doc.add_table(rows=6, cols=2)
                 detail.rows[0].cells[0].text = "立场"
-                detail.rows[0].cells[1].text = _zh(
-                    getattr(evidence, "stance", None), _STANCE_MAP
-                )
+                detail.rows[0].cells[1].text = _zh(evidence.stance, _STANCE_MAP)
                 detail.rows[1].cells[0].text = "来源"
-                detail.rows[1].cells[1].text = _safe(getattr(evidence, "source", None))
+                detail.rows[1].cells[1].text = _safe(evidence.source)
                 detail.rows[2].cells[0].text = "来源类型"
                 detail.rows[2].cells[1].text = _zh(
-                    getattr(evidence, "source_type", None), _SOURCE_TYPE_MAP
+                    evidence.source_type, _SOURCE_TYPE_MAP
                 )
                 detail.rows[3].cells[0].text = "权重"
-                detail.rows[3].cells[
-                    1
-                ].text = f"{float(getattr(evidence, 'source_weight', 0.0)):.2f}"
+                detail.rows[3].cells[1].text = f"{float(evidence.source_weight):.2f}"
                 detail.rows[4].cells[0].text = "领域"
-                detail.rows[4].cells[1].text = _zh(
-                    getattr(evidence, "domain", None), _DOMAIN_MAP
-                )
+                detail.rows[4].cells[1].text = _zh(evidence.domain, _DOMAIN_MAP)
                 detail.rows[5].cells[0].text = "对齐置信度"
-                align_conf = getattr(evidence, "alignment_confidence", None)
+                align_conf = evidence.alignment_confidence
                 detail.rows[5].cells[1].text = (
                     f"{float(align_conf):.2f}" if align_conf is not None else "-"
                 )
 
-                rationale = getattr(evidence, "alignment_rationale", None)
+                rationale = evidence.alignment_rationale
                 if rationale:
                     doc.add_paragraph(f"对齐理由：{rationale}")
-                source_urls = getattr(evidence, "source_urls", None)
+                source_urls = evidence.source_urls
                 if source_urls:
                     doc.add_paragraph("来源链接：")
                     for url in source_urls:
                         doc.add_paragraph(url, style="List Bullet")
                 else:
-                    doc.add_paragraph(f"链接：{_safe(getattr(evidence, 'url', None))}")
+                    doc.add_paragraph(f"链接：{_safe(evidence.url)}")
 
     if data.report:
         report = data.report
@@ -727,25 +1038,24 @@ def generate_word_bytes(data: ExportDataRequest) -> bytes:
         doc.add_heading("舆情预演", level=2)
 
         doc.add_heading("情绪分布", level=3)
-        emotion_table = doc.add_table(rows=1, cols=2)
-        emotion_table.rows[0].cells[0].text = "情绪"
-        emotion_table.rows[0].cells[1].text = "占比"
-        for key, value in simulation.emotion_distribution.items():
-            row = emotion_table.add_row().cells
-            row[0].text = _zh(key, _EMOTION_MAP)
-            row[1].text = _percent(value)
+        _add_word_table(
+            doc,
+            ["情绪", "占比"],
+            [
+                [_zh(key, _EMOTION_MAP), _percent(value)]
+                for key, value in simulation.emotion_distribution.items()
+            ],
+        )
 
         doc.add_heading("立场分布", level=3)
-        stance_table = doc.add_table(rows=1, cols=2)
-        stance_table.rows[0].cells[0].text = "立场"
-        stance_table.rows[0].cells[1].text = "占比"
-        for key, value in simulation.stance_distribution.items():
-            row = stance_table.add_row().cells
-            mapped = _zh(key, _SIM_STANCE_MAP)
-            if mapped == key:
-                mapped = _zh(key, _STANCE_MAP)
-            row[0].text = mapped
-            row[1].text = _percent(value)
+        _add_word_table(
+            doc,
+            ["立场", "占比"],
+            [
+                [_zh_stance(key), _percent(value)]
+                for key, value in simulation.stance_distribution.items()
+            ],
+        )
 
         if simulation.narratives:
             doc.add_heading("叙事分支", level=3)
@@ -760,15 +1070,14 @@ def generate_word_bytes(data: ExportDataRequest) -> bytes:
 
         if simulation.timeline:
             doc.add_heading("时间线", level=3)
-            timeline_table = doc.add_table(rows=1, cols=3)
-            timeline_table.rows[0].cells[0].text = "小时"
-            timeline_table.rows[0].cells[1].text = "事件"
-            timeline_table.rows[0].cells[2].text = "预估触达"
-            for item in simulation.timeline:
-                row = timeline_table.add_row().cells
-                row[0].text = str(item.hour)
-                row[1].text = item.event
-                row[2].text = item.expected_reach
+            _add_word_table(
+                doc,
+                ["小时", "事件", "预估触达"],
+                [
+                    [str(item.hour), item.event, item.expected_reach]
+                    for item in simulation.timeline
+                ],
+            )
 
         if simulation.flashpoints:
             doc.add_heading("引爆点", level=3)
@@ -779,19 +1088,20 @@ def generate_word_bytes(data: ExportDataRequest) -> bytes:
         if simulation.suggestion.summary:
             doc.add_paragraph(simulation.suggestion.summary)
         if simulation.suggestion.actions:
-            action_table = doc.add_table(rows=1, cols=5)
-            action_table.rows[0].cells[0].text = "优先级"
-            action_table.rows[0].cells[1].text = "类别"
-            action_table.rows[0].cells[2].text = "行动"
-            action_table.rows[0].cells[3].text = "时间"
-            action_table.rows[0].cells[4].text = "责任方"
-            for action in simulation.suggestion.actions:
-                row = action_table.add_row().cells
-                row[0].text = _zh(action.priority, _PRIORITY_MAP)
-                row[1].text = _zh(action.category, _CATEGORY_MAP)
-                row[2].text = action.action
-                row[3].text = _safe(action.timeline)
-                row[4].text = _safe(action.responsible)
+            _add_word_table(
+                doc,
+                ["优先级", "类别", "行动", "时间", "责任方"],
+                [
+                    [
+                        _zh(action.priority, _PRIORITY_MAP),
+                        _zh(action.category, _CATEGORY_MAP),
+                        action.action,
+                        _safe(action.timeline),
+                        _safe(action.responsible),
+                    ]
+                    for action in simulation.suggestion.actions
+                ],
+            )
 
     if data.content:
         content = data.content
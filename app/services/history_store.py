@@ -10,11 +10,31 @@ from typing import Any
 
 from fastapi.encoders import jsonable_encoder
 
+from app.core.cache import TTLCache
+from app.core.env_loader import int_env
+
 
 DB_PATH = Path("data/history/history.db")
 logger = logging.getLogger("truthcast.history_store")
 _active_db_path: Path | None = None
 
+# 记录行短期缓存：同一记录常被多个工具连续读取（如 /load_history 后紧接 /why），
+# 命中时省去建表检查与一次数据库往返。缓存的是原始列值，每次仍重新解析 JSON，
+# 调用方拿到的始终是独立对象；本进程写入该记录时主动失效。
+# 键包含当前数据库路径，回退到临时库后不会读到原库的缓存行。
+# 缓存是进程内的：多 worker 部署（uvicorn --workers N）时，其他 worker 写入的
+# 反馈/内容/预演结果最多延迟一个 TTL 可见；TRUTHCAST_HISTORY_CACHE_TTL=0 关闭缓存。
+_RECORD_CACHE_TTL = int_env("TRUTHCAST_HISTORY_CACHE_TTL", 30)
+_record_cache = TTLCache(maxsize=256, ttl=max(_RECORD_CACHE_TTL, 0))
+
+
+def _record_cache_key(record_id: str, db_path: Path) -> str:
+    return f"{db_path}\0{record_id}"
+
+
+def invalidate_history(record_id: str, db_path: Path | None = None) -> None:
+    _record_cache.delete(_record_cache_key(record_id, db_path or _get_active_db_path()))
+
 
 def _default_db_path() -> Path:
     custom_path = os.getenv("TRUTHCAST_HISTORY_DB_PATH", "").strip()
@@ -152,8 +172,9 @@ def save_report(
 def list_history(limit: int = 20) -> list[dict[str, Any]]:
     init_db()
     db_path = _get_active_db_path()
+    # 列表只展示前 120 字摘要：在 SQL 侧截取（substr 按字符计数），不把整段原文读出再切片
     select_sql = """
-        SELECT id, created_at, input_text, risk_label, risk_score,
+        SELECT id, created_at, substr(input_text, 1, 120) AS input_preview, risk_label, risk_score,
                detected_scenario, evidence_domains, feedback_status
         FROM analysis_history
         ORDER BY created_at DESC
@@ -180,7 +201,7 @@ def list_history(limit: int = 20) -> list[dict[str, Any]]:
             {
                 "id": row["id"],
                 "created_at": row["created_at"],
-                "input_preview": row["input_text"][:120],
+                "input_preview": row["input_preview"],
                 "risk_label": row["risk_label"],
                 "risk_score": row["risk_score"],
                 "detected_scenario": row["detected_scenario"],
@@ -191,7 +212,7 @@ def list_history(limit: int = 20) -> list[dict[str, Any]]:
     return results
 
 
-def get_history(record_id: str) -> dict[str, Any] | None:
+def _fetch_history_row(record_id: str) -> dict[str, Any] | None:
     init_db()
     db_path = _get_active_db_path()
     select_sql = """
@@ -217,6 +238,21 @@ def get_history(record_id: str) -> dict[str, Any] | None:
             conn.row_factory = sqlite3.Row
             row = conn.execute(select_sql, (record_id,)).fetchone()
 
+    return dict(row) if row is not None else None
+
+
+def get_history(record_id: str) -> dict[str, Any] | None:
+    if _RECORD_CACHE_TTL <= 0:
+        row = _fetch_history_row(record_id)
+    else:
+        key = _record_cache_key(record_id, _get_active_db_path())
+        row = _record_cache.get(key)
+        if row is None:
+            row = _fetch_history_row(record_id)
+            if row is not None:
+                # 读取途中可能回退到临时库，按实际读取的库路径写入
+                _record_cache.set(_record_cache_key(record_id, _get_active_db_path()), row)
+
     if row is None:
         return None
     
@@ -258,6 +294,32 @@ def get_history(record_id: str) -> dict[str, Any] | None:
     }
 
 
+def _update_record(record_id: str, db_path: Path, update_sql: str, params: tuple) -> bool:
+    # 缓存在写入提交之后再失效（含失败路径）：若先失效，并发的 get_history
+    # 可能在提交前读到旧行并重新缓存，旧数据会保留整个 TTL
+    try:
+        try:
+            with sqlite3.connect(db_path) as conn:
+                cur = conn.execute(update_sql, params)
+                conn.commit()
+                return cur.rowcount > 0
+        except sqlite3.OperationalError as exc:
+            if not _is_disk_io_error(exc):
+                raise
+            fallback = _set_fallback_db_path()
+            logger.warning("历史库写入失败，已回退到临时目录: %s", fallback)
+            _create_tables(fallback)
+            with sqlite3.connect(fallback) as conn:
+                cur = conn.execute(update_sql, params)
+                conn.commit()
+                return cur.rowcount > 0
+    finally:
+        invalidate_history(record_id, db_path)
+        if _active_db_path != db_path:
+            # 写入途中回退到了临时库
+            invalidate_history(record_id)
+
+
 def update_content(record_id: str, content: dict[str, Any]) -> bool:
     """更新历史记录的 content 数据（应对内容生成结果，可为部分字段）"""
     init_db()
@@ -270,21 +332,7 @@ def update_content(record_id: str, content: dict[str, Any]) -> bool:
         """
     params = (content_json, record_id)
 
-    try:
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
-    except sqlite3.OperationalError as exc:
-        if not _is_disk_io_error(exc):
-            raise
-        fallback = _set_fallback_db_path()
-        logger.warning("历史库写入失败，已回退到临时目录: %s", fallback)
-        _create_tables(fallback)
-        with sqlite3.connect(fallback) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
+    return _update_record(record_id, db_path, update_sql, params)
 
 
 def save_feedback(record_id: str, status: str, note: str | None) -> bool:
@@ -297,21 +345,7 @@ def save_feedback(record_id: str, status: str, note: str | None) -> bool:
         """
     params = (status, note or "", record_id)
 
-    try:
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
-    except sqlite3.OperationalError as exc:
-        if not _is_disk_io_error(exc):
-            raise
-        fallback = _set_fallback_db_path()
-        logger.warning("历史库写入失败，已回退到临时目录: %s", fallback)
-        _create_tables(fallback)
-        with sqlite3.connect(fallback) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
+    return _update_record(record_id, db_path, update_sql, params)
 
 
 def update_simulation(record_id: str, simulation: dict[str, Any]) -> bool:
@@ -326,18 +360,4 @@ def update_simulation(record_id: str, simulation: dict[str, Any]) -> bool:
         """
     params = (simulation_json, record_id)
 
-    try:
-        with sqlite3.connect(db_path) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
-    except sqlite3.OperationalError as exc:
-        if not _is_disk_io_error(exc):
-            raise
-        fallback = _set_fallback_db_path()
-        logger.warning("历史库写入失败，已回退到临时目录: %s", fallback)
-        _create_tables(fallback)
-        with sqlite3.connect(fallback) as conn:
-            cur = conn.execute(update_sql, params)
-            conn.commit()
-            return cur.rowcount > 0
+    return _update_record(record_id, db_path, update_sql, params)
@@ -4,6 +4,13 @@ from typing import Any
 
 logger = logging.getLogger("truthcast.json_utils")
 
+try:
+    # Optional speedup (pip install truthcast[speedups]); orjson.JSONDecodeError
+    # subclasses json.JSONDecodeError, so the fallback chain below is unchanged.
+    from orjson import loads as _fast_loads
+except ImportError:  # pragma: no cover - depends on optional dependency
+    _fast_loads = json.loads
+
 try:
     from json_repair import repair_json
     HAS_JSON_REPAIR = True
@@ -47,7 +54,7 @@ def safe_json_loads(content: str, context: str = "") -> dict[str, Any] | None:
     
     # First try: direct parse
     try:
-        return json.loads(content)
+        return _fast_loads(content)
     except json.JSONDecodeError as e:
         logger.debug("%s: Direct JSON parse failed: %s", context, e)
     
@@ -21,7 +21,11 @@ from app.services.report_generation import (
     generate_fallback_report,
     generate_report_with_llm,
 )
-from app.services.web_retrieval import infer_web_stance, search_web_evidence
+from app.services.web_retrieval import (
+    WebEvidenceCandidate,
+    infer_web_stance,
+    search_web_evidence,
+)
 
 logger = get_logger("truthcast.pipeline")
 
@@ -45,8 +49,10 @@ def retrieve_evidence(
     )
     retrieved_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    for claim in claims:
-        web_ranked = search_web_evidence(claim.claim_text, top_k=web_top_k)
+    # 各主张的联网检索互不依赖，先并发取回，再按主张顺序编号组装
+    ranked_per_claim = _search_claims_parallel(claims, web_top_k)
+
+    for claim, web_ranked in zip(claims, ranked_per_claim):
         if not web_ranked:
             evidences.append(
                 EvidenceItem(
@@ -319,6 +325,22 @@ def build_report(
     }
 
 
+def _search_claims_parallel(
+    claims: list[ClaimItem], top_k: int
+) -> list[list[WebEvidenceCandidate]]:
+    workers = _int_env("TRUTHCAST_EVIDENCE_PARALLEL_WORKERS", 4)
+    if workers <= 1 or len(claims) <= 1:
+        return [search_web_evidence(claim.claim_text, top_k=top_k) for claim in claims]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(claims))) as executor:
+        return list(
+            executor.map(
+                lambda claim: search_web_evidence(claim.claim_text, top_k=top_k),
+                claims,
+            )
+        )
+
+
 def _process_claims_parallel(
     claim_inputs: list[tuple[ClaimItem, list[EvidenceItem]]],
     strategy: StrategyConfig | None = None,
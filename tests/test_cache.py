@@ -0,0 +1,171 @@
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a 变为最近使用
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_overwrite_does_not_evict() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") == 2
+
+
+def test_ttl_cache_expired_entry_is_dropped(monkeypatch) -> None:
+    import app.core.cache as cache_module
+
+    now = [1_000_000_000_000]
+    monkeypatch.setattr(cache_module.time, "monotonic_ns", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+
+    now[0] += 6_000_000_000
+    assert cache.get("a") is None
+
+    # 过期条目在下一次写入时回收
+    cache.set("b", 2)
+    assert len(cache) == 1
+
+
+def test_ttl_cache_get_or_set_calls_producer_once() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    calls = []
+
+    def _produce() -> str:
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_set(" text ", _produce) == ("value", False)
+    assert cache.get_or_set("text", _produce) == ("value", True)
+    assert len(calls) == 1
+
+
+def test_ttl_cache_views_share_store_with_separate_namespaces() -> None:
+    from app.core.cache import TTLCacheView
+
+    store = TTLCache(maxsize=2, ttl=60)
+    detect = TTLCacheView(store, "d", ttl=60)
+    claims = TTLCacheView(store, "c", ttl=60)
+
+    detect.set("text", "risk")
+    claims.set("text", "claims")
+    assert detect.get("text") == "risk"
+    assert claims.get("text") == "claims"
+
+    # 容量共享：写入第三个条目淘汰最久未使用的 detect 条目
+    claims.set("other", "claims-2")
+    assert detect.get("text") is None
+    assert len(claims) == 2
+
+    claims.clear()
+    assert len(store) == 0
+
+
+def test_async_single_flight_runs_producer_once_per_key() -> None:
+    import asyncio
+
+    from app.core.cache import AsyncSingleFlight
+
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def _produce() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def _run() -> list:
+        results = await asyncio.gather(*(flight.run("k", _produce) for _ in range(5)))
+        assert len(flight) == 0
+        # 任务结束后不再合并：再次调用重新执行
+        results.append(await flight.run("k", _produce))
+        return results
+
+    assert asyncio.run(_run()) == ["value"] * 6
+    assert len(calls) == 2
+
+
+def test_async_single_flight_survives_waiter_cancel_and_propagates_errors() -> None:
+    import asyncio
+
+    import pytest
+
+    from app.core.cache import AsyncSingleFlight
+
+    flight = AsyncSingleFlight()
+
+    async def _slow() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def _fail() -> str:
+        raise ValueError("boom")
+
+    async def _run() -> str:
+        first = asyncio.ensure_future(flight.run("k", _slow))
+        second = asyncio.ensure_future(flight.run("k", _slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(ValueError):
+            await flight.run("e", _fail)
+        assert len(flight) == 1
+        return await second
+
+    assert asyncio.run(_run()) == "done"
+
+
+def test_ttl_cache_view_clear_safe_with_concurrent_reads() -> None:
+    import sys
+    import threading
+
+    from app.core.cache import TTLCacheView
+
+    store = TTLCache(maxsize=1024, ttl=60)
+    hot = TTLCacheView(store, "h", ttl=60)
+    cold = TTLCacheView(store, "c", ttl=60)
+    for i in range(256):
+        hot.set(str(i), i)
+    errors = []
+    done = threading.Event()
+
+    def _read() -> None:
+        try:
+            while not done.is_set():
+                for i in range(256):
+                    hot.get(str(i))
+        except Exception as exc:  # pragma: no cover - 仅在回归时触发
+            errors.append(exc)
+
+    # 缩短线程切换间隔，让读线程的 LRU 调整落入 clear 的遍历过程中
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    readers = [threading.Thread(target=_read) for _ in range(2)]
+    for t in readers:
+        t.start()
+    try:
+        for _ in range(50):
+            for i in range(256):
+                cold.set(str(i), i)
+            cold.clear()
+    finally:
+        done.set()
+        for t in readers:
+            t.join()
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(hot) == 256
@@ -1,21 +1,27 @@
+import atexit
+import json
 import os
+import re
+import shutil
 import tempfile
 import time
 from pathlib import Path
-
-# 确保 chat DB 不污染仓库目录（必须在导入 app 之前设置）
-tmp_dir = Path(tempfile.gettempdir()) / "truthcast_test"
-tmp_dir.mkdir(parents=True, exist_ok=True)
+from typing import Iterable
+
+# 确保 chat DB 不污染仓库目录（必须在导入 app 之前设置）。
+# 每次运行使用全新的临时目录，优先放在内存文件系统 /dev/shm 上：库文件不落盘，
+# 也无需在启动时删除上次遗留的库；进程退出时整体清理。
+# 目录按进程唯一，pytest -n auto 下各 worker 天然互不冲突；前缀带上 worker 名便于排查。
+_shm = Path("/dev/shm")
+_worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+tmp_dir = Path(
+    tempfile.mkdtemp(prefix=f"truthcast_test_{_worker}_", dir=_shm if _shm.is_dir() else None)
+)
+atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
 os.environ["TRUTHCAST_CHAT_DB_PATH"] = str(tmp_dir / "chat_test.db")
 os.environ["TRUTHCAST_HISTORY_DB_PATH"] = str(tmp_dir / "history_test.db")
 
-try:
-    (tmp_dir / "history_test.db").unlink(missing_ok=True)  # type: ignore[arg-type]
-except TypeError:
-    # Python < 3.8 fallback (not expected here)
-    if (tmp_dir / "history_test.db").exists():
-        (tmp_dir / "history_test.db").unlink()
-
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -26,20 +32,54 @@ from app.schemas.detect import ClarificationContent, ContentGenerateResponse, FA
 client = TestClient(app)
 
 
-def _extract_first_message_content_from_sse(raw: str) -> str:
-    """从 SSE 文本中提取第一条 message 事件的 content。"""
-
-    for line in raw.splitlines():
-        if not line.startswith("data: "):
-            continue
-        try:
-            evt = __import__("json").loads(line[len("data: ") :])
-        except Exception:
-            continue
-        if evt.get("type") == "message":
-            msg = (evt.get("data") or {}).get("message") or {}
-            return str(msg.get("content") or "")
-    return ""
+_SSE_DATA_PREFIX = "data: "
+_SSE_DATA_PREFIX_LEN = len(_SSE_DATA_PREFIX)
+_json_loads = json.loads
+# done 事件所在的 SSE data 行；服务端每个事件整块写出，逐块匹配即可
+_DONE_RE = re.compile(r'^data: .*"type"\s*:\s*"done"', re.M)
+
+
+def _message_content(line: str) -> str | None:
+    if not line.startswith(_SSE_DATA_PREFIX):
+        return None
+    try:
+        evt = _json_loads(line[_SSE_DATA_PREFIX_LEN:])
+    except Exception:
+        return None
+    if evt.get("type") != "message":
+        return None
+    msg = (evt.get("data") or {}).get("message") or {}
+    return str(msg.get("content") or "")
+
+
+def _extract_first_message_content_from_sse(stream: str | Iterable[str]) -> str:
+    """从 SSE 文本或 resp.iter_text() 中提取第一条 message 事件的 content。
+
+    按块增量切行，只保留未完结的末行；读到第一条 message 即返回，不再拼接整个响应体。
+    """
+
+    buf = ""
+    for chunk in [stream] if isinstance(stream, str) else stream:
+        *lines, buf = (buf + chunk).split("\n")
+        for line in lines:
+            content = _message_content(line.rstrip("\r"))
+            if content is not None:
+                return content
+    return _message_content(buf.rstrip("\r")) or ""
+
+
+def _find_command(actions: list[dict], prefix: str) -> str | None:
+    """返回第一条以 prefix 开头的 command 动作的命令文本。"""
+    return next(
+        (
+            command
+            for a in actions
+            if a.get("type") == "command"
+            and isinstance(command := a.get("command"), str)
+            and command.startswith(prefix)
+        ),
+        None,
+    )
 
 
 def test_chat_smoke_returns_actions() -> None:
@@ -59,31 +99,68 @@ def test_chat_list_empty_shows_hint() -> None:
     # 确保在任何 /analyze 之前调用：历史库应为空
     with client.stream("POST", "/chat/stream", json={"text": "/list"}) as resp:
         assert resp.status_code == 200
-        raw = "".join(list(resp.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp.iter_text())
         assert "暂无可用的历史记录" in content
 
 
 def test_chat_why_without_record_id_shows_usage_not_error() -> None:
     with client.stream("POST", "/chat/stream", json={"text": "/why"}) as resp:
         assert resp.status_code == 200
-        raw = "".join(list(resp.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp.iter_text())
         assert "用法：/why" in content
 
 
-def test_chat_why_can_fallback_to_context_record_id() -> None:
-    # 1) 先生成一条 history record
+def test_why_evidence_links_only_accept_http_schemes(monkeypatch) -> None:
+    from app.services import chat_orchestrator as co
+
+    record = {
+        "id": "r1",
+        "risk_label": "suspicious",
+        "risk_score": 60,
+        "detect_data": {},
+        "report": {
+            "claim_reports": [
+                {
+                    "claim": {"claim_text": "主张"},
+                    "evidences": [
+                        {"url": " https://a.example/1 ", "title": "A"},
+                        {"url": "httpfoo://b.example", "title": "B"},
+                        {"url": "http://c.example/2", "title": "  "},
+                    ],
+                }
+            ]
+        },
+    }
+    monkeypatch.setattr(co, "get_history", lambda _rid: record)
+
+    msg = co.run_why(co.ToolWhyArgs(record_id="r1"))
+
+    hrefs = [r.href for r in msg.references[1:]]
+    assert hrefs == ["https://a.example/1", "http://c.example/2"]
+    # 空白标题回退为 URL
+    assert msg.references[2].title == "http://c.example/2"
+
+
+@pytest.fixture(scope="module")
+def analyzed_record() -> dict:
+    """模块内只跑一次 /analyze 全链路，供只需要一条已有历史记录的测试复用。"""
     resp = client.post("/chat", json={"text": "/analyze 网传某事件100%真实，内部人士称必须立刻转发。"})
     assert resp.status_code == 200
-    actions = (resp.json().get("assistant_message") or {}).get("actions") or []
-    load_cmd = None
-    for a in actions:
-        if a.get("type") == "command" and str(a.get("command", "")).startswith("/load_history "):
-            load_cmd = a.get("command")
-            break
+    msg = resp.json()["assistant_message"]
+    actions = msg.get("actions") or []
+    load_cmd = _find_command(actions, "/load_history ")
     assert load_cmd
-    record_id = str(load_cmd).split()[-1]
+    return {
+        "message": msg,
+        "load_cmd": load_cmd,
+        "why_cmd": _find_command(actions, "/why "),
+        "record_id": load_cmd.rsplit(maxsplit=1)[-1],
+    }
+
+
+def test_chat_why_can_fallback_to_context_record_id(analyzed_record: dict) -> None:
+    # 1) 复用已生成的 history record
+    record_id = analyzed_record["record_id"]
 
     # 2) /chat/stream：只输入 /why，但在 context 带 record_id，应返回解释而不是用法提示
     with client.stream(
@@ -92,34 +169,17 @@ def test_chat_why_can_fallback_to_context_record_id() -> None:
         json={"text": "/why", "context": {"record_id": record_id}},
     ) as resp2:
         assert resp2.status_code == 200
-        raw2 = "".join(list(resp2.iter_text()))
-        content2 = _extract_first_message_content_from_sse(raw2)
+        content2 = _extract_first_message_content_from_sse(resp2.iter_text())
         assert "解释（最小可用）" in content2
 
 
-def test_chat_analyze_command_works() -> None:
-    resp = client.post("/chat", json={"text": "/analyze 网传某事件100%真实，内部人士称必须立刻转发。"})
-    assert resp.status_code == 200
-    body = resp.json()
-    msg = body["assistant_message"]
+def test_chat_analyze_command_works(analyzed_record: dict) -> None:
+    msg = analyzed_record["message"]
     assert "已完成一次全链路分析" in msg["content"]
     assert isinstance(msg.get("references"), list)
-    actions = msg.get("actions") or []
-    assert any((a.get("type") == "command" and str(a.get("command", "")).startswith("/load_history ")) for a in actions)
-
-    load_cmd = None
-    for a in actions:
-        if a.get("type") == "command" and str(a.get("command", "")).startswith("/load_history "):
-            load_cmd = a.get("command")
-            break
-    assert load_cmd
 
     # /why <record_id> 应可解释原因（追问闭环最小可用）
-    why_cmd = None
-    for a in actions:
-        if a.get("type") == "command" and str(a.get("command", "")).startswith("/why "):
-            why_cmd = a.get("command")
-            break
+    why_cmd = analyzed_record["why_cmd"]
     assert why_cmd
 
     resp2 = client.post("/chat", json={"text": why_cmd})
@@ -132,15 +192,14 @@ def test_chat_analyze_command_works() -> None:
     assert any((b or {}).get("kind") == "section" for b in blocks)
 
     # /rewrite 与 /more_evidence（通过 context 兜底 record_id）
-    record_id = str(load_cmd).split()[-1]
+    record_id = analyzed_record["record_id"]
     with client.stream(
         "POST",
         "/chat/stream",
         json={"text": "/rewrite short", "context": {"record_id": record_id}},
     ) as resp3:
         assert resp3.status_code == 200
-        raw3 = "".join(list(resp3.iter_text()))
-        content3 = _extract_first_message_content_from_sse(raw3)
+        content3 = _extract_first_message_content_from_sse(resp3.iter_text())
         assert "改写" in content3
 
     with client.stream(
@@ -149,8 +208,7 @@ def test_chat_analyze_command_works() -> None:
         json={"text": "/more_evidence", "context": {"record_id": record_id}},
     ) as resp4:
         assert resp4.status_code == 200
-        raw4 = "".join(list(resp4.iter_text()))
-        content4 = _extract_first_message_content_from_sse(raw4)
+        content4 = _extract_first_message_content_from_sse(resp4.iter_text())
         assert "补充证据建议" in content4
 
 
@@ -158,10 +216,30 @@ def test_chat_stream_smoke_for_non_analyze_intent() -> None:
     # 避免触发真实全链路分析：短输入应直接返回 message + done
     with client.stream("POST", "/chat/stream", json={"text": "你好"}) as resp:
         assert resp.status_code == 200
-        raw = "".join(list(resp.iter_text()))
-        assert "data: " in raw
-        # 至少应包含 done 事件
-        assert '"type":"done"' in raw or '"type": "done"' in raw
+        # 至少应包含 done 事件；命中即停止读取
+        assert any(_DONE_RE.search(chunk) for chunk in resp.iter_text())
+
+
+def test_analyze_stream_coalesces_progress_with_final_message(monkeypatch) -> None:
+    from types import SimpleNamespace
+
+    from app.services import chat_orchestrator as co
+
+    risk = SimpleNamespace(
+        label="low",
+        score=10,
+        strategy=SimpleNamespace(is_news=False, news_reason="闲聊", detected_text_type="chat"),
+    )
+    monkeypatch.setattr(co, "detect_risk_snapshot", lambda *a, **k: risk)
+
+    chunks = list(co.run_analyze_stream("s1", co.ToolAnalyzeArgs(text="你好呀")))
+
+    # 开始提示在风险快照前单独冲刷；快照结果与最终消息合并为一次写出
+    assert len(chunks) == 2
+    assert chunks[0].count("data: ") == 1 and "已收到文本" in chunks[0]
+    assert chunks[1].count("data: ") == 2
+    assert '"type":"token"' in chunks[1] and "风险快照：完成" in chunks[1]
+    assert '"type":"message"' in chunks[1]
 
 
 def test_chat_session_stream_ambiguous_text_returns_clarify_message() -> None:
@@ -175,8 +253,7 @@ def test_chat_session_stream_ambiguous_text_returns_clarify_message() -> None:
         json={"text": "这是一段普通文本，没有明确操作指令", "context": None},
     ) as resp2:
         assert resp2.status_code == 200
-        raw = "".join(list(resp2.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp2.iter_text())
         assert "当前意图还不够明确" in content
         assert "完整分析" in content
         assert "单技能" in content
@@ -213,9 +290,7 @@ def test_chat_session_stream_smoke() -> None:
         json={"text": "你好", "context": None},
     ) as resp2:
         assert resp2.status_code == 200
-        raw = "".join(list(resp2.iter_text()))
-        assert "data: " in raw
-        assert '"type":"done"' in raw or '"type": "done"' in raw
+        assert any(_DONE_RE.search(chunk) for chunk in resp2.iter_text())
 
 
 def test_chat_list_then_analyze_then_load_history() -> None:
@@ -223,13 +298,9 @@ def test_chat_list_then_analyze_then_load_history() -> None:
     resp2 = client.post("/chat", json={"text": "/analyze 网传某事件100%真实，内部人士称必须立刻转发。"})
     assert resp2.status_code == 200
     actions = (resp2.json().get("assistant_message") or {}).get("actions") or []
-    load_cmd = None
-    for a in actions:
-        if a.get("type") == "command" and str(a.get("command", "")).startswith("/load_history "):
-            load_cmd = a.get("command")
-            break
+    load_cmd = _find_command(actions, "/load_history ")
     assert load_cmd
-    record_id = str(load_cmd).split()[-1]
+    record_id = load_cmd.rsplit(maxsplit=1)[-1]
 
     # 2) /sessions/{id}/messages/stream：/list 1 能列出 record_id
     resp3 = client.post("/chat/sessions", json={})
@@ -254,8 +325,7 @@ def test_chat_list_then_analyze_then_load_history() -> None:
         json={"text": f"/load_history {record_id}", "context": None},
     ) as resp5:
         assert resp5.status_code == 200
-        raw = "".join(list(resp5.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp5.iter_text())
         assert "已定位到历史记录" in content
 
 
@@ -271,8 +341,7 @@ def test_claims_only_then_evidence_only_reuses_claims_without_recompute(monkeypa
         json={"text": f"/claims_only {text}", "context": None},
     ) as resp_claims:
         assert resp_claims.status_code == 200
-        raw_claims = "".join(list(resp_claims.iter_text()))
-        content_claims = _extract_first_message_content_from_sse(raw_claims)
+        content_claims = _extract_first_message_content_from_sse(resp_claims.iter_text())
         assert "主张抽取完成" in content_claims
 
     def _forbidden_run_claims(*args, **kwargs):
@@ -286,8 +355,7 @@ def test_claims_only_then_evidence_only_reuses_claims_without_recompute(monkeypa
         json={"text": f"/evidence_only {text}", "context": None},
     ) as resp_evidence:
         assert resp_evidence.status_code == 200
-        raw_evidence = "".join(list(resp_evidence.iter_text()))
-        content_evidence = _extract_first_message_content_from_sse(raw_evidence)
+        content_evidence = _extract_first_message_content_from_sse(resp_evidence.iter_text())
         assert "证据检索完成" in content_evidence
         assert "复用 session 的 claims" in content_evidence
 
@@ -409,8 +477,7 @@ def test_same_session_multi_text_hash_buckets_can_reuse_each_text(monkeypatch) -
         json={"text": f"/evidence_only {text_a}", "context": None},
     ) as r3:
         assert r3.status_code == 200
-        raw_a = "".join(list(r3.iter_text()))
-        content_a = _extract_first_message_content_from_sse(raw_a)
+        content_a = _extract_first_message_content_from_sse(r3.iter_text())
         assert "证据检索完成" in content_a
         assert "复用 session 的 claims" in content_a
 
@@ -420,8 +487,7 @@ def test_same_session_multi_text_hash_buckets_can_reuse_each_text(monkeypatch) -
         json={"text": f"/evidence_only {text_b}", "context": None},
     ) as r4:
         assert r4.status_code == 200
-        raw_b = "".join(list(r4.iter_text()))
-        content_b = _extract_first_message_content_from_sse(raw_b)
+        content_b = _extract_first_message_content_from_sse(r4.iter_text())
         assert "证据检索完成" in content_b
         assert "复用 session 的 claims" in content_b
 
@@ -539,8 +605,7 @@ def test_simulate_requires_report_or_record_id() -> None:
         json={"text": "/simulate", "context": None},
     ) as resp_simulate:
         assert resp_simulate.status_code == 200
-        raw = "".join(list(resp_simulate.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp_simulate.iter_text())
         assert "缺少 report 中间态" in content
         assert "/report_only" in content
 
@@ -660,8 +725,7 @@ def test_content_generate_requires_report_or_record_id() -> None:
         json={"text": "/content_generate", "context": None},
     ) as resp_content:
         assert resp_content.status_code == 200
-        raw = "".join(list(resp_content.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp_content.iter_text())
         assert "缺少 report 中间态" in content
         assert "/report_only" in content
         assert "record_id" in content
@@ -761,8 +825,7 @@ def test_single_skill_tool_budget_limit_blocks_calls(monkeypatch) -> None:
         json={"text": "/claims_only 测试文本", "context": None},
     ) as resp_claims:
         assert resp_claims.status_code == 200
-        raw = "".join(list(resp_claims.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp_claims.iter_text())
         assert "工具调用已达上限" in content
 
 
@@ -782,8 +845,7 @@ def test_single_skill_llm_budget_limit_blocks_llm_tools(monkeypatch) -> None:
         json={"text": "/claims_only 测试文本", "context": None},
     ) as resp_claims:
         assert resp_claims.status_code == 200
-        raw = "".join(list(resp_claims.iter_text()))
-        content = _extract_first_message_content_from_sse(raw)
+        content = _extract_first_message_content_from_sse(resp_claims.iter_text())
         assert "LLM 调用已达上限" in content
 
 
@@ -1307,3 +1369,12 @@ def test_natural_language_simulate_auto_runs_full_prerequisites_and_shows_output
         assert "自动补齐-报告结果" in raw
 
     assert called == {"claims": 1, "evidence": 1, "align": 1, "report": 1, "simulate": 1}
+
+
+def test_sse_event_matches_chat_stream_event_schema() -> None:
+    from app.api import routes_chat
+    from app.schemas.chat import ChatStreamEvent
+
+    data = {"content": "中文\n", "session_id": "chat_x"}
+    expected = ChatStreamEvent(type="token", data=data).model_dump_json()
+    assert routes_chat._sse_event("token", data) == f"data: {expected}\n\n"
@@ -1,6 +1,6 @@
 """Tests for unified chat CLI renderer."""
 
-from app.cli.lib.chat_renderer import ChatRenderer
+from app.cli.lib.chat_renderer import ChatRenderer, TokenBuffer
 
 
 def test_render_message_multiline_with_separators(capsys):
@@ -34,3 +34,16 @@ def test_render_error(capsys):
     renderer.render_error("测试错误")
     out = capsys.readouterr().out
     assert "测试错误" in out
+
+
+def test_token_buffer_batches_writes(capsys):
+    flushed: list[str] = []
+    buffer = TokenBuffer(ChatRenderer(), on_flush=flushed.append, max_tokens=3, max_delay_ns=10**12)
+
+    for token in ["你", "好", "，", "世", "界"]:
+        buffer.push(token)
+    assert flushed == ["你好，"]
+
+    buffer.flush(newline=True)
+    assert flushed == ["你好，", "世界"]
+    assert capsys.readouterr().out == "你好，世界\n"
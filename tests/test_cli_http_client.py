@@ -5,14 +5,16 @@ Tests the APIClient class in app/cli/client.py for network errors, timeouts,
 HTTP status codes, and retry mechanisms.
 """
 
-import json
+import asyncio
 from unittest.mock import Mock, patch
 
 import pytest
 import httpx
 
+import app.cli.client as client_module
 from app.cli.client import (
     APIClient,
+    AsyncAPIClient,
     APIError,
     NetworkError,
     TimeoutError as ClientTimeoutError,
@@ -21,6 +23,12 @@ from app.cli.client import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _no_retry_backoff(monkeypatch):
+    """Keep retry tests fast: no sleeping between attempts."""
+    monkeypatch.setattr(client_module, "_RETRY_BACKOFF_INITIAL", 0.0)
+
+
 class TestHTTPClientInitialization:
     """Test APIClient initialization and configuration."""
     
@@ -102,7 +110,7 @@ class TestHTTPClientNetworkErrors:
         
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "ok"}
+        mock_response.content = b'{"status": "ok"}'
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.side_effect = [
@@ -119,6 +127,31 @@ class TestHTTPClientNetworkErrors:
         client.close()
 
 
+class TestHTTPClientRetryBackoff:
+    """Test backoff between retry attempts."""
+    
+    def test_backoff_delay_grows_and_is_capped(self, monkeypatch) -> None:
+        """Test jittered delay stays within an exponentially growing, capped bound."""
+        monkeypatch.setattr(client_module, "_RETRY_BACKOFF_INITIAL", 0.2)
+        monkeypatch.setattr(client_module.random, "uniform", lambda low, high: high)
+        
+        assert [client_module._backoff_delay(n) for n in (1, 2, 3, 5)] == [0.2, 0.4, 0.8, 2.0]
+    
+    def test_sleeps_between_attempts_only(self, monkeypatch) -> None:
+        """Test no sleep follows the final failed attempt."""
+        monkeypatch.setattr(client_module, "_RETRY_BACKOFF_INITIAL", 0.2)
+        sleeps = []
+        monkeypatch.setattr(client_module.time, "sleep", sleeps.append)
+        client = APIClient(retry_times=3)
+        
+        with patch.object(client._client, 'get', side_effect=httpx.ConnectError("refused")):
+            with pytest.raises(NetworkError):
+                client.get("/test")
+        
+        assert len(sleeps) == 2
+        client.close()
+
+
 class TestHTTPClientTimeoutErrors:
     """Test timeout error handling."""
     
@@ -172,6 +205,7 @@ class TestHTTPClientStatusErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 404
         mock_response.text = "Not found"
+        mock_response.content = b"Not found"
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -190,6 +224,7 @@ class TestHTTPClientStatusErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 500
         mock_response.text = "Internal server error"
+        mock_response.content = b"Internal server error"
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -208,6 +243,7 @@ class TestHTTPClientStatusErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 429
         mock_response.text = "Too many requests"
+        mock_response.content = b"Too many requests"
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -226,6 +262,7 @@ class TestHTTPClientStatusErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 400
         mock_response.text = "Bad request"
+        mock_response.content = b"Bad request"
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -248,7 +285,7 @@ class TestHTTPClientJSONErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 200
         mock_response.text = "not valid json {]"
-        mock_response.json.side_effect = json.JSONDecodeError("msg", "doc", 0)
+        mock_response.content = b"not valid json {]"
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -265,7 +302,7 @@ class TestHTTPClientJSONErrors:
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 200
         mock_response.text = ""
-        mock_response.json.side_effect = json.JSONDecodeError("msg", "doc", 0)
+        mock_response.content = b""
         
         with patch.object(client._client, 'get') as mock_get:
             mock_get.return_value = mock_response
@@ -285,7 +322,7 @@ class TestHTTPClientPostRequests:
         
         mock_response = Mock(spec=httpx.Response)
         mock_response.status_code = 201
-        mock_response.json.return_value = {"id": "123", "status": "created"}
+        mock_response.content = b'{"id": "123", "status": "created"}'
         
         with patch.object(client._client, 'post') as mock_post:
             mock_post.return_value = mock_response
@@ -355,3 +392,138 @@ class TestHTTPClientErrorMessages:
         msg = error.user_friendly_message()
         
         assert "json" in msg.lower()
+
+
+class TestHTTPClientRequestLogging:
+    """Test debug request logging."""
+    
+    def test_sensitive_headers_masked_in_debug_log(self, caplog) -> None:
+        """Test Authorization is masked while other headers are logged."""
+        client = APIClient(base_url="http://127.0.0.1:8000")
+        headers = {"Authorization": "Bearer secret", "X-Trace": "abc"}
+        
+        with caplog.at_level("DEBUG", logger="app.cli.client"):
+            client._log_request("GET", "/health", headers=headers)
+        
+        assert "secret" not in caplog.text
+        assert "'Authorization': '***'" in caplog.text
+        assert "'X-Trace': 'abc'" in caplog.text
+    
+    def test_no_debug_record_when_disabled(self, caplog) -> None:
+        """Test nothing is emitted when DEBUG is off."""
+        client = APIClient(base_url="http://127.0.0.1:8000")
+        
+        with caplog.at_level("INFO", logger="app.cli.client"):
+            client._log_request("GET", "/health", headers={"Authorization": "x"})
+        
+        assert caplog.records == []
+
+
+class TestHTTPClientConnectionPool:
+    """Test shared connection pool reuse."""
+    
+    def test_clients_share_default_pool(self) -> None:
+        """Test clients with the same base_url/timeout reuse one httpx.Client."""
+        first = APIClient(base_url="http://pool.test:8000", timeout=12.0)
+        second = APIClient(base_url="http://pool.test:8000", timeout=12.0)
+        
+        assert first._client is second._client
+        
+        first.close()
+        assert not second._client.is_closed
+    
+    def test_injected_client_is_used(self) -> None:
+        """Test an explicitly injected httpx.Client is used and closed."""
+        injected = httpx.Client(base_url="http://127.0.0.1:8000")
+        client = APIClient(client=injected)
+        
+        assert client._client is injected
+        
+        client.close()
+        assert injected.is_closed
+    
+    def test_get_client_shared_until_config_changes(self) -> None:
+        """Test commands share one APIClient per config."""
+        from app.cli import _globals
+        from app.cli.config import CLIConfig
+        
+        original = _globals.get_global_config()
+        try:
+            _globals.set_global_config(CLIConfig(api_base="http://shared.test:8000", retry_times=2))
+            first = _globals.get_client()
+            assert _globals.get_client() is first
+            assert first.base_url == "http://shared.test:8000"
+            assert first.retry_times == 2
+            
+            _globals.set_global_config(CLIConfig(api_base="http://other.test:8000"))
+            assert _globals.get_client() is not first
+        finally:
+            _globals.set_global_config(original)
+    
+    def test_stream_error_status_releases_connection(self) -> None:
+        """Test a 4xx/5xx stream closes its response when raising on enter."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(503, text="down"))
+        client = APIClient(client=httpx.Client(base_url="http://pool.test", transport=transport))
+        wrapper = client.stream("POST", "/chat/stream", json={})
+        
+        with pytest.raises(HTTPStatusError) as exc_info:
+            with wrapper:
+                pass
+        
+        assert exc_info.value.response_text == "down"
+        assert wrapper.response.is_closed
+        client.close()
+
+
+class TestAsyncHTTPClientStream:
+    """Test AsyncAPIClient.stream."""
+    
+    @staticmethod
+    def _collect(handler) -> list:
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with AsyncAPIClient(
+                client=httpx.AsyncClient(base_url="http://async.test", transport=transport)
+            ) as client:
+                return [line async for line in client.stream("POST", "/chat/stream", json={"q": 1})]
+        
+        return asyncio.run(run())
+    
+    def test_stream_yields_lines(self) -> None:
+        """Test SSE lines are yielded and the JSON body is sent."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.content == b'{"q":1}'
+            return httpx.Response(200, content=b'data: {"a": 1}\n\ndata: {"b": 2}\n')
+        
+        assert self._collect(handler) == ['data: {"a": 1}', "", 'data: {"b": 2}']
+    
+    def test_stream_error_status_raises(self) -> None:
+        """Test a non-2xx status surfaces as HTTPStatusError with the body."""
+        with pytest.raises(HTTPStatusError) as exc_info:
+            self._collect(lambda request: httpx.Response(502, content=b"bad gateway"))
+        
+        assert exc_info.value.status_code == 502
+        assert exc_info.value.response_text == "bad gateway"
+
+
+class TestHTTPClientErrorBody:
+    """Test error body handling."""
+    
+    def test_large_error_body_is_truncated(self) -> None:
+        """Test only the head of a huge error page is decoded."""
+        client = APIClient(retry_times=1)
+        
+        mock_response = Mock(spec=httpx.Response)
+        mock_response.status_code = 502
+        mock_response.content = b"<html>" + b"x" * (5 * 1024 * 1024)
+        
+        with patch.object(client._client, 'get') as mock_get:
+            mock_get.return_value = mock_response
+            
+            with pytest.raises(HTTPStatusError) as exc_info:
+                client.get("/test")
+        
+        assert exc_info.value.response_text.startswith("<html>")
+        assert len(exc_info.value.response_text) == 512
+        
+        client.close()
@@ -52,6 +52,6 @@ def test_chat_with_local_agent_enabled_exits_when_handled(monkeypatch):
         def __init__(self, *args, **kwargs):
             raise AssertionError("APIClient should not be initialized when local-agent handles")
 
-    monkeypatch.setattr(chat_cmd, "APIClient", _ShouldNotInit)
+    monkeypatch.setattr(chat_cmd, "get_client", _ShouldNotInit)
 
     chat_cmd.chat(session_id=None, no_agent=False)
@@ -0,0 +1,35 @@
+"""Tests for the top-level CLI entry point."""
+
+from typer.testing import CliRunner
+
+from app.cli import main as cli_main
+
+
+def test_help_lists_all_commands_in_order() -> None:
+    result = CliRunner().invoke(cli_main.app, ["--help"])
+
+    assert result.exit_code == 0
+    positions = [result.output.index(f" {name} ") for name in cli_main._LAZY_COMMANDS]
+    assert positions == sorted(positions)
+
+
+def test_subcommand_is_resolved_lazily(tmp_path, monkeypatch) -> None:
+    from app.cli.lib import state_manager
+
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: tmp_path / "state.json")
+    result = CliRunner().invoke(cli_main.app, ["state", "show"])
+
+    assert result.exit_code == 0
+    assert "last_api_base" in result.output
+    group = cli_main.typer.main.get_command(cli_main.app)
+    assert group.get_command(None, "state") is not None
+    assert group.get_command(None, "missing") is None
+
+
+def test_subcommand_help_has_no_completion_options() -> None:
+    result = CliRunner().invoke(cli_main.app, ["history", "--help"])
+
+    assert result.exit_code == 0
+    assert "--help" in result.output
+    assert "--install-completion" not in result.output
+    assert "--show-completion" not in result.output
@@ -249,3 +249,37 @@ class TestSSEErrorRecovery:
         assert results[2] is not None
         assert results[3] is None
         assert results[4] is not None
+
+
+class TestSSEBytesParsing:
+    """Test parsing undecoded SSE byte lines."""
+    
+    def test_parse_bytes_data_line(self) -> None:
+        """Test bytes lines are parsed without decoding to str first."""
+        line = 'data: {"type": "token", "data": {"content": "你好"}}'.encode("utf-8")
+        result = parse_sse_line(line)
+        
+        assert result is not None
+        assert result["data"]["content"] == "你好"
+    
+    def test_bytes_non_data_and_invalid_utf8(self) -> None:
+        """Test bytes edge cases: non-data lines and invalid UTF-8."""
+        assert parse_sse_line(b"") is None
+        assert parse_sse_line(b": comment") is None
+        result = parse_sse_line(b'data: {"type": "token", "data": {"content": "a\xffb"}}')
+        assert result is not None
+        assert result["data"]["content"] == "a�b"
+    
+    def test_iter_sse_lines_splits_across_chunks(self) -> None:
+        """Test byte chunks are reassembled into complete SSE lines."""
+        from unittest.mock import Mock
+        
+        from app.cli.commands.chat import _iter_sse_lines
+        
+        response = Mock()
+        response.iter_bytes.return_value = iter(
+            [b'data: {"type": "tok', b'en"}\r\n\r\ndata: {"type"', b': "done"}']
+        )
+        lines = list(_iter_sse_lines(response))
+        
+        assert lines == [b'data: {"type": "token"}', b"", b'data: {"type": "done"}']
@@ -0,0 +1,98 @@
+"""Tests for CLI local state persistence."""
+
+import json
+
+from app.cli.lib import state_manager
+
+
+def test_update_state_merges_into_existing_file(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+
+    state_manager.update_state("last_session_id", "chat_1")
+    state_manager.update_state("last_record_id", "rec_1")
+    state_manager.update_state("last_session_id", "c")
+
+    assert json.loads(state_file.read_text(encoding="utf-8")) == {
+        "last_session_id": "c",
+        "last_record_id": "rec_1",
+    }
+
+
+def test_update_state_recovers_from_corrupted_file(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    state_file.write_text("{not json", encoding="utf-8")
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+
+    state_manager.update_state("last_record_id", "记录")
+
+    assert state_manager.load_state() == {"last_record_id": "记录"}
+
+
+def test_load_state_reads_large_file(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    big = {"history": ["记录" * 50] * 100, "last_record_id": "rec_9"}
+    state_file.write_text(json.dumps(big, ensure_ascii=False), encoding="utf-8")
+    assert state_file.stat().st_size > state_manager._MMAP_MIN_SIZE
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+
+    assert state_manager.load_state() == big
+
+
+def test_save_state_replaces_file_atomically(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    state_file.write_text('{"last_record_id": "old"}', encoding="utf-8")
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+
+    def _fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(state_manager.os, "replace", _fail_replace)
+    state_manager.save_state({"last_record_id": "new"})
+
+    # A failed save leaves the previous file untouched and no temp file behind
+    assert json.loads(state_file.read_text(encoding="utf-8")) == {"last_record_id": "old"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["state.json"]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+    state_manager.save_state({"last_record_id": "new"})
+
+    assert json.loads(state_file.read_text(encoding="utf-8")) == {"last_record_id": "new"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["state.json"]
+
+
+def test_save_state_recreates_removed_directory(tmp_path, monkeypatch):
+    state_file = tmp_path / "truthcast" / "state.json"
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+
+    assert state_manager.load_state() == {}
+    state_manager.save_state({"last_record_id": "rec_1"})
+    assert state_manager.load_state() == {"last_record_id": "rec_1"}
+
+    state_file.unlink()
+    state_file.parent.rmdir()
+    state_manager.save_state({"last_record_id": "rec_2"})
+
+    assert state_manager.load_state() == {"last_record_id": "rec_2"}
+
+
+def test_concurrent_saves_use_separate_temp_files(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    monkeypatch.setattr(state_manager, "_get_state_file_path", lambda: state_file)
+    seen = []
+    real_replace = state_manager.os.replace
+
+    def _record_replace(src, dst):
+        seen.append(src)
+        if len(seen) == 1:
+            # A second writer saves while the first one is about to publish
+            state_manager.save_state({"last_record_id": "b"})
+        real_replace(src, dst)
+
+    monkeypatch.setattr(state_manager.os, "replace", _record_replace)
+    state_manager.save_state({"last_record_id": "a"})
+
+    assert len(set(seen)) == 2
+    assert json.loads(state_file.read_text(encoding="utf-8")) == {"last_record_id": "a"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["state.json"]
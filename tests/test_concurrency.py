@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import app.core.concurrency as concurrency
+
+
+def test_llm_slot_async_times_out_with_429(monkeypatch) -> None:
+    monkeypatch.setattr(concurrency, "_concurrency", 1)
+    monkeypatch.setattr(concurrency, "_max_wait", 0.01)
+    # 保存原信号量，测试结束后由 monkeypatch 还原
+    monkeypatch.setattr(concurrency, "_semaphore", concurrency._semaphore)
+    monkeypatch.setattr(concurrency, "_async_semaphore", concurrency._async_semaphore)
+
+    async def _run() -> None:
+        concurrency.init_semaphore()
+        async with concurrency.llm_slot_async():
+            with pytest.raises(HTTPException) as exc_info:
+                async with concurrency.llm_slot_async():
+                    pass
+        assert exc_info.value.status_code == 429
+
+        # 槽位释放后可再次获取
+        async with concurrency.llm_slot_async():
+            pass
+
+    asyncio.run(_run())
@@ -9,6 +9,7 @@
 
 import pytest
 from datetime import datetime, timezone
+from functools import lru_cache
 
 from app.schemas.detect import (
     ContentGenerateRequest,
@@ -24,8 +25,9 @@ from app.schemas.detect import (
 )
 
 
+@lru_cache(maxsize=1)
 def _make_sample_report() -> ReportResponse:
-    """创建示例报告"""
+    """创建示例报告（模块内共用一份，测试只读；需改动时用 model_copy）"""
     return ReportResponse(
         risk_score=65,
         risk_level="high",
@@ -49,6 +51,26 @@ def _make_sample_report() -> ReportResponse:
     )
 
 
+@pytest.fixture
+def llm_enabled_config(monkeypatch):
+    """启用内容生成 LLM（api_key=test-key）；返回的函数可在此基础上再覆盖配置字段"""
+    import dataclasses
+
+    from app.services.content_generation import _llm_client, platform_scripts
+    from app.services.content_generation.config import get_content_config
+
+    def _configure(**overrides):
+        config = dataclasses.replace(
+            get_content_config(), llm_enabled=True, api_key="test-key", **overrides
+        )
+        for module in (_llm_client, platform_scripts):
+            monkeypatch.setattr(module, "get_content_config", lambda: config)
+        return config
+
+    _configure()
+    return _configure
+
+
 def test_clarification_content():
     """测试澄清稿 Schema"""
     content = ClarificationContent(
@@ -147,21 +169,33 @@ def test_content_generate_response():
     assert response.based_on["risk_level"] == "high"
 
 
-def test_platform_enum():
+@pytest.mark.parametrize(
+    "member, value",
+    [
+        (Platform.WEIBO, "weibo"),
+        (Platform.WECHAT, "wechat"),
+        (Platform.XIAOHONGSHU, "xiaohongshu"),
+        (Platform.DOUYIN, "douyin"),
+        (Platform.KUAISHOU, "kuaishou"),
+        (Platform.BILIBILI, "bilibili"),
+    ],
+)
+def test_platform_enum(member: Platform, value: str):
     """测试平台枚举"""
-    assert Platform.WEIBO.value == "weibo"
-    assert Platform.WECHAT.value == "wechat"
-    assert Platform.XIAOHONGSHU.value == "xiaohongshu"
-    assert Platform.DOUYIN.value == "douyin"
-    assert Platform.KUAISHOU.value == "kuaishou"
-    assert Platform.BILIBILI.value == "bilibili"
+    assert member.value == value
 
 
-def test_clarification_style_enum():
+@pytest.mark.parametrize(
+    "member, value",
+    [
+        (ClarificationStyle.FORMAL, "formal"),
+        (ClarificationStyle.FRIENDLY, "friendly"),
+        (ClarificationStyle.NEUTRAL, "neutral"),
+    ],
+)
+def test_clarification_style_enum(member: ClarificationStyle, value: str):
     """测试风格枚举"""
-    assert ClarificationStyle.FORMAL.value == "formal"
-    assert ClarificationStyle.FRIENDLY.value == "friendly"
-    assert ClarificationStyle.NEUTRAL.value == "neutral"
+    assert member.value == value
 
 
 # === 规则兜底测试 ===
@@ -220,3 +254,567 @@ def test_fallback_platform_script():
     script = _fallback_platform_script(Platform.DOUYIN, clarification, report)
     assert script.platform == Platform.DOUYIN
     assert "开头" in script.content or "开头" not in script.content  # 脚本格式
+
+
+def test_full_content_overlaps_platform_scripts_with_faq(monkeypatch):
+    """测试多平台话术在澄清稿完成后即启动，不等待 FAQ"""
+    import asyncio
+
+    import app.services.content_generation as content_generation
+
+    order: list[str] = []
+
+    async def _fake_clarification(**_kwargs):
+        order.append("clarification")
+        return ClarificationContent(short="短", medium="中", long="长")
+
+    async def _fake_faq(**_kwargs):
+        await asyncio.sleep(0.05)
+        order.append("faq")
+        return [FAQItem(question="问", answer="答")]
+
+    async def _fake_scripts(**kwargs):
+        assert kwargs["clarification"].short == "短"
+        order.append("platform_scripts")
+        return []
+
+    monkeypatch.setattr(content_generation, "generate_clarification", _fake_clarification)
+    monkeypatch.setattr(content_generation, "generate_faq", _fake_faq)
+    monkeypatch.setattr(content_generation, "generate_platform_scripts", _fake_scripts)
+
+    request = ContentGenerateRequest(text="测试新闻文本", report=_make_sample_report())
+    response = asyncio.run(content_generation.generate_full_content(request))
+
+    assert order == ["clarification", "platform_scripts", "faq"]
+    assert response.faq[0].question == "问"
+
+
+def test_content_llm_config_shared_across_submodules():
+    """测试三个子模块共用同一份只读 LLM 配置"""
+    import dataclasses
+
+    from app.services.content_generation import platform_scripts
+    from app.services.content_generation.config import get_content_config
+
+    config = get_content_config()
+    assert config is get_content_config()
+    assert platform_scripts.get_content_config is get_content_config
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.timeout_sec = 1  # type: ignore[misc]
+
+
+def test_submodules_share_one_llm_call_path(monkeypatch, llm_enabled_config):
+    """测试三个子模块经同一个 call_llm 发请求，仅 system prompt / temperature 不同"""
+    import asyncio
+    import json
+
+    import httpx
+
+    from app.services.content_generation import _llm_client, clarification, faq
+
+    seen = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": '{"ok": true}'}}]}
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    monkeypatch.setattr(_llm_client, "get_client", lambda: client)
+
+    async def _run():
+        try:
+            return [await clarification._call_llm("p1"), await faq._call_llm("p2")]
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(_run()) == [{"ok": True}, {"ok": True}]
+    assert [body["messages"][0]["content"] for body in seen] == [
+        clarification.SYSTEM_PROMPT,
+        faq.SYSTEM_PROMPT,
+    ]
+    assert [body["temperature"] for body in seen] == [0.7, 0.6]
+    assert all(body["response_format"] == {"type": "json_object"} for body in seen)
+    assert seen[1]["messages"][1]["content"] == "p2"
+
+
+def test_platform_scripts_only_skips_work_without_platforms(monkeypatch):
+    """测试未指定平台时直接返回空列表，不调用话术生成"""
+    import asyncio
+
+    import app.services.content_generation as content_generation
+
+    async def _should_not_run(**_kwargs):
+        raise AssertionError("无目标平台时不应生成话术")
+
+    monkeypatch.setattr(content_generation, "generate_platform_scripts", _should_not_run)
+
+    request = ContentGenerateRequest(text="测试新闻文本", report=_make_sample_report(), platforms=[])
+    assert asyncio.run(content_generation.generate_platform_scripts_only(request)) == []
+
+
+def test_platform_scripts_fan_out_per_platform_with_partial_fallback(monkeypatch, llm_enabled_config):
+    """测试多平台话术逐平台并发调用 LLM，单平台失败仅该平台走规则兜底"""
+    import asyncio
+
+    from app.services.content_generation import platform_scripts
+
+    prompts: list[str] = []
+
+    async def _fake_call_llm(prompt: str, max_tokens: int = 8000, cache_key=None):
+        prompts.append(prompt)
+        assert max_tokens in platform_scripts._SINGLE_PLATFORM_MAX_TOKENS.values()
+        if '"platform": "weibo"' in prompt:
+            return {"platform": "weibo", "content": "微博正文", "tips": ["t"], "hashtags": ["#辟谣"]}
+        return None
+
+    monkeypatch.setattr(platform_scripts, "_call_llm", _fake_call_llm)
+
+    clarification = ClarificationContent(short="短版", medium="中版", long="长版")
+    scripts = asyncio.run(
+        platform_scripts.generate_platform_scripts(
+            clarification=clarification,
+            report=_make_sample_report(),
+            simulation=None,
+            platforms=[Platform.WEIBO, Platform.DOUYIN],
+        )
+    )
+
+    assert len(prompts) == 2
+    assert [s.platform for s in scripts] == [Platform.WEIBO, Platform.DOUYIN]
+    assert scripts[0].content == "微博正文"
+    assert scripts[1].content  # 规则兜底
+
+
+def test_content_http_client_shared_per_loop_and_closed_by_run_sync():
+    """测试同一事件循环内复用 HTTP 客户端，临时循环结束时关闭"""
+    from app.services.content_generation import _http
+
+    async def _get_twice():
+        first = _http.get_client()
+        assert _http.get_client() is first
+        return first
+
+    client = _http.run_sync(_get_twice())
+    assert client.is_closed
+    assert _http.run_sync(_get_twice()) is not client
+
+
+def test_content_trace_batched_by_background_writer(monkeypatch, tmp_path):
+    """测试 trace 经后台线程追加写入，flush 后全部落盘"""
+    import dataclasses
+    import json
+
+    from app.services.content_generation import _trace
+    from app.services.content_generation.config import get_content_config
+
+    trace_path = tmp_path / "debug" / "content_trace.jsonl"
+    monkeypatch.setattr(_trace, "TRACE_PATH", trace_path)
+    monkeypatch.setattr(
+        _trace, "get_content_config", lambda: dataclasses.replace(get_content_config(), debug=True)
+    )
+
+    for idx in range(5):
+        _trace.record_trace("faq", "llm_request", {"idx": idx})
+    _trace.flush()
+
+    entries = [json.loads(line) for line in trace_path.read_text(encoding="utf-8").splitlines()]
+    assert [e["payload"]["idx"] for e in entries] == list(range(5))
+    assert all(e["module"] == "faq" and e["stage"] == "llm_request" for e in entries)
+
+
+def test_platform_scripts_streaming_yields_in_finish_order(monkeypatch, llm_enabled_config):
+    """测试流式话术按完成先后产出，慢平台不阻塞快平台"""
+    import asyncio
+
+    from app.services.content_generation import platform_scripts
+
+    delays = {"weibo": 0.05, "douyin": 0.0}
+
+    async def _fake_call_llm(prompt: str, max_tokens: int = 8000, cache_key=None):
+        platform = "weibo" if "(weibo)" in prompt else "douyin"
+        await asyncio.sleep(delays[platform])
+        return {"content": f"{platform}-话术", "tips": []}
+
+    monkeypatch.setattr(platform_scripts, "_call_llm", _fake_call_llm)
+    clarification = ClarificationContent(short="短", medium="中", long="长")
+
+    async def _collect():
+        return [
+            script.platform.value
+            async for script in platform_scripts.generate_platform_scripts_streaming(
+                clarification, _make_sample_report(), None, [Platform.WEIBO, Platform.DOUYIN]
+            )
+        ]
+
+    assert asyncio.run(_collect()) == ["douyin", "weibo"]
+
+
+# === 路由缓存测试 ===
+
+def test_content_route_cache_hit_skips_generation(monkeypatch):
+    """测试相同请求命中 content_cache，不重复调用生成服务"""
+    from fastapi.testclient import TestClient
+
+    import app.api.routes_content as routes_content
+    from app.core.cache import content_cache
+    from app.main import app
+
+    calls = {"count": 0}
+
+    async def _fake_clarification(_request):
+        calls["count"] += 1
+        return ClarificationContent(short="短", medium="中", long="长")
+
+    monkeypatch.setattr(routes_content, "generate_clarification_only", _fake_clarification)
+    content_cache.clear()
+
+    payload = {"text": "测试新闻文本", "report": _make_sample_report().model_dump(mode="json")}
+    client = TestClient(app)
+    first = client.post("/content/clarification", json=payload)
+    second = client.post("/content/clarification", json=payload)
+
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert calls["count"] == 1
+    content_cache.clear()
+
+
+def test_content_generate_prefills_part_caches(monkeypatch):
+    """测试完整生成后，单模块接口直接命中预填缓存"""
+    from fastapi.testclient import TestClient
+
+    import app.api.routes_content as routes_content
+    from app.core.cache import content_cache, content_semantic_cache
+    from app.main import app
+
+    async def _fake_full(request):
+        return ContentGenerateResponse(
+            clarification=ClarificationContent(short="短", medium="中", long="长"),
+            faq=[FAQItem(question="问", answer="答")],
+            platform_scripts=[],
+            generated_at="2026-01-01T00:00:00Z",
+            based_on={},
+        )
+
+    async def _should_not_run(_request):
+        raise AssertionError("应命中预填缓存")
+
+    monkeypatch.setattr(routes_content, "generate_full_content", _fake_full)
+    monkeypatch.setattr(routes_content, "generate_clarification_only", _should_not_run)
+    monkeypatch.setattr(routes_content, "generate_faq_only", _should_not_run)
+    monkeypatch.setattr(routes_content, "generate_platform_scripts_only", _should_not_run)
+    content_cache.clear()
+    content_semantic_cache.clear()
+
+    payload = {"text": "预填缓存测试文本", "report": _make_sample_report().model_dump(mode="json")}
+    client = TestClient(app)
+    assert client.post("/content/generate", json=payload).status_code == 200
+
+    assert client.post("/content/clarification", json=payload).json()["short"] == "短"
+    assert client.post("/content/faq", json=payload).json()[0]["question"] == "问"
+    assert client.post("/content/platform-scripts", json=payload).json() == []
+    content_cache.clear()
+    content_semantic_cache.clear()
+
+
+def test_content_route_skips_cache_for_fallback_results(monkeypatch):
+    """测试结果含规则兜底时不写入缓存，LLM 恢复后同参请求会重新生成"""
+    from fastapi.testclient import TestClient
+
+    import app.api.routes_content as routes_content
+    from app.core.cache import content_cache, content_semantic_cache
+    from app.main import app
+    from app.services.content_generation._fallback import mark_fallback
+
+    calls = {"count": 0}
+
+    async def _fake_full(request):
+        calls["count"] += 1
+        mark_fallback("faq")
+        return ContentGenerateResponse(
+            clarification=ClarificationContent(short="短", medium="中", long="长"),
+            faq=None,
+            platform_scripts=[],
+            generated_at="2026-01-01T00:00:00Z",
+            based_on={},
+        )
+
+    monkeypatch.setattr(routes_content, "generate_full_content", _fake_full)
+    content_cache.clear()
+    content_semantic_cache.clear()
+
+    payload = {"text": "兜底不缓存测试文本", "report": _make_sample_report().model_dump(mode="json")}
+    client = TestClient(app)
+    assert client.post("/content/generate", json=payload).status_code == 200
+    assert client.post("/content/generate", json=payload).status_code == 200
+
+    assert calls["count"] == 2
+    assert len(content_cache) == 0
+    content_semantic_cache.clear()
+
+
+def test_track_fallbacks_collects_marks_from_child_tasks():
+    """测试子任务中的兜底标记对外层可见，块外标记被忽略"""
+    import asyncio
+
+    from app.services.content_generation._fallback import mark_fallback, track_fallbacks
+
+    async def _run() -> set[str]:
+        with track_fallbacks() as fallbacks:
+            await asyncio.create_task(_mark("faq"))
+            mark_fallback("clarification")
+        mark_fallback("platform_scripts")
+        return fallbacks
+
+    async def _mark(module: str) -> None:
+        mark_fallback(module)
+
+    assert asyncio.run(_run()) == {"faq", "clarification"}
+
+
+def test_semantic_text_cache_matches_near_duplicate_text():
+    """测试近似匹配缓存：仅空白差异命中，不同分组或不同文本不命中"""
+    from app.core.cache import SemanticTextCache
+
+    cache = SemanticTextCache(maxsize=10, ttl=60, threshold=0.95)
+    cache.set("bucket-a", "某地发生重大事件，官方尚未通报具体伤亡情况", "cached")
+
+    assert cache.get("bucket-a", "某地发生重大事件， 官方尚未通报具体伤亡情况 ") == "cached"
+    assert cache.get("bucket-b", "某地发生重大事件，官方尚未通报具体伤亡情况") is None
+    assert cache.get("bucket-a", "完全不同的另一条新闻内容") is None
+
+
+def test_fallback_outputs_cached_by_report_fingerprint():
+    """测试规则兜底按报告指纹缓存文本，且每次返回独立的模型实例"""
+    from app.services.content_generation import clarification, faq
+
+    clarification._fallback_clarification_texts.cache_clear()
+    faq._fallback_faq_items.cache_clear()
+    report = _make_sample_report()
+
+    first = clarification._fallback_clarification(report, "formal")
+    second = clarification._fallback_clarification(report.model_copy(), "friendly")
+    assert first == second and first is not second
+    assert clarification._fallback_clarification_texts.cache_info().hits == 1
+
+    faq_first = faq._fallback_faq(report, 3)
+    faq_second = faq._fallback_faq(report, 3)
+    assert faq_first == faq_second
+    assert faq_first[0] is not faq_second[0]
+    assert faq._fallback_faq_items.cache_info().hits == 1
+
+    changed = report.model_copy(update={"risk_score": report.risk_score - 1})
+    assert clarification._fallback_clarification(changed, "formal") != first
+
+
+def test_call_llm_retries_transient_status_only(monkeypatch, llm_enabled_config):
+    """测试 429/5xx 按退避重试，4xx 不重试直接兜底"""
+    import asyncio
+
+    import httpx
+
+    from app.services.content_generation import _llm_client
+
+    llm_enabled_config(max_attempts=3)
+    monkeypatch.setattr(_llm_client, "_backoff_delay", lambda attempt: 0)
+    statuses = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        status = responses.pop(0)
+        statuses.append(status)
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"ok": 1}'}}]})
+
+    async def _run(client: httpx.AsyncClient):
+        monkeypatch.setattr(_llm_client, "get_client", lambda: client)
+        try:
+            return await _llm_client.call_llm("p", "sys", "faq")
+        finally:
+            await client.aclose()
+
+    responses = [503, 429, 200]
+    assert asyncio.run(_run(httpx.AsyncClient(transport=httpx.MockTransport(_handler)))) == {"ok": 1}
+    assert statuses == [503, 429, 200]
+
+    statuses.clear()
+    responses = [400, 200]
+    assert asyncio.run(_run(httpx.AsyncClient(transport=httpx.MockTransport(_handler)))) is None
+    assert statuses == [400]
+
+    statuses.clear()
+    responses = [502, 502, 502, 200]
+    assert asyncio.run(_run(httpx.AsyncClient(transport=httpx.MockTransport(_handler)))) is None
+    assert statuses == [502, 502, 502]
+
+
+def test_platform_scripts_stream_route_pushes_each_script_and_caches(monkeypatch):
+    """测试 SSE 话术接口逐条推送，并按平台顺序写入缓存供非流式接口复用"""
+    import json
+
+    from fastapi.testclient import TestClient
+
+    import app.api.routes_content as routes_content
+    from app.core.cache import content_cache
+    from app.main import app
+
+    async def _fake_stream(_request):
+        for platform in ("douyin", "weibo"):
+            yield PlatformScript(platform=platform, content=f"{platform}-话术")
+
+    async def _should_not_run(_request):
+        raise AssertionError("应命中流式接口写入的缓存")
+
+    monkeypatch.setattr(routes_content, "stream_platform_scripts_only", _fake_stream)
+    monkeypatch.setattr(routes_content, "generate_platform_scripts_only", _should_not_run)
+    content_cache.clear()
+
+    payload = {
+        "text": "流式话术测试文本",
+        "report": _make_sample_report().model_dump(mode="json"),
+        "platforms": ["weibo", "douyin"],
+    }
+    client = TestClient(app)
+    response = client.post("/content/platform-scripts/stream", json=payload)
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.split("\n")
+        if line.startswith("data: ")
+    ]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [e["stage"] for e in events] == ["platform_script", "platform_script", "done"]
+    assert [e["data"]["platform"] for e in events[:2]] == ["douyin", "weibo"]
+    assert events[-1]["data"] == {"count": 2}
+
+    cached = client.post("/content/platform-scripts", json=payload).json()
+    assert [item["platform"] for item in cached] == ["weibo", "douyin"]
+    content_cache.clear()
+
+
+def test_platform_scripts_stream_route_reports_busy_as_error_event(monkeypatch):
+    """测试流式话术接口排队超时：响应头已发出，以 error 事件代替 429 且不写缓存"""
+    import json
+    from contextlib import asynccontextmanager
+
+    from fastapi import HTTPException
+    from fastapi.testclient import TestClient
+
+    import app.api.routes_content as routes_content
+    from app.core.cache import content_cache
+    from app.main import app
+
+    @asynccontextmanager
+    async def _busy_slot():
+        raise HTTPException(status_code=429, detail="服务繁忙，等待超时，请稍后重试")
+        yield
+
+    monkeypatch.setattr(routes_content, "llm_slot_async", _busy_slot)
+    content_cache.clear()
+
+    payload = {
+        "text": "流式话术繁忙测试文本",
+        "report": _make_sample_report().model_dump(mode="json"),
+        "platforms": ["weibo"],
+    }
+    response = TestClient(app).post("/content/platform-scripts/stream", json=payload)
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.split("\n")
+        if line.startswith("data: ")
+    ]
+
+    assert [e["stage"] for e in events] == ["error"]
+    assert events[0]["data"]["status"] == 429
+    assert len(content_cache) == 0
+
+
+def test_prompt_cache_key_opt_in_and_sent_in_payload(monkeypatch, llm_enabled_config):
+    """测试 prompt_cache_key 默认关闭；开启后按报告稳定生成并写入请求体"""
+    import asyncio
+    import json
+
+    import httpx
+
+    from app.services.content_generation import _llm_client
+
+    report = _make_sample_report()
+    assert _llm_client.prompt_cache_key(report) is None
+
+    llm_enabled_config(prompt_cache_key=True)
+    key = _llm_client.prompt_cache_key(report)
+    assert key and key == _llm_client.prompt_cache_key(report.model_copy())
+    assert key != _llm_client.prompt_cache_key(report.model_copy(update={"summary": "另一份报告"}))
+
+    seen = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    monkeypatch.setattr(_llm_client, "get_client", lambda: client)
+
+    async def _run():
+        try:
+            await _llm_client.call_llm("p", "sys", "faq", cache_key=key)
+            await _llm_client.call_llm("p", "sys", "faq")
+        finally:
+            await client.aclose()
+
+    asyncio.run(_run())
+    assert seen[0]["prompt_cache_key"] == key
+    assert "prompt_cache_key" not in seen[1]
+
+
+def test_call_llm_caps_inflight_requests(monkeypatch, llm_enabled_config):
+    """测试同时在途的 LLM 请求数不超过 max_inflight"""
+    import asyncio
+
+    import httpx
+
+    from app.services.content_generation import _llm_client
+
+    llm_enabled_config(max_inflight=2)
+    state = {"inflight": 0, "peak": 0}
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        await asyncio.sleep(0.01)
+        state["inflight"] -= 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]})
+
+    async def _run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        monkeypatch.setattr(_llm_client, "get_client", lambda: client)
+        try:
+            return await asyncio.gather(
+                *(_llm_client.call_llm(f"p{i}", "sys", "platform_scripts") for i in range(5))
+            )
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(_run()) == [{}] * 5
+    assert state["peak"] == 2
+
+
+def test_output_token_budgets_follow_length_limits():
+    """测试 max_tokens 按各模块字数上限估算：不超过 8000，且足以容纳最长平台正文"""
+    from app.services.content_generation import clarification, platform_scripts
+    from app.services.content_generation._llm_client import output_token_budget
+
+    assert clarification._MAX_TOKENS == output_token_budget(
+        clarification.CLARIFICATION_SHORT_MAX
+        + clarification.CLARIFICATION_MEDIUM_MAX
+        + clarification.CLARIFICATION_LONG_MAX
+    )
+    assert output_token_budget(10_000) == 8000
+
+    budgets = platform_scripts._SINGLE_PLATFORM_MAX_TOKENS
+    assert set(budgets) == set(Platform)
+    wechat = platform_scripts.PLATFORM_CONFIGS[Platform.WECHAT]
+    assert budgets[Platform.WECHAT] > wechat.max_length * 2
+    assert budgets[Platform.WEIBO] < budgets[Platform.WECHAT] < 8000
@@ -1,8 +1,15 @@
+import json
+
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
 import app.api.routes_export as routes_export
 
+# 模块内共用一个客户端；不进入 lifespan，导出接口不依赖启动时初始化的数据库
+client = TestClient(app)
+
 
 def _sample_payload() -> dict:
     return {
@@ -24,12 +31,20 @@ def _sample_payload() -> dict:
     }
 
 
+# 各用例请求体相同：只序列化一次，直接作为原始 JSON 发送
+_PAYLOAD_JSON = json.dumps(_sample_payload(), ensure_ascii=False).encode("utf-8")
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _post(path: str) -> httpx.Response:
+    return client.post(path, content=_PAYLOAD_JSON, headers=_JSON_HEADERS)
+
+
 def test_export_pdf_ok(monkeypatch) -> None:
     monkeypatch.setattr(
         routes_export, "generate_pdf_bytes", lambda _data: b"%PDF-1.4 sample"
     )
-    client = TestClient(app)
-    response = client.post("/export/pdf", json=_sample_payload())
+    response = _post("/export/pdf")
     assert response.status_code == 200
     assert response.headers["content-type"].startswith("application/pdf")
     assert "attachment; filename=" in response.headers.get("content-disposition", "")
@@ -40,8 +55,7 @@ def test_export_word_ok(monkeypatch) -> None:
     monkeypatch.setattr(
         routes_export, "generate_word_bytes", lambda _data: b"PK\x03\x04"
     )
-    client = TestClient(app)
-    response = client.post("/export/word", json=_sample_payload())
+    response = _post("/export/word")
     assert response.status_code == 200
     assert response.headers["content-type"].startswith(
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -50,23 +64,46 @@ def test_export_word_ok(monkeypatch) -> None:
     assert response.content.startswith(b"PK")
 
 
-def test_export_pdf_dependency_error(monkeypatch) -> None:
+@pytest.mark.parametrize(
+    ("exc", "detail"),
+    [
+        (RuntimeError("PDF 导出依赖未安装"), "PDF 导出依赖未安装"),
+        (ValueError("boom"), "PDF 导出失败：boom"),
+    ],
+    ids=["dependency_error", "unexpected_error"],
+)
+def test_export_pdf_errors(monkeypatch, exc: Exception, detail: str) -> None:
     def _raise(_data):
-        raise RuntimeError("PDF 导出依赖未安装")
+        raise exc
 
     monkeypatch.setattr(routes_export, "generate_pdf_bytes", _raise)
-    client = TestClient(app)
-    response = client.post("/export/pdf", json=_sample_payload())
+    response = _post("/export/pdf")
     assert response.status_code == 500
-    assert response.json()["detail"] == "PDF 导出依赖未安装"
+    assert response.json()["detail"] == detail
 
 
-def test_export_pdf_unexpected_error(monkeypatch) -> None:
-    def _raise(_data):
-        raise ValueError("boom")
+def test_export_pdf_streams_large_content_in_chunks(monkeypatch) -> None:
+    blob = b"%PDF-1.4 " + b"x" * (routes_export._STREAM_THRESHOLD + 17)
+    monkeypatch.setattr(routes_export, "generate_pdf_bytes", lambda _data: blob)
+    assert len(list(routes_export._iter_chunks(blob))) == 11
+    response = _post("/export/pdf")
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    assert response.content == blob
 
-    monkeypatch.setattr(routes_export, "generate_pdf_bytes", _raise)
-    client = TestClient(app)
-    response = client.post("/export/pdf", json=_sample_payload())
-    assert response.status_code == 500
-    assert response.json()["detail"].startswith("PDF 导出失败：")
+
+def test_export_pdf_small_content_sent_directly(monkeypatch) -> None:
+    blob = b"%PDF-1.4 small"
+    monkeypatch.setattr(routes_export, "generate_pdf_bytes", lambda _data: blob)
+    response = _post("/export/pdf")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(blob))
+    assert response.content == blob
+
+
+def test_filename_date_refreshes_across_utc_days(monkeypatch) -> None:
+    monkeypatch.setattr(routes_export, "_cached_day", (-1, ""))
+    monkeypatch.setattr(routes_export.time, "time", lambda: 1772236799.0)
+    assert routes_export._filename("pdf") == "truthcast-report-2026-02-27.pdf"
+    monkeypatch.setattr(routes_export.time, "time", lambda: 1772236800.0)
+    assert routes_export._filename("docx") == "truthcast-report-2026-02-28.docx"
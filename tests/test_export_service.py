@@ -1,10 +1,17 @@
+from functools import lru_cache
+from html import escape
 from io import BytesIO
+from typing import Iterator
 from zipfile import ZipFile
 
+import pytest
+
 from app.schemas.export import ExportDataRequest
 from app.services.export_service import _build_html, generate_word_bytes
 
 
+# 各测试只读取样例数据：嵌套模型只校验一次，需要改动时请先 model_copy(deep=True)
+@lru_cache(maxsize=1)
 def _sample_export_data() -> ExportDataRequest:
     return ExportDataRequest.model_validate(
         {
@@ -115,39 +122,167 @@ def _sample_export_data() -> ExportDataRequest:
     )
 
 
-def test_build_html_claim_columns_are_simplified() -> None:
-    html = _build_html(_sample_export_data())
+@pytest.fixture(scope="module")
+def sample_html() -> str:
+    return _build_html(_sample_export_data())
+
+
+def test_build_html_claim_columns_are_simplified(sample_html: str) -> None:
+    html = sample_html
     assert "<th>ID</th><th>主张内容</th>" in html
     assert "<th>ID</th><th>主张内容</th><th>实体</th>" not in html
     assert "<th>ID</th><th>主张内容</th><th>时间</th>" not in html
     assert "<th>ID</th><th>主张内容</th><th>地点</th>" not in html
 
 
-def test_build_html_contains_evidence_chain_and_simulation_sections() -> None:
-    html = _build_html(_sample_export_data())
-    assert "<h2>证据链</h2>" in html
-    assert "<h3>情绪分布</h3>" in html
-    assert "<h3>立场分布</h3>" in html
-    assert "<h3>叙事分支</h3>" in html
-    assert "<h3>时间线</h3>" in html
-    assert "<h3>应对建议</h3>" in html
+_HTML_SECTION_MARKERS = (
+    "<h2>证据链</h2>",
+    "<h3>情绪分布</h3>",
+    "<h3>立场分布</h3>",
+    "<h3>叙事分支</h3>",
+    "<h3>时间线</h3>",
+    "<h3>应对建议</h3>",
+)
+
+
+def test_build_html_contains_evidence_chain_and_simulation_sections(sample_html: str) -> None:
+    missing = [marker for marker in _HTML_SECTION_MARKERS if marker not in sample_html]
+    assert not missing, missing
 
 
-def test_build_html_maps_report_domains_to_chinese() -> None:
-    html = _build_html(_sample_export_data())
+def test_build_html_maps_report_domains_to_chinese(sample_html: str) -> None:
+    html = sample_html
     assert "证据覆盖域" in html
     assert "教育校园、媒体传播" in html
 
 
-def test_build_html_maps_claim_and_narrative_stance_to_chinese() -> None:
-    html = _build_html(_sample_export_data())
+def test_build_html_maps_claim_and_narrative_stance_to_chinese(sample_html: str) -> None:
+    html = sample_html
     assert "<strong>最终立场：</strong>反驳" in html
     assert "<strong>立场：</strong>反对" in html
 
 
-def test_generate_word_bytes_contains_zh_font_config() -> None:
-    data = _sample_export_data()
-    content = generate_word_bytes(data)
-    with ZipFile(BytesIO(content), "r") as zf:
-        styles_xml = zf.read("word/styles.xml").decode("utf-8", errors="ignore")
-    assert 'w:eastAsia="Microsoft YaHei"' in styles_xml
+def _zip_entry_contains(zf: ZipFile, name: str, needle: bytes, chunk_size: int = 8192) -> bool:
+    """按块扫描 zip 条目，命中即停；窗口保留上一块末尾，避免跨块漏判"""
+    tail = b""
+    with zf.open(name) as fp:
+        while chunk := fp.read(chunk_size):
+            window = tail + chunk
+            if needle in window:
+                return True
+            tail = window[-(len(needle) - 1) :]
+    return False
+
+
+@pytest.fixture(scope="module")
+def word_bytes() -> bytes:
+    # 生成 DOCX 是本文件最重的调用，Word 相关测试共用一份只读结果
+    return generate_word_bytes(_sample_export_data())
+
+
+@pytest.fixture(scope="module")
+def word_zip(word_bytes: bytes) -> Iterator[ZipFile]:
+    with ZipFile(BytesIO(word_bytes), "r") as zf:
+        yield zf
+
+
+def test_generate_word_bytes_contains_zh_font_config(word_zip: ZipFile) -> None:
+    assert _zip_entry_contains(word_zip, "word/styles.xml", b'w:eastAsia="Microsoft YaHei"')
+
+
+def test_zh_html_matches_escaped_translation() -> None:
+    from app.services.export_service import (
+        _SIM_STANCE_MAP,
+        _STANCE_HTML,
+        _STANCE_MAP,
+        _ZH_STANCE_HTML,
+        _zh,
+        _zh_html,
+        _zh_stance,
+    )
+
+    for value in (None, "", "support", "refute", "unknown<&>"):
+        assert _zh_html(value, _STANCE_HTML) == escape(_zh(value, _STANCE_MAP))
+    for value in (None, "unknown<&>", *_STANCE_MAP, *_SIM_STANCE_MAP):
+        assert _zh_html(value, _ZH_STANCE_HTML) == escape(_zh_stance(value))
+
+
+def test_collect_primary_clarification_prefers_primary_then_latest() -> None:
+    from types import SimpleNamespace
+
+    from app.services.export_service import _collect_primary_clarification
+
+    items = [
+        {"id": "a", "content": "A", "generated_at": "2024-01-02"},
+        {"id": "b", "content": "B", "generated_at": "2024-01-03"},
+        {"id": "c", "content": "C", "generated_at": "2024-01-03"},
+    ]
+    content = SimpleNamespace(clarification=None, clarifications=items, primary_clarification_id="a")
+    assert _collect_primary_clarification(content) == "A"
+
+    # 主稿缺失时取最新一条，时间相同取靠前者
+    content.primary_clarification_id = "missing"
+    assert _collect_primary_clarification(content) == "B"
+
+
+def test_generate_pdf_falls_back_to_reportlab_without_rebuilding_html(monkeypatch) -> None:
+    import sys
+    from types import SimpleNamespace
+
+    import app.services.export_service as export_service
+
+    class _BrokenHTML:
+        def __init__(self, string: str) -> None:
+            self.string = string
+
+        def write_pdf(self) -> bytes:
+            raise OSError("no pango")
+
+    calls: list[str] = []
+    real_build = export_service._build_html
+    real_group = export_service._group_evidence
+
+    def _counting_build(data, **kwargs):
+        calls.append("build")
+        return real_build(data, **kwargs)
+
+    def _counting_group(data):
+        calls.append("group")
+        return real_group(data)
+
+    monkeypatch.setitem(sys.modules, "weasyprint", SimpleNamespace(HTML=_BrokenHTML))
+    monkeypatch.setattr(export_service, "_build_html", _counting_build)
+    monkeypatch.setattr(export_service, "_group_evidence", _counting_group)
+
+    content = export_service.generate_pdf_bytes(_sample_export_data())
+    assert content.startswith(b"%PDF")
+    # 只有 weasyprint 渲染用到 HTML，reportlab 降级直接由数据排版并复用证据分组
+    assert calls == ["group", "build"]
+
+
+def test_generate_word_bytes_sets_zh_font_on_styles_only(word_bytes: bytes) -> None:
+    from docx import Document
+    from docx.oxml.ns import qn
+
+    document = Document(BytesIO(word_bytes))
+    for name in ("Normal", "Heading 1", "Heading 4"):
+        r_fonts = document.styles[name]._element.rPr.rFonts
+        # 标题样式的主题字体会覆盖显式字体名，必须被移除
+        assert not any(attr.endswith("Theme") for attr in r_fonts.attrib)
+        assert r_fonts.get(qn("w:eastAsia")) == "Microsoft YaHei"
+    has_run_fonts = any(
+        run._element.rPr is not None and run._element.rPr.rFonts is not None
+        for paragraph in document.paragraphs
+        for run in paragraph.runs
+    )
+    assert not has_run_fonts
+
+
+def test_zh_stance_prefers_simulation_translation() -> None:
+    from app.services.export_service import _zh_stance
+
+    assert _zh_stance("skeptical") == "质疑"  # 仅舆情立场表
+    assert _zh_stance("refute") == "反驳"  # 仅通用立场表
+    assert _zh_stance("neutral") == "中立"  # 两表重叠，以舆情为准
+    assert _zh_stance("other") == "other"
+    assert _zh_stance(None) == "-"
@@ -1,11 +1,27 @@
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services import history_store
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True, scope="module")
+def _isolated_history_db(tmp_path_factory):
+    # 历史库指向临时文件，避免写入仓库内默认的 data/history/history.db；
+    # 活动路径在首次使用时缓存，需一并重置
+    mp = pytest.MonkeyPatch()
+    db_path = tmp_path_factory.mktemp("history") / "history.db"
+    mp.setenv("TRUTHCAST_HISTORY_DB_PATH", str(db_path))
+    mp.setattr(history_store, "_active_db_path", None)
+    history_store._record_cache.clear()
+    yield db_path
+    mp.undo()
+    history_store._record_cache.clear()
+
+
 def test_history_flow() -> None:
     report_response = client.post(
         "/detect/report",
@@ -38,3 +54,54 @@ def test_history_flow() -> None:
         json={"status": "inaccurate", "note": "测试反馈"},
     )
     assert feedback_response.status_code == 200
+
+
+
+def test_get_history_cache_invalidated_by_feedback() -> None:
+    from app.services.history_store import get_history, save_feedback, save_report
+
+    record_id = save_report(input_text="缓存失效测试", report={"risk_label": "low", "risk_score": 10})
+
+    first = get_history(record_id)
+    assert first is not None
+    assert first["feedback_status"] is None
+
+    # 命中缓存时返回独立对象，调用方修改不影响后续读取
+    first["report"]["risk_label"] = "mutated"
+    assert get_history(record_id)["report"]["risk_label"] == "low"
+
+    assert save_feedback(record_id, "accurate", "ok")
+    detail = get_history(record_id)
+    assert detail["feedback_status"] == "accurate"
+    assert detail["feedback_note"] == "ok"
+
+
+def test_get_history_cache_keyed_by_active_db(monkeypatch, tmp_path) -> None:
+    from app.services.history_store import get_history, save_report
+
+    record_id = save_report(input_text="缓存库路径测试", report={"risk_label": "low", "risk_score": 10})
+    assert get_history(record_id) is not None
+
+    # 切换到另一个库（如回退到临时目录）后，不应命中原库的缓存行
+    monkeypatch.setattr(history_store, "_active_db_path", tmp_path / "other.db")
+    assert get_history(record_id) is None
+
+
+def test_list_history_preview_truncated_in_single_query(monkeypatch) -> None:
+    from app.services import chat_orchestrator as co
+    from app.services.history_store import list_history, save_report
+
+    long_text = "长文本摘要截断测试" * 40
+    record_id = save_report(input_text=long_text, report={"risk_label": "low", "risk_score": 5})
+
+    rows = list_history(limit=50)
+    row = next(r for r in rows if r["id"] == record_id)
+    assert row["input_preview"] == long_text[:120]
+
+    # /list 只用列表查询的字段渲染，不逐条回查详情
+    def _no_detail_fetch(_record_id):
+        raise AssertionError("run_list 不应逐条调用 get_history")
+
+    monkeypatch.setattr(co, "get_history", _no_detail_fetch)
+    msg = co.run_list(co.ToolListArgs(limit=50))
+    assert record_id in msg.content
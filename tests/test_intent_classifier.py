@@ -502,3 +502,24 @@ def test_parse_tool_analyze_force_true():
     assert tool == "analyze"
     assert args.get("force") is True
     assert "测试新闻文本" in str(args.get("text") or "")
+
+
+@pytest.mark.parametrize(
+    ("text", "expected_tool", "expected_args"),
+    [
+        ("/explain rec_1", "why", {"record_id": "rec_1"}),
+        ("/history limit=5", "list", {"limit": 5}),
+        ("/why\trec_2", "why", {"record_id": "rec_2"}),
+        ("/deepdive rec_3 claims 2", "deep_dive", {"record_id": "rec_3", "focus": "claims", "claim_index": 2}),
+        # 命令名后直接粘连字符时仍按前缀匹配（兼容旧行为）
+        ("/listing 7", "list", {"limit": 7}),
+        ("/more", "more_evidence", {"record_id": "bound"}),
+    ],
+)
+def test_parse_tool_command_table_aliases(text, expected_tool, expected_args):
+    from app.services.chat_orchestrator import parse_tool
+
+    tool, args = parse_tool(text, {"record_id": "bound"})
+    assert tool == expected_tool
+    for key, value in expected_args.items():
+        assert args.get(key) == value
@@ -29,3 +29,37 @@ def test_retrieve_evidence_web_only(monkeypatch) -> None:
     assert rows[0].source_type == "web_live"
     assert rows[0].domain == "governance"
     assert rows[0].source == "gov.cn"
+
+
+def test_retrieve_evidence_parallel_keeps_claim_order(monkeypatch) -> None:
+    import time
+
+    claims = [
+        ClaimItem(claim_id=f"c{i}", claim_text=f"主张{i}", source_sentence=f"主张{i}")
+        for i in range(1, 4)
+    ]
+
+    def _search(text: str, top_k: int = 6) -> list[WebEvidenceCandidate]:
+        # 先提交的检索更晚返回，验证结果仍按主张顺序编号
+        time.sleep(0.03 * (4 - int(text[-1])))
+        return [
+            WebEvidenceCandidate(
+                title=f"{text}-证据",
+                source="example.com",
+                url=f"https://example.com/{text}",
+                published_at="2026-02-10",
+                summary="摘要",
+                relevance=0.5,
+                raw_snippet="摘要",
+                domain="general",
+                is_authoritative=False,
+            )
+        ]
+
+    monkeypatch.setenv("TRUTHCAST_EVIDENCE_PARALLEL_WORKERS", "3")
+    monkeypatch.setattr("app.services.pipeline.search_web_evidence", _search)
+
+    rows = pipeline.retrieve_evidence(claims)
+    assert [row.claim_id for row in rows] == ["c1", "c2", "c3"]
+    assert [row.evidence_id for row in rows] == ["e1", "e2", "e3"]
+    assert rows[1].title == "主张2-证据"